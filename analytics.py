@@ -0,0 +1,135 @@
+"""
+시간대별 성적 분석.
+- performance: 날짜 / 시간대(0~23시) / 요일별 승률과 MR 변화량
+- detect_sessions: 매치 사이 간격이 gap_minutes보다 길면 새 세션으로 보고 세션별 전적/MR 변화량
+matches를 (match_date, id) 순서로 한 번 읽으며 윈도 함수(LAG, 누적 SUM)로 매치별 MR 변화와 세션 번호를 매기고,
+GROUP BY로 묶은 결과만 Python으로 가져옵니다. 날짜는 저장된 KST 벽시계 시간 기준입니다.
+"""
+from sqlalchemy import case, func, select
+
+from database import Match
+from match_history import filtered_query
+from pagination import clamp_page_size
+
+DEFAULT_SESSION_GAP = 30  # 분. 이보다 오래 쉬면 새 세션
+DEFAULT_SESSION_LIMIT = 20
+WEEKDAYS = ("Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat")  # SQLite strftime('%w') 순서
+GROUPINGS = {
+    "day": "%Y-%m-%d",
+    "hour": "%H",
+    "weekday": "%w",
+}
+
+
+def _with_mr_delta(player_id, date_from=None, date_to=None):
+    """
+    기간 안의 매치 + 매치별 MR 변화량(mr_delta)과 직전 매치 시간(prev_date).
+    MR은 캐릭터별이므로 직전 매치가 같은 캐릭터일 때만 변화량을 계산합니다 (아니면 NULL).
+    윈도는 모두 (player_id 파티션, match_date, id 순서) 하나라서 (player_id, match_date) 인덱스 순서대로 한 번만 읽음
+    """
+    matches = filtered_query(player_id, date_from=date_from, date_to=date_to).add_columns(
+        Match.__table__.c.player_id
+    ).subquery()
+
+    def previous(column):
+        return func.lag(column).over(partition_by=matches.c.player_id, order_by=(matches.c.match_date, matches.c.id))
+
+    return select(
+        matches.c.id,
+        matches.c.player_id,
+        matches.c.match_date,
+        matches.c.result,
+        case(
+            (previous(matches.c.my_character) == matches.c.my_character, matches.c.my_mr - previous(matches.c.my_mr)),
+        ).label("mr_delta"),
+        previous(matches.c.match_date).label("prev_date"),
+    ).subquery()
+
+
+def _totals(rows):
+    """GROUP BY 결과 컬럼 (matches, wins, losses, mr_delta)"""
+    return (
+        func.count().label("matches"),
+        func.sum(case((rows.c.result == "WIN", 1), else_=0)).label("wins"),
+        func.sum(case((rows.c.result == "LOSE", 1), else_=0)).label("losses"),
+        func.coalesce(func.sum(rows.c.mr_delta), 0).label("mr_delta"),
+    )
+
+
+def _record(row):
+    decided = (row.wins or 0) + (row.losses or 0)
+    return {
+        "matches": row.matches,
+        "wins": row.wins or 0,
+        "losses": row.losses or 0,
+        "win_rate": round(row.wins / decided * 100, 1) if decided else 0,
+        "mr_delta": row.mr_delta,
+    }
+
+
+def performance(db, player_id=None, by="day", date_from=None, date_to=None):
+    """
+    by(day / hour / weekday)별 승률과 MR 변화량. 매치가 없는 구간은 빠집니다.
+    반환값: {"by": by, "buckets": [{"key": ..., "matches", "wins", "losses", "win_rate", "mr_delta"}, ...]}
+    잘못된 by/날짜는 ValueError
+    """
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping: {by} ({', '.join(GROUPINGS)})")
+    rows = _with_mr_delta(player_id, date_from, date_to)
+    key = func.strftime(GROUPINGS[by], rows.c.match_date).label("key")
+    query = select(key, *_totals(rows)).group_by(key).order_by(key)
+
+    buckets = []
+    for row in db.execute(query):
+        record = {"key": row.key, **_record(row)}
+        if by == "hour":
+            record["key"] = int(row.key)
+        elif by == "weekday":
+            record["key"] = int(row.key)
+            record["label"] = WEEKDAYS[record["key"]]
+        buckets.append(record)
+    return {"by": by, "buckets": buckets}
+
+
+def detect_sessions(db, player_id=None, gap_minutes=DEFAULT_SESSION_GAP, limit=DEFAULT_SESSION_LIMIT,
+                    date_from=None, date_to=None):
+    """
+    최근 세션 limit개 (최신순). 같은 플레이어의 직전 매치와 gap_minutes 넘게 떨어지면 새 세션.
+    반환값: {"gap_minutes": ..., "sessions": [{"start", "end", "minutes", "matches", "wins", "losses", "win_rate", "mr_delta"}, ...]}
+    """
+    gap_minutes = max(1, int(gap_minutes))
+    rows = _with_mr_delta(player_id, date_from, date_to)
+    gap_days = gap_minutes / 1440.0
+    is_new = case(
+        (rows.c.prev_date.is_(None), 1),
+        (func.julianday(rows.c.match_date) - func.julianday(rows.c.prev_date) > gap_days, 1),
+        else_=0,
+    )
+    flagged = select(rows, is_new.label("is_new")).subquery()
+    # 세션 번호 = 처음부터 지금 매치까지 새 세션 표시의 누적 합
+    numbered = select(
+        flagged,
+        func.sum(flagged.c.is_new).over(
+            partition_by=flagged.c.player_id, order_by=(flagged.c.match_date, flagged.c.id), rows=(None, 0)
+        ).label("session"),
+    ).subquery()
+
+    start = func.min(numbered.c.match_date).label("start")
+    end = func.max(numbered.c.match_date).label("end")
+    query = (
+        select(start, end, *_totals(numbered))
+        .group_by(numbered.c.player_id, numbered.c.session)
+        .order_by(start.desc())
+        .limit(clamp_page_size(limit))
+    )
+
+    sessions = []
+    for row in db.execute(query):
+        sessions.append({
+            "start": row.start.isoformat(),
+            "end": row.end.isoformat(),
+            "minutes": round((row.end - row.start).total_seconds() / 60),
+            **_record(row),
+        })
+    return {"gap_minutes": gap_minutes, "sessions": sessions}
+
@@ -0,0 +1,437 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+from scraper import (
+    AUTH_FILE,
+    BATTLELOG_EXTRACT_JS,
+    BATTLELOG_ITEMS,
+    CONTEXT_OPTIONS,
+    LOGIN_CHANNELS,
+    NEXT_DATA_SELECTOR,
+    PROFILE_HREFS_JS,
+    READY_TIMEOUT_MS,
+    TARGET_URL,
+    UNKNOWN_CHANNEL,
+    UNKNOWN_PLAYER,
+    auth_state_has_session,
+    battlelog_row_from_dom,
+    battlelog_rows_from_props,
+    battlelog_url,
+    channel_label,
+    file_mtime,
+    first_user_code,
+    launch_channels,
+    matches_from_rows,
+    profile_from_props,
+    props_are_auth_blocked,
+    props_from_next_data,
+    raise_if_error_page,
+    record_navigation,
+    should_block_request,
+)
+
+SCRAPE_TIMEOUT = 90  # 초. 수집 1회(프로필 + Battle Log)의 최대 소요 시간
+LOGIN_TIMEOUT = 600  # 초. 로그인 창을 열어두는 최대 시간
+LOGIN_POLL_INTERVAL = 2
+
+# #__NEXT_DATA__ 원문과 로그인 링크 개수를 한 번의 왕복으로 읽습니다.
+PAGE_STATE_JS = """
+() => ({
+    next_data: document.querySelector('#__NEXT_DATA__')?.textContent || null,
+    login_links: document.querySelectorAll("a[href*='/auth/loginep']").length
+})
+"""
+
+
+async def block_unused_requests(route):
+    request = route.request
+    if should_block_request(request.resource_type, request.url, request.is_navigation_request()):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class AsyncScraper:
+    """
+    서버 이벤트 루프 위에서 동작하는 playwright.async_api 기반 스크래퍼.
+    스크랩 중에도 스레드풀 슬롯을 점유하지 않으며, 호출마다 timeout이 걸리고 취소(CancelledError)가 전파됩니다.
+    파싱은 scraper.py의 순수 함수를 그대로 쓰고 여기에는 페이지 I/O만 둡니다.
+    백엔드(browser/http), 빠른 탐색, 탐색 시간 기록은 동기 Scraper의 설정을 그대로 공유합니다.
+    pool_size도 같은 값을 쓰지만 동기 BrowserPool(백필)과는 별도의 브라우저이므로 스택마다 따로 적용됩니다.
+    - 브라우저/컨텍스트는 하나를 재사용하고, 동시에 열 수 있는 페이지 수는 pool_size로 제한
+    - 취소되거나 실패한 페이지는 재사용하지 않고 닫음
+    - auth.json/빠른 탐색 설정이 바뀌면 새 컨텍스트를 만들고, 이전 컨텍스트는 사용 중인 페이지가 모두 반환된 뒤 닫음
+    - idle_timeout 동안 사용이 없으면 브라우저를 닫음
+    """
+
+    def __init__(self, settings, auth_file=AUTH_FILE, headless=True):
+        self.settings = settings
+        self.auth_file = auth_file
+        self.headless = headless
+        self.channel = UNKNOWN_CHANNEL
+        self.launch_count = 0
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._context_key = None
+        self._pages = []
+        self._borrowed = {}  # 컨텍스트 -> 사용 중인(빌려준) 페이지 수
+        self._retired = []  # 설정이 바뀌어 교체됐지만 아직 사용 중인 페이지가 남은 이전 컨텍스트
+        self._in_use = 0
+        self._slot_released = asyncio.Condition()  # pool_size를 바꿔도 사용 중인 페이지 수(_in_use)로 제한
+        self._lock = asyncio.Lock()
+        self._idle_handle = None
+        self._login_task = None
+
+    @property
+    def fast_navigation(self):
+        return self.settings.pool.fast_navigation
+
+    def stats(self):
+        return {
+            "pool_size": self.settings.pool.pool_size,
+            "idle_timeout": self.settings.pool.idle_timeout,
+            "channel": channel_label(self.channel),
+            "running": self._browser is not None,
+            "pages_in_use": self._in_use,
+            "idle_pages": len(self._pages),
+            "retired_contexts": len(self._retired),
+            "launch_count": self.launch_count,
+        }
+
+    async def close(self):
+        if self._login_task is not None:
+            self._login_task.cancel()
+            await asyncio.gather(self._login_task, return_exceptions=True)
+        async with self._lock:
+            await self._close_browser()
+
+    # --- 로그인 ---
+
+    def login_running(self):
+        return self._login_task is not None and not self._login_task.done()
+
+    def start_login(self, timeout=LOGIN_TIMEOUT):
+        """로그인 창을 이벤트 루프의 태스크로 띄웁니다. 이미 열려 있으면 그 태스크를 반환합니다."""
+        if not self.login_running():
+            self._login_task = asyncio.get_running_loop().create_task(self.login_and_save_state(timeout))
+            self._login_task.add_done_callback(self._report_login_result)
+        return self._login_task
+
+    @staticmethod
+    def _report_login_result(task):
+        # 아무도 await하지 않는 태스크이므로 여기서 예외를 꺼내 기록합니다.
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ [AsyncScraper] 로그인 실패: {task.exception()}")
+
+    async def login_and_save_state(self, timeout=LOGIN_TIMEOUT):
+        """
+        사용자가 직접 로그인할 수 있도록 브라우저를 띄우고 세션 상태를 주기적으로 저장합니다.
+        창을 닫거나 timeout이 지나거나 태스크가 취소되면 종료합니다.
+        """
+        print("[AsyncScraper] 로그인 브라우저를 엽니다. 로그인 후 브라우저를 닫아주세요.")
+        async with async_playwright() as p:
+            browser = None
+            for channel in LOGIN_CHANNELS:
+                try:
+                    browser = await p.chromium.launch(headless=False, channel=channel)
+                    break
+                except Exception as e:
+                    print(f"[AsyncScraper] {channel} 실행 실패: {e}")
+            if browser is None:
+                raise Exception("BROWSER_ERROR: Failed to launch browser for login")
+
+            try:
+                context = await browser.new_context()
+                page = await context.new_page()
+                await page.goto(TARGET_URL)
+
+                deadline = time.monotonic() + timeout
+                while not page.is_closed() and time.monotonic() < deadline:
+                    try:
+                        if "streetfighter.com" in page.url:
+                            await context.storage_state(path=self.auth_file)
+                    except Exception:
+                        pass
+                    await asyncio.sleep(LOGIN_POLL_INTERVAL)
+                if not page.is_closed():
+                    print(f"[AsyncScraper] 로그인 대기 시간({timeout}초)이 지나 창을 닫습니다.")
+            finally:
+                await browser.close()
+
+        # auth.json의 mtime이 바뀌었으므로 다음 수집 때 컨텍스트가 새 세션으로 다시 만들어집니다.
+        print(f"인증 정보가 {self.auth_file}에 저장되었습니다.")
+
+    # --- 수집 ---
+
+    async def get_stats(self, user_code=None, timeout=SCRAPE_TIMEOUT):
+        if not auth_state_has_session(self.auth_file):
+            raise Exception("AUTH_ERROR: Missing or empty auth state. Please login again.")
+
+        data = await self._try_http("get_stats", user_code)
+        if data is not None:
+            return data
+        return await self._with_page(lambda page: self._get_stats(page, user_code), timeout)
+
+    async def collect(self, user_code=None, limit=20, stop_at=None, timeout=SCRAPE_TIMEOUT):
+        """
+        동기 Scraper.collect와 같은 결과({"player", "matches"})를 반환합니다.
+        stop_at: 이미 저장된 최신 매치의 fingerprint. 이 행에 도달하면 파싱을 멈춥니다.
+        """
+        if not auth_state_has_session(self.auth_file):
+            raise Exception("AUTH_ERROR: Missing or empty auth state. Please login again.")
+
+        result = await self._try_http("collect", user_code, limit, stop_at)
+        if result is not None:
+            return result
+        return await self._with_page(lambda page: self._collect(page, user_code, limit, stop_at), timeout)
+
+    async def _try_http(self, method, *args):
+        """http 백엔드는 짧은 블로킹 요청이므로 기본 executor에서 실행합니다. 브라우저가 필요하면 None."""
+        if self.settings.backend != "http":
+            return None
+        try:
+            return await asyncio.to_thread(getattr(self.settings.http, method), *args)
+        except Exception as e:
+            print(f"⚠️ [AsyncScraper] HTTP 백엔드 실패, 브라우저로 전환합니다: {e}")
+            return None
+
+    async def _collect(self, page, user_code, limit, stop_at):
+        player = await self._get_stats(page, user_code)
+        if not player or player.get("user_code") == "unknown":
+            return {"player": player, "matches": []}
+
+        matches = await self._get_match_history(page, player["user_code"], player["name"], limit, stop_at)
+        return {"player": player, "matches": matches}
+
+    async def _get_stats(self, page, user_code):
+        if not user_code or user_code == "unknown_code":
+            user_code = await self._find_user_code(page)
+        if not user_code:
+            return dict(UNKNOWN_PLAYER)
+
+        await self._goto(page, f"{TARGET_URL}/ko-kr/profile/{user_code}")
+        props = await self._checked_props(page)
+        return profile_from_props(props, user_code)
+
+    async def _find_user_code(self, page):
+        await self._goto(page, TARGET_URL, "a[href*='/profile/']")
+        await self._checked_props(page)
+        return first_user_code(await page.evaluate(PROFILE_HREFS_JS))
+
+    async def _get_match_history(self, page, user_code, my_name, limit, stop_at):
+        await self._goto(page, battlelog_url(user_code, "rank"), f"{NEXT_DATA_SELECTOR}, {BATTLELOG_ITEMS}")
+        props = await self._checked_props(page)
+
+        rows = battlelog_rows_from_props(props)
+        if rows is None:
+            raw_rows = await page.evaluate(BATTLELOG_EXTRACT_JS, [BATTLELOG_ITEMS, limit])
+            rows = (battlelog_row_from_dom(raw) for raw in raw_rows)
+
+        matches, _ = matches_from_rows(rows, my_name, user_code, limit, stop_at, source="AsyncScraper")
+        return matches
+
+    async def _checked_props(self, page):
+        raise_if_error_page(page.url)
+        state = await page.evaluate(PAGE_STATE_JS)
+        props = props_from_next_data(state.get("next_data"))
+        if props_are_auth_blocked(props, state.get("login_links", 0)):
+            raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
+        return props
+
+    async def _goto(self, page, url, ready_selector=NEXT_DATA_SELECTOR):
+        fast = self.fast_navigation
+        started = time.perf_counter()
+        if fast:
+            await page.goto(url, wait_until="domcontentloaded")
+            try:
+                await page.wait_for_selector(ready_selector, state="attached", timeout=READY_TIMEOUT_MS)
+            except Exception as e:
+                print(f"   - 준비 요소 대기 실패 ({ready_selector}): {e}")
+        else:
+            await page.goto(url, wait_until="networkidle")
+
+        record_navigation(self.settings.nav_timings, url, fast, started)
+
+    # --- 브라우저/페이지 관리 ---
+
+    async def _with_page(self, fn, timeout):
+        """페이지 하나를 빌려 fn(page)를 timeout 안에 실행합니다. 시간 초과 시 TIMEOUT_ERROR."""
+        async with self._page_slot():
+            try:
+                page = await self._acquire_page()
+                try:
+                    result = await asyncio.wait_for(fn(page), timeout)
+                except asyncio.TimeoutError:
+                    await self._release_page(page, reuse=False)
+                    raise Exception(f"TIMEOUT_ERROR: Scraping did not finish within {timeout}s")
+                except BaseException:
+                    # 취소/실패 시 페이지가 이동 중일 수 있으므로 재사용하지 않습니다.
+                    await self._release_page(page, reuse=False)
+                    raise
+                await self._release_page(page)
+                return result
+            finally:
+                self._schedule_idle_close()
+
+    def _has_free_slot(self):
+        return self._in_use < self.settings.pool.pool_size
+
+    @asynccontextmanager
+    async def _page_slot(self):
+        """
+        동시에 쓰는 페이지 수를 그때그때의 pool_size로 제한합니다.
+        크기가 바뀌어도 이미 페이지를 쓰는 작업까지 세므로, 줄였을 때는 그 작업들이 끝나야 새 작업이 들어갑니다.
+        """
+        async with self._slot_released:
+            await self._slot_released.wait_for(self._has_free_slot)
+            self._in_use += 1
+        try:
+            yield
+        finally:
+            async with self._slot_released:
+                self._in_use -= 1
+                self._slot_released.notify_all()
+
+    async def _acquire_page(self):
+        async with self._lock:
+            if self._idle_handle is not None:
+                self._idle_handle.cancel()
+                self._idle_handle = None
+
+            if self._browser is None or not self._browser.is_connected():
+                await self._close_browser()
+                await self._launch()
+
+            key = (file_mtime(self.auth_file), self.fast_navigation)
+            if self._context is not None and self._context_key != key:
+                await self._retire_context()
+            if self._context is None:
+                self._context = await self._browser.new_context(storage_state=self.auth_file, **CONTEXT_OPTIONS)
+                if self.fast_navigation:
+                    await self._context.route("**/*", block_unused_requests)
+                self._context_key = key
+
+            page = None
+            while self._pages and page is None:
+                page = self._pages.pop()
+                if page.is_closed():
+                    page = None
+            if page is None:
+                page = await self._context.new_page()
+            self._borrowed[self._context] = self._borrowed.get(self._context, 0) + 1
+            return page
+
+    async def _release_page(self, page, reuse=True):
+        """
+        빌려준 페이지를 돌려받습니다. 현재 컨텍스트의 페이지면 재사용하고,
+        교체된 이전 컨텍스트의 마지막 페이지였다면 그 컨텍스트를 닫습니다.
+        """
+        context = getattr(page, "context", None)
+        current = context is None or context is self._context
+        if context in self._borrowed:
+            self._borrowed[context] -= 1
+            if not self._borrowed[context]:
+                del self._borrowed[context]
+        if reuse and current:
+            self._pages.append(page)
+            return
+        await self._discard_page(page)
+        if context in self._retired and context not in self._borrowed:
+            self._retired.remove(context)
+            await self._close_quietly(context)
+
+    async def _retire_context(self):
+        """
+        현재 컨텍스트를 교체 대상으로 돌립니다. 다른 코루틴이 쓰는 중인 페이지가 있으면
+        닫지 않고 남겨두었다가 마지막 페이지가 반환될 때 닫습니다.
+        """
+        context = self._context
+        pages, self._pages = self._pages, []
+        for page in pages:
+            await self._discard_page(page)
+        self._context = None
+        self._context_key = None
+        if context in self._borrowed:
+            self._retired.append(context)
+        else:
+            await self._close_quietly(context)
+
+    async def _launch(self):
+        self._playwright = await async_playwright().start()
+        errors = []
+        for channel in launch_channels(self.channel):
+            options = {"headless": self.headless}
+            if channel:
+                options["channel"] = channel
+            try:
+                self._browser = await self._playwright.chromium.launch(**options)
+            except Exception as e:
+                errors.append(f"{channel or 'bundled'}: {e}")
+                continue
+            self.channel = channel
+            self.launch_count += 1
+            print(f"[AsyncScraper] 브라우저 실행 완료 (channel={channel or 'bundled'})")
+            return
+
+        await self._close_browser()
+        raise Exception("BROWSER_ERROR: Failed to launch browser. " + " | ".join(errors))
+
+    async def _discard_page(self, page):
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    def _schedule_idle_close(self):
+        idle_timeout = self.settings.pool.idle_timeout
+        if not idle_timeout:
+            return
+        loop = asyncio.get_running_loop()
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        self._idle_handle = loop.call_later(idle_timeout, lambda: loop.create_task(self._close_if_idle()))
+
+    async def _close_if_idle(self):
+        async with self._lock:
+            if self._in_use or self._browser is None:
+                return
+            print(f"[AsyncScraper] {self.settings.pool.idle_timeout}초 동안 사용이 없어 브라우저를 닫습니다.")
+            await self._close_browser()
+
+    async def _close_quietly(self, context):
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def _close_context(self):
+        """브라우저를 닫을 때 모든 컨텍스트(교체 대기 중인 것 포함)를 닫습니다."""
+        pages, self._pages = self._pages, []
+        for page in pages:
+            await self._discard_page(page)
+        for context in [self._context, *self._retired]:
+            if context is not None:
+                await self._close_quietly(context)
+        self._retired = []
+        self._borrowed = {}
+        self._context = None
+        self._context_key = None
+
+    async def _close_browser(self):
+        await self._close_context()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._browser = None
+        self._playwright = None
@@ -0,0 +1,154 @@
+import threading
+import time
+from datetime import datetime
+
+from collector import store_matches, upsert_player
+from database import BackfillProgress, Player, SessionLocal
+from scraper import BATTLELOG_TABS
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+MAX_PAGES_PER_TAB = 500  # 응답 형식이 바뀌어도 무한히 돌지 않도록 하는 안전장치
+
+
+class RateLimiter:
+    """여러 스레드가 공유하는 요청 간 최소 간격 제한"""
+
+    def __init__(self, requests_per_second, stop_event=None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0
+        self.stop_event = stop_event
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + self.interval
+        delay = at - now
+        if delay <= 0:
+            return
+        if self.stop_event is not None:
+            self.stop_event.wait(delay)
+        else:
+            time.sleep(delay)
+
+
+class BackfillJob:
+    """
+    Battle Log의 모든 탭/페이지를 거슬러 올라가며 과거 매치를 가져오는 작업.
+    - concurrency 만큼의 페이지를 한 번에 요청 (같은 브라우저 컨텍스트 또는 HTTP 연결 풀)
+    - requests_per_second로 Buckler 요청 속도 제한
+    - 페이지마다 바로 DB에 저장하고 진행 상황(backfill_progress)을 같은 트랜잭션으로 커밋
+      -> 중단되어도 다음 실행 시 이어서 진행
+    """
+
+    def __init__(self, scraper, user_code, tabs=BATTLELOG_TABS, concurrency=DEFAULT_CONCURRENCY,
+                 requests_per_second=DEFAULT_REQUESTS_PER_SECOND, session_factory=SessionLocal, restart=False):
+        self.scraper = scraper
+        self.user_code = user_code
+        self.tabs = list(tabs)
+        self.concurrency = max(1, int(concurrency))
+        self.session_factory = session_factory
+        self.restart = restart
+        self._stop = threading.Event()
+        self.limiter = RateLimiter(requests_per_second, self._stop)
+        self._thread = None
+        self.state = {
+            "status": "idle",
+            "tab": None,
+            "page": None,
+            "pages_done": 0,
+            "imported": 0,
+            "error": None,
+            "started_at": None,
+            "finished_at": None
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="backfill", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self):
+        return {**self.state, "user_code": self.user_code, "tabs": self.tabs, "concurrency": self.concurrency}
+
+    def run(self):
+        self.state.update(status="running", error=None, started_at=datetime.now().isoformat(timespec="seconds"))
+        db = self.session_factory()
+        try:
+            player = self._ensure_player(db)
+            for tab in self.tabs:
+                if self._stop.is_set():
+                    break
+                self._backfill_tab(db, player, tab)
+            self.state["status"] = "stopped" if self._stop.is_set() else "completed"
+        except Exception as e:
+            db.rollback()
+            print(f"❌ [Backfill] 중단됨: {e}")
+            self.state.update(status="error", error=str(e))
+        finally:
+            db.close()
+            self.state["finished_at"] = datetime.now().isoformat(timespec="seconds")
+
+    def _ensure_player(self, db):
+        player = db.query(Player).filter(Player.user_code == self.user_code).first()
+        if player:
+            return player
+
+        # 매치의 Player 1/2 구분에 이름이 필요하므로 프로필을 먼저 가져옵니다.
+        data = self.scraper.get_stats(user_code=self.user_code)
+        if not data or data.get("user_code") in (None, "unknown"):
+            raise Exception("Failed to get player data")
+        player, _ = upsert_player(db, data)
+        db.commit()
+        return player
+
+    def _backfill_tab(self, db, player, tab):
+        progress = db.get(BackfillProgress, (player.id, tab))
+        if progress is None:
+            progress = BackfillProgress(player_id=player.id, tab=tab, next_page=1, imported=0, done=False)
+            db.add(progress)
+        elif self.restart:
+            progress.next_page, progress.imported, progress.done = 1, 0, False
+        db.commit()
+
+        if progress.done:
+            print(f"[Backfill] {tab}: 이미 완료됨 (건너뜀)")
+            return
+
+        self.state["tab"] = tab
+        while not progress.done and not self._stop.is_set():
+            last_page = min(progress.total_pages or MAX_PAGES_PER_TAB, MAX_PAGES_PER_TAB)
+            page_numbers = list(range(progress.next_page, min(progress.next_page + self.concurrency, last_page + 1)))
+            if not page_numbers:
+                progress.done = True
+                db.commit()
+                break
+
+            results = self.scraper.fetch_battlelog_pages(
+                self.user_code, player.name, tab, page_numbers, before_request=self.limiter.wait
+            )
+            for result in results:
+                # 페이지 단위로 저장하고 진행 위치를 같은 트랜잭션에 기록
+                new_count = store_matches(db, player, result["matches"])
+                progress.imported = (progress.imported or 0) + new_count
+                progress.next_page = result["page"] + 1
+                if result["total_page"]:
+                    progress.total_pages = result["total_page"]
+                if not result["matches"] or (progress.total_pages and result["page"] >= progress.total_pages):
+                    progress.done = True
+                progress.updated_at = datetime.now()
+                db.commit()
+
+                self.state["page"] = result["page"]
+                self.state["pages_done"] += 1
+                self.state["imported"] += new_count
+                print(f"[Backfill] {tab} {result['page']}페이지: {len(result['matches'])}개 중 {new_count}개 저장")
+                if progress.done:
+                    break
@@ -0,0 +1,122 @@
+"""
+SQLite storage profile 읽기/쓰기 벤치마크.
+수집기가 매치를 계속 저장하는 동안 오버레이처럼 통계를 반복 조회하고, 읽기 지연과 실패 횟수를 비교합니다.
+
+    python bench_database.py [초] [프로필 ...]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import sessionmaker
+
+from collector import ingest_matches
+from database import STORAGE_PROFILES, Base, Match, Player, create_storage_engine
+from match_keys import match_fingerprint, match_key
+
+WRITE_BATCH = 200  # 백필 한 페이지 묶음보다 넉넉한 쓰기 트랜잭션
+READ_INTERVAL = 0.005  # 오버레이 폴링을 압축해서 흉내 (5ms마다)
+
+
+def fake_matches(start, count):
+    base = datetime(2025, 1, 1)
+    matches = []
+    for n in range(start, start + count):
+        match = {
+            "date": (base + timedelta(minutes=n)).strftime("%Y/%m/%d %H:%M"),
+            "opponent_name": f"Rival{n % 300}",
+            "opponent_character": "KEN",
+            "opponent_mr": 1600,
+            "opponent_lp": None,
+            "my_character": "RASHID",
+            "my_mr": 1500 + n % 200,
+            "my_lp": None,
+            "result": "WIN" if n % 3 else "LOSE",
+        }
+        match["fingerprint"] = match_fingerprint(match)
+        match["match_key"] = match_key(match)
+        matches.append(match)
+    return matches
+
+
+def run(profile, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_storage_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            player = Player(user_code="1", name="Bench")
+            db.add(player)
+            db.commit()
+            player_id = player.id
+
+        stop = threading.Event()
+        written = [0]
+        latencies = []
+        errors = []
+
+        def writer():
+            with Session() as db:
+                player = db.get(Player, player_id)
+                while not stop.is_set():
+                    ingest_matches(db, player, fake_matches(written[0], WRITE_BATCH))
+                    db.commit()
+                    written[0] += WRITE_BATCH
+
+        def reader():
+            with Session() as db:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        db.query(
+                            func.count(Match.id),
+                            func.sum(case((Match.result == "WIN", 1), else_=0))
+                        ).filter(Match.player_id == player_id).first()
+                        db.query(Match).order_by(Match.match_date.desc()).limit(10).all()
+                        db.rollback()
+                    except Exception as e:
+                        errors.append(str(e).splitlines()[0])
+                        db.rollback()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    time.sleep(READ_INTERVAL)
+
+        threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": profile,
+        "rows_written": written[0],
+        "reads": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        "max_ms": round(latencies[-1], 2),
+        "read_errors": len(errors),
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    profiles = sys.argv[2:] or ["compat", "performance"]
+    print(f"{'profile':<12} {'rows':>8} {'reads':>7} {'p50':>8} {'p99':>8} {'max':>9} {'errors':>7}")
+    for profile in profiles:
+        if profile not in STORAGE_PROFILES:
+            raise SystemExit(f"Unknown profile: {profile} ({', '.join(STORAGE_PROFILES)})")
+        r = run(profile, seconds)
+        print(f"{r['profile']:<12} {r['rows_written']:>8} {r['reads']:>7} {r['p50_ms']:>6}ms "
+              f"{r['p99_ms']:>6}ms {r['max_ms']:>7}ms {r['read_errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
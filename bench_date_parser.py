@@ -0,0 +1,79 @@
+"""
+날짜 파서 마이크로 벤치마크.
+date_corpus.tsv의 문자열로 기존 방식(strptime 형식 5개 순차 시도)과 DateParser를 비교합니다.
+
+    python bench_date_parser.py [반복 횟수]
+"""
+import sys
+import time
+from datetime import datetime
+
+from date_parser import DATE_PATTERNS, DateParser
+
+CORPUS_FILE = "date_corpus.tsv"
+
+# 기존 collector의 파싱 방식 (비교 기준)
+LEGACY_FORMATS = [
+    "%Y/%m/%d %H:%M",
+    "%m/%d/%Y %H:%M",
+    "%Y. %m. %d. %p %I:%M:%S",
+    "%Y. %m. %d. %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S"
+]
+
+
+def legacy_parse(date_str):
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def load_corpus(path=CORPUS_FILE):
+    """(원본 문자열, 기대값 ISO 문자열 또는 None) 목록"""
+    cases = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("#") or "\t" not in line:
+                continue
+            raw, expected = line.split("\t", 1)
+            cases.append((raw, expected or None))
+    return cases
+
+
+def bench(label, parse_batch, batches, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for batch in batches:
+            parse_batch(batch)
+    elapsed = time.perf_counter() - started
+    count = repeat * sum(len(b) for b in batches)
+    print(f"{label:<28} {elapsed * 1000:9.1f}ms  {elapsed / count * 1e6:7.2f}µs/건")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cases = load_corpus()
+
+    # 실제 수집처럼 한 번에 같은 형식의 날짜 20개씩 처리
+    batches = []
+    for name, pattern in DATE_PATTERNS:
+        same_format = [raw for raw, expected in cases if expected and pattern.match(raw.strip())]
+        if same_format:
+            batches.append((same_format * 20)[:20])
+
+    print(f"코퍼스 {len(cases)}건, 형식별 20건 배치 {len(batches)}개 x {repeat}회")
+    bench("legacy strptime", lambda batch: [legacy_parse(s) for s in batch], batches, repeat)
+    bench("DateParser (per scrape)", lambda batch: [p.parse(s) for p in [DateParser()] for s in batch], batches, repeat)
+
+    misses = [raw for raw, expected in cases if expected and legacy_parse(raw.strip()) is None]
+    print(f"legacy 방식이 인식하지 못한 문자열: {len(misses)}건")
+    for raw in misses:
+        print(f"  - {raw!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from database import MATCH_IDENTITY_KEY, CollectCursor, Match, Player
+from date_parser import DateParser, to_storage
+from events import track_matches, track_player
+from match_keys import match_key
+from rollups import apply_rollups
+
+PLAYER_FIELDS = ("name", "lp", "rank", "character")
+MATCH_FIELDS = ("opponent_name", "opponent_character", "opponent_mr", "opponent_lp",
+                "my_character", "my_mr", "my_lp", "result")
+ROLLUP_FIELDS = ("id", "player_id", "opponent_name", "opponent_character", "my_character", "my_mr", "result",
+                 "match_date")
+INGEST_CHUNK_SIZE = 500  # IN (...) 조회를 SQLite 바인딩 변수 개수 제한 안쪽으로 나눔
+
+
+def upsert_player(db, player_data, touch=True):
+    """
+    스크랩한 프로필로 플레이어를 생성/갱신합니다.
+    touch=False이면 값이 바뀌지 않았을 때 아무것도 쓰지 않습니다 (폴링용).
+    반환값: (player, changed)
+    """
+    user_code = player_data.get("user_code", "unknown_code")
+    player = db.query(Player).filter(Player.user_code == user_code).first()
+
+    if not player:
+        # 새 플레이어 생성
+        player = Player(user_code=user_code, **{f: player_data.get(f) for f in PLAYER_FIELDS})
+        db.add(player)
+        db.flush()
+        track_player(db, player)
+        return player, True
+
+    changed = any(getattr(player, f) != player_data.get(f) for f in PLAYER_FIELDS)
+    if changed or touch:
+        # 기존 플레이어 정보도 최신으로 업데이트
+        for f in PLAYER_FIELDS:
+            setattr(player, f, player_data.get(f))
+        player.last_updated = datetime.now()
+        track_player(db, player)
+    return player, changed
+
+
+def ingest_matches(db, player, matches, cursor=None):
+    """
+    최신순으로 정렬된 매치 목록을 INSERT ... ON CONFLICT DO NOTHING으로 한꺼번에 저장합니다.
+    중복 판정은 (player_id, match_key) unique 인덱스가 맡으므로 행마다 SELECT하지 않습니다.
+    cursor의 last_match_date보다 오래된 행을 만나면 그 이후는 이미 저장된 것으로 보고 중단합니다.
+    실제로 들어간 행(RETURNING)만큼 집계 테이블도 갱신하고, 커밋되면 matches/summary 이벤트가 나가도록 기록합니다.
+    커밋은 호출 측에서 하므로 플레이어/cursor/집계 갱신과 같은 트랜잭션에 묶입니다.
+    반환값: {"inserted": 새로 저장한 수, "skipped": 이미 있어서 건너뛴 수, "promoted": replay: 키로 바꾼 기존 행 수}
+    """
+    rows = []
+    parser = DateParser()  # 같은 수집의 날짜는 형식이 같으므로 한 번 찾은 형식을 재사용
+    for match in matches:
+        match_datetime = to_storage(parser.parse(match["date"]))
+        if match_datetime and cursor and cursor.last_match_date and match_datetime < cursor.last_match_date:
+            break
+
+        if not match_datetime:
+            print(f"⚠️ 날짜 파싱 실패: {match['date']} -> 현재 시간으로 대체")
+            match_datetime = datetime.now()
+
+        rows.append({
+            "player_id": player.id,
+            "match_date": match_datetime,
+            "match_key": match.get("match_key") or match_key(match),
+            **{f: match[f] for f in MATCH_FIELDS}
+        })
+
+    promoted = promote_row_keys(db, player, matches)
+
+    # 파라미터 목록으로 한 번에 실행하면 문장은 한 번만 컴파일(캐시)되고, SQLAlchemy의 insertmanyvalues가
+    # 바인딩 변수 제한에 맞춰 여러 행 INSERT ... RETURNING으로 나눠 보냅니다.
+    matches_table = Match.__table__
+    inserted_rows = db.execute(
+        insert(matches_table)
+        .on_conflict_do_nothing(index_elements=list(MATCH_IDENTITY_KEY))
+        .returning(*(matches_table.c[f] for f in ROLLUP_FIELDS)),
+        rows
+    ).mappings().all() if rows else []
+
+    apply_rollups(db, inserted_rows)
+    track_matches(db, player.id, len(inserted_rows))
+    return {"inserted": len(inserted_rows), "skipped": len(rows) - len(inserted_rows), "promoted": promoted}
+
+
+def promote_row_keys(db, player, matches):
+    """
+    DOM 파싱이나 이전 버전에서 행 해시 키(row:)로 저장된 매치의 replay ID가 확인되면 키를 replay:로 바꿉니다.
+    그래야 같은 매치를 replay ID로 다시 수집했을 때 중복으로 판정됩니다.
+    이번 배치의 행 해시 키만 (player_id, match_key IN ...) 인덱스로 조회하고, 실제로 저장돼 있던 행만 갱신합니다.
+    (대부분의 배치는 해당 행이 없으므로 UPDATE 없이 조회 한 번으로 끝남)
+    Core UPDATE라 세션이 변경으로 추적하지 않으므로, 커밋 여부 판단용으로 바꾼 행 수를 반환합니다.
+    """
+    replay_keys = {
+        match_key({**m, "replay_id": None}): m["match_key"]
+        for m in matches if m.get("replay_id") and m.get("match_key")
+    }
+    if not replay_keys:
+        return 0
+
+    matches_table = Match.__table__
+    row_keys = list(replay_keys)
+    stored = []
+    for i in range(0, len(row_keys), INGEST_CHUNK_SIZE):
+        stored.extend(db.execute(
+            select(matches_table.c.match_key)
+            .where(matches_table.c.player_id == player.id,
+                   matches_table.c.match_key.in_(row_keys[i:i + INGEST_CHUNK_SIZE]))
+        ).scalars())
+    if stored:
+        db.execute(
+            update(matches_table)
+            .where(matches_table.c.player_id == player.id, matches_table.c.match_key == bindparam("row_key"))
+            .values(match_key=bindparam("replay_key")),
+            [{"row_key": key, "replay_key": replay_keys[key]} for key in stored]
+        )
+    return len(stored)  # (player_id, match_key)가 unique이므로 키 하나당 한 행
+
+
+def store_matches(db, player, matches, cursor=None):
+    """ingest_matches와 같고 새로 추가한 개수만 반환합니다."""
+    return ingest_matches(db, player, matches, cursor)["inserted"]
+
+
+def advance_cursor(db, player, cursor, matches):
+    """이번에 가져온 battlelog 첫 행과 가장 최근 매치 시간을 기록합니다."""
+    if not matches:
+        return cursor
+
+    if cursor is None:
+        cursor = CollectCursor(player_id=player.id)
+        db.add(cursor)
+
+    cursor.top_fingerprint = matches[0]["fingerprint"]
+    parser = DateParser()
+    dates = [d for d in (to_storage(parser.parse(m["date"])) for m in matches) if d]
+    if dates and (cursor.last_match_date is None or max(dates) > cursor.last_match_date):
+        cursor.last_match_date = max(dates)
+    cursor.updated_at = datetime.now()
+    return cursor
+
+
+def collect_player_matches(db, scraper, user_code=None, limit=20):
+    """
+    프로필 + 대전 기록을 수집하여 DB에 반영합니다.
+    저장된 cursor가 있으면 이미 저장된 첫 행에서 파싱을 멈추므로,
+    새 매치가 없는 폴링은 한 행만 읽고 DB에 아무것도 쓰지 않습니다.
+    """
+    cursor = find_cursor(db, user_code)
+    collected = scraper.collect(
+        user_code=user_code,
+        limit=limit,
+        stop_at=cursor.top_fingerprint if cursor else None
+    )
+    return save_collected(db, collected, cursor)
+
+
+async def collect_player_matches_async(session_factory, scraper, user_code=None, limit=20):
+    """
+    collect_player_matches의 AsyncScraper 버전. 스크랩뿐 아니라 DB 조회/저장도 이벤트 루프를 막지 않도록
+    스레드에서 각자의 세션으로 실행합니다 (백필/가져오기가 쓰기 잠금을 잡고 있으면 커밋이 busy_timeout까지 기다릴 수 있음).
+    """
+    def top_fingerprint():
+        with session_factory() as db:
+            cursor = find_cursor(db, user_code)
+            return cursor.top_fingerprint if cursor else None
+
+    def save(collected):
+        with session_factory() as db:
+            return save_collected(db, collected, find_cursor(db, user_code))
+
+    stop_at = await asyncio.to_thread(top_fingerprint)
+    collected = await scraper.collect(user_code=user_code, limit=limit, stop_at=stop_at)
+    return await asyncio.to_thread(save, collected)
+
+
+def find_cursor(db, user_code):
+    player = db.query(Player).filter(Player.user_code == user_code).first() if user_code else None
+    return db.get(CollectCursor, player.id) if player else None
+
+
+def save_collected(db, collected, cursor=None):
+    player_data = collected["player"]
+    if not player_data:
+        raise Exception("Failed to get player data")
+
+    # 플레이어 찾기 또는 생성
+    player, _ = upsert_player(db, player_data, touch=False)
+    if cursor is None or cursor.player_id != player.id:
+        cursor = db.get(CollectCursor, player.id)
+
+    matches = collected["matches"]
+    ingested = ingest_matches(db, player, matches, cursor)
+    advance_cursor(db, player, cursor, matches)
+
+    if ingested["inserted"] or ingested["promoted"] or db.new or db.dirty:
+        db.commit()
+
+    if not matches:
+        return {"status": "success", "message": "No new matches found", "new_count": 0, "skipped": 0, "total_scraped": 0}
+
+    return {
+        "status": "success",
+        "message": f"Collected {ingested['inserted']} new matches out of {len(matches)} total",
+        "new_count": ingested["inserted"],
+        "skipped": ingested["skipped"],
+        "total_scraped": len(matches)
+    }
@@ -0,0 +1,48 @@
+"""
+조회 API의 조건부 GET(ETag) 지원.
+수집 트랜잭션이나 설정 저장이 커밋될 때마다 데이터 버전을 올리고, 폴링 응답에는 이 버전으로 만든 weak ETag를 붙입니다.
+클라이언트가 같은 ETag를 If-None-Match로 보내면 DB를 읽지 않고 304로 답할 수 있습니다.
+"""
+import hashlib
+import threading
+import time
+
+
+class DataVersion:
+    """
+    프로세스 안에서만 유효한 변경 카운터.
+    서버를 다시 시작하면 0부터 세므로 시작 시각(boot)을 ETag에 함께 넣어 이전 실행의 ETag와 겹치지 않게 합니다.
+    """
+
+    def __init__(self):
+        self.boot = int(time.time())
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.value += 1
+            return self.value
+
+    def etag(self, *parts):
+        """현재 버전 + 응답을 구분하는 값(엔드포인트, 파라미터 등)으로 weak ETag를 만듭니다."""
+        tag = f"{self.boot:x}-{self.value}"
+        if parts:
+            digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:12]
+            tag = f"{tag}-{digest}"
+        return f'W/"{tag}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더(여러 개, *, W/ 접두사 가능)가 etag와 맞는지 weak 비교로 확인합니다."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+data_version = DataVersion()
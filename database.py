@@ -1,15 +1,79 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import create_engine, event, Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 
+
 # 데이터베이스 URL 설정 (SQLite 사용)
 SQLALCHEMY_DATABASE_URL = "sqlite:///./sf6viewer.db"
 
+# 연결마다 적용하는 SQLite 설정 묶음
+# - performance: WAL로 오버레이 읽기가 수집 쓰기에 막히지 않게 하고, 캐시/mmap을 키움
+# - compat: 네트워크 드라이브 등 WAL을 쓸 수 없는 환경용 (기존 rollback journal)
+STORAGE_PROFILES = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,  # KiB 단위 (64MB)
+        "mmap_size": 268435456,  # 256MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,  # ms
+    },
+    "compat": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+DEFAULT_STORAGE_PROFILE = "performance"
+OPTIMIZE_INTERVAL = 6 * 60 * 60  # 초. PRAGMA optimize 주기
+
+def apply_storage_profile(dbapi_connection, profile):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in STORAGE_PROFILES[profile].items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def create_storage_engine(url, profile=DEFAULT_STORAGE_PROFILE):
+    """SQLite 엔진을 만들고, 새 연결마다 storage profile의 PRAGMA를 적용합니다."""
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile: {profile}")
+
+    storage_engine = create_engine(url, connect_args={"check_same_thread": False})
+    storage_engine.storage_profile = profile
+
+    @event.listens_for(storage_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        apply_storage_profile(dbapi_connection, storage_engine.storage_profile)
+
+    return storage_engine
+
+def configure_storage(profile, bind=None):
+    """profile을 바꾸고 풀의 연결을 닫아, 다음 연결부터 새 설정이 적용되게 합니다."""
+    bind = bind or engine
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile: {profile}")
+    if bind.storage_profile != profile:
+        bind.storage_profile = profile
+        bind.dispose()
+
+def storage_status(bind=None):
+    """현재 연결에 실제로 적용된 PRAGMA 값"""
+    bind = bind or engine
+    with bind.connect() as conn:
+        values = {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in STORAGE_PROFILES["performance"]}
+    return {"storage_profile": bind.storage_profile, "pragmas": values}
+
+def optimize_database(bind=None):
+    """쿼리 플래너 통계 갱신 (SQLite 권장: 오래 열려 있는 연결에서 주기적으로 PRAGMA optimize)"""
+    bind = bind or engine
+    with bind.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+
 # 엔진 생성
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_storage_engine(SQLALCHEMY_DATABASE_URL)
 
 # 세션 로컬 생성
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -29,6 +93,8 @@ class Player(Base):
     character = Column(String) # 주 캐릭터
     last_updated = Column(DateTime, default=datetime.now)
 
+MATCH_IDENTITY_KEY = ("player_id", "match_key")
+
 class Match(Base):
     """매치 기록을 저장하는 모델"""
     __tablename__ = "matches"
@@ -44,14 +110,95 @@ class Match(Base):
     my_lp = Column(Integer, nullable=True)  # 내 LP
     result = Column(String, index=True)  # WIN, LOSE, DRAW
     match_date = Column(DateTime, index=True)  # 대전 날짜/시간
+    match_key = Column(String, nullable=True)  # replay:<Replay ID> 또는 row:<원본 행 해시>
     
     player = relationship("Player", back_populates="matches")
 
+    __table_args__ = (
+        # 같은 플레이어의 같은 match_key는 하나만 저장 (수집 시 ON CONFLICT DO NOTHING)
+        Index("uq_matches_match_key", *MATCH_IDENTITY_KEY, unique=True),
+        # 플레이어별 통계 쿼리용 (기존 DB에는 migrations.py에서 추가)
+        Index("ix_matches_player_date", "player_id", "match_date"),
+        Index("ix_matches_player_opponent", "player_id", "opponent_name"),
+        Index("ix_matches_player_opp_char_result", "player_id", "opponent_character", "result"),
+        Index("ix_matches_player_mr", "player_id", "my_mr"),
+    )
+
 Player.matches = relationship("Match", order_by=Match.id, back_populates="player")
 
-def init_db():
-    """데이터베이스 테이블 생성"""
-    Base.metadata.create_all(bind=engine)
+class CollectCursor(Base):
+    """플레이어별 마지막 수집 위치 (증분 수집용 high-water mark)"""
+    __tablename__ = "collect_cursors"
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    last_match_date = Column(DateTime, nullable=True)  # 저장된 가장 최근 매치 시간
+    top_fingerprint = Column(String, nullable=True)  # 마지막 수집 시 battlelog 첫 행의 fingerprint
+    updated_at = Column(DateTime, default=datetime.now)
+
+class BackfillProgress(Base):
+    """Battle Log 탭별 백필 진행 상황 (중단 후 이어받기용)"""
+    __tablename__ = "backfill_progress"
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    tab = Column(String, primary_key=True)  # rank, casual, custom, hub
+    next_page = Column(Integer, default=1)  # 다음에 가져올 페이지
+    total_pages = Column(Integer, nullable=True)
+    imported = Column(Integer, default=0)  # 지금까지 새로 저장한 매치 수
+    done = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.now)
+
+class PlayerStats(Base):
+    """플레이어별 전적 합계 (수집 트랜잭션에서 함께 갱신, rollups.rebuild_rollups로 재계산)"""
+    __tablename__ = "player_stats"
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    total = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    last_match_date = Column(DateTime, nullable=True)  # 가장 최근 매치
+    last_opponent_name = Column(String, nullable=True)
+    last_opponent_character = Column(String, nullable=True)
+    last_my_character = Column(String, nullable=True)
+
+class OpponentStats(Base):
+    """플레이어 + 상대 유저별 전적 합계"""
+    __tablename__ = "opponent_stats"
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    opponent_name = Column(String, primary_key=True)
+    total = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    last_match_date = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # 상대 목록 검색/정렬용 (기존 DB에는 migrations.py에서 추가)
+        # - 대소문자 무시 접두사 검색 (LIKE 'abc%'는 NOCASE 인덱스가 있어야 범위 검색이 됨)
+        Index("ix_opponent_stats_player_name_nocase", "player_id", opponent_name.collate("NOCASE")),
+        # - 판수 / 마지막 대전 순 정렬 + 같은 값이면 이름순 (커서 페이지네이션)
+        Index("ix_opponent_stats_player_total", "player_id", total.desc(), "opponent_name"),
+        Index("ix_opponent_stats_player_last", "player_id", last_match_date.desc(), "opponent_name"),
+    )
+
+class MatchupStats(Base):
+    """플레이어 + 상대 캐릭터 + 내 캐릭터별 전적 합계"""
+    __tablename__ = "matchup_stats"
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    opponent_character = Column(String, primary_key=True)
+    my_character = Column(String, primary_key=True)
+    total = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    mr_delta = Column(Integer, default=0)  # MR 변화량 합계 (rollups.MR_DELTA_ROWS)
+
+def init_db(bind=None):
+    """데이터베이스 테이블 생성 후, 기존 DB는 스키마 버전에 맞춰 업그레이드"""
+    from migrations import run_migrations
+
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    run_migrations(bind)
 
 def get_db():
     """DB 세션 의존성 주입"""
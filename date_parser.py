@@ -0,0 +1,108 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+# Buckler는 ko-KR / Asia/Seoul 컨텍스트로 접속하므로 시간대 표기가 없는 날짜는 KST로 봅니다.
+KST = timezone(timedelta(hours=9))
+
+_TIME = r"(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?"
+
+# (이름, 미리 컴파일된 패턴). 이름은 detected_format 확인/벤치마크용입니다.
+DATE_PATTERNS = (
+    # 2025/11/23 23:03 (replay_list uploaded_at 변환 결과, Battle Log 기본 표기)
+    ("ymd_slash", re.compile(rf"^(?P<year>\d{{4}})/(?P<month>\d{{1,2}})/(?P<day>\d{{1,2}})\s+{_TIME}$")),
+    # 2025. 11. 23. 오후 2:38:00 / 2025. 11. 23. 14:38:00 (한국어 로캘 toLocaleString)
+    ("korean", re.compile(
+        rf"^(?P<year>\d{{4}})\.\s*(?P<month>\d{{1,2}})\.\s*(?P<day>\d{{1,2}})\.?\s+(?:(?P<ampm>오전|오후)\s*)?{_TIME}$"
+    )),
+    # 11/23/2025 14:38 / 11/23/2025 2:38 PM / 11/23/2025, 2:38:00 PM (영어 로캘)
+    ("us", re.compile(
+        rf"^(?P<month>\d{{1,2}})/(?P<day>\d{{1,2}})/(?P<year>\d{{4}}),?\s+{_TIME}(?:\s*(?P<ampm>AM|PM|am|pm))?$"
+    )),
+    # 2025-11-23 14:38:00 / 2025-11-23T14:38:00.123+09:00 / 2025-11-23T05:38:00Z
+    ("iso", re.compile(
+        rf"^(?P<year>\d{{4}})-(?P<month>\d{{2}})-(?P<day>\d{{2}})[T ]{_TIME}(?:\.\d+)?"
+        r"(?P<tz>Z|[+-]\d{2}:?\d{2})?$"
+    )),
+)
+
+_PM = {"오후", "PM", "pm"}
+_AM = {"오전", "AM", "am"}
+
+
+def _tz_from_text(text, default_tz):
+    if not text:
+        return default_tz
+    if text == "Z":
+        return timezone.utc
+    sign = -1 if text[0] == "-" else 1
+    digits = text[1:].replace(":", "")
+    return timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+
+def _build(found, default_tz):
+    parts = found.groupdict()
+    hour = int(parts["hour"])
+    ampm = parts.get("ampm")
+    if ampm in _PM and hour < 12:
+        hour += 12
+    elif ampm in _AM and hour == 12:
+        hour = 0
+    return datetime(
+        int(parts["year"]), int(parts["month"]), int(parts["day"]),
+        hour, int(parts["minute"]), int(parts["second"] or 0),
+        tzinfo=_tz_from_text(parts.get("tz"), default_tz)
+    )
+
+
+class DateParser:
+    """
+    Battle Log 날짜 문자열 파서.
+    한 번의 수집에서 나오는 날짜는 모두 같은 형식이므로, 처음 맞은 패턴을 기억해 두고 다음 문자열부터 먼저 시도합니다.
+    반환값은 timezone-aware datetime (표기가 없으면 default_tz), 인식할 수 없으면 None.
+    """
+
+    def __init__(self, default_tz=KST):
+        self.default_tz = default_tz
+        self.detected_format = None
+        self._cached = None
+
+    def parse(self, text):
+        if not text:
+            return None
+        text = text.strip()
+
+        if self._cached is not None:
+            found = self._cached.match(text)
+            if found:
+                return self._build_or_none(found)
+
+        for name, pattern in DATE_PATTERNS:
+            if pattern is self._cached:
+                continue
+            found = pattern.match(text)
+            if found:
+                self.detected_format, self._cached = name, pattern
+                return self._build_or_none(found)
+        return None
+
+    def _build_or_none(self, found):
+        try:
+            return _build(found, self.default_tz)
+        except ValueError:
+            # 13월, 25시처럼 패턴은 맞지만 존재하지 않는 날짜
+            return None
+
+
+_default_parser = DateParser()
+
+
+def parse_battlelog_date(text):
+    """모듈 공용 파서로 한 건을 파싱합니다. 여러 건이면 DateParser를 만들어 재사용하세요."""
+    return _default_parser.parse(text)
+
+
+def to_storage(value, tz=KST):
+    """DB(naive DateTime 컬럼)에 저장할 KST 벽시계 시간으로 변환합니다."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(tz).replace(tzinfo=None)
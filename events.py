@@ -0,0 +1,139 @@
+"""
+오버레이/대시보드/통계 페이지로 변경 사항을 밀어주는 Server-Sent Events 브로커.
+수집 트랜잭션이 커밋되면 player / matches / summary 이벤트를 보내고, 연결 유지를 위해 heartbeat를 보냅니다.
+"""
+import asyncio
+import json
+import threading
+import time
+
+from sqlalchemy import event
+
+from data_version import data_version
+from result_cache import result_cache
+
+HEARTBEAT_INTERVAL = 15  # 초
+RETRY_MS = 3000  # 연결이 끊겼을 때 브라우저가 다시 연결하기까지의 시간
+QUEUE_SIZE = 100  # 느린 구독자는 오래된 이벤트부터 버림
+
+
+class EventBroker:
+    """
+    구독자마다 asyncio.Queue를 두고 이벤트를 복사해 넣습니다.
+    publish는 어느 스레드에서 호출해도 되며 (백필/스케줄러 스레드), 실제 전달은 이벤트 루프에서 합니다.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def bind(self, loop):
+        self._loop = loop
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, name, data=None):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        self.published += 1
+        message = {"event": name, "data": data if data is not None else {}, "time": time.time()}
+        try:
+            loop.call_soon_threadsafe(self._fanout, message)
+        except RuntimeError:
+            pass  # 종료 중인 루프
+
+    def _fanout(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for queue in subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def stream(self):
+        """text/event-stream 형식의 문자열을 내보내는 비동기 제너레이터"""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(queue)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            yield format_event("hello", {"heartbeat_interval": HEARTBEAT_INTERVAL})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield format_event("heartbeat", {"time": time.time()})
+                    continue
+                if message is None:
+                    break
+                yield format_event(message["event"], message["data"])
+        finally:
+            with self._lock:
+                self._subscribers.discard(queue)
+
+    def close(self):
+        """서버 종료 시 열린 스트림을 모두 끝냅니다."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+broker = EventBroker()
+
+
+# --- 수집 트랜잭션과 연결 ---
+# collector가 세션에 변경 내용을 기록해 두면, 커밋이 끝난 뒤에만 이벤트를 보냅니다 (롤백되면 버림).
+
+def track_player(db, player):
+    db.info.setdefault("changed_players", {})[player.id] = {
+        "player_id": player.id,
+        "user_code": player.user_code,
+        "name": player.name,
+        "lp": player.lp,
+        "rank": player.rank,
+        "character": player.character,
+    }
+
+
+def track_matches(db, player_id, inserted):
+    if inserted:
+        counts = db.info.setdefault("inserted_matches", {})
+        counts[player_id] = counts.get(player_id, 0) + inserted
+
+
+def install(session_factory, target=broker, version=data_version, cache=result_cache):
+    """
+    session_factory로 만든 세션이 커밋될 때 기록된 변경을 target으로 보내고,
+    데이터 버전(ETag)을 올리고, 바뀐 플레이어의 조회 캐시를 비웁니다.
+    """
+
+    @event.listens_for(session_factory, "after_commit")
+    def publish_committed(session):
+        players = session.info.pop("changed_players", {})
+        inserted = session.info.pop("inserted_matches", {})
+        if players or inserted:
+            cache.invalidate(set(players) | set(inserted))
+            version.bump()
+        for data in players.values():
+            target.publish("player", data)
+        for player_id, count in inserted.items():
+            target.publish("matches", {"player_id": player_id, "new_count": count})
+            target.publish("summary", {"player_id": player_id})
+
+    @event.listens_for(session_factory, "after_rollback")
+    def discard_rolled_back(session):
+        session.info.pop("changed_players", None)
+        session.info.pop("inserted_matches", None)
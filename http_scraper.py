@@ -0,0 +1,234 @@
+import gzip
+import http.client
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+from scraper import (
+    AUTH_FILE,
+    CONTEXT_OPTIONS,
+    TARGET_URL,
+    battlelog_page_result,
+    battlelog_rows_from_props,
+    battlelog_url,
+    file_mtime,
+    first_user_code,
+    matches_from_rows,
+    next_data_props,
+    profile_from_props,
+)
+
+PROFILE_HREF_RE = re.compile(r'href="([^"]*/profile/\d+[^"]*)"')
+MAX_REDIRECTS = 5
+
+
+def load_storage_cookies(path=AUTH_FILE):
+    """Playwright storage state(auth.json)에서 쿠키 목록을 읽습니다."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("cookies", [])
+    except (OSError, json.JSONDecodeError):
+        return []
+
+
+def cookie_header(cookies, url, now=None):
+    """요청 URL의 도메인/경로/scheme에 해당하는 쿠키만 골라 Cookie 헤더 값을 만듭니다."""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    path = parts.path or "/"
+    now = time.time() if now is None else now
+
+    pairs = []
+    for cookie in cookies:
+        domain = (cookie.get("domain") or "").lstrip(".")
+        if domain and host != domain and not host.endswith("." + domain):
+            continue
+        if not path.startswith(cookie.get("path") or "/"):
+            continue
+        if cookie.get("secure") and parts.scheme != "https":
+            continue
+        expires = cookie.get("expires", -1)
+        if expires not in (None, -1) and expires < now:
+            continue
+        pairs.append(f"{cookie['name']}={cookie['value']}")
+    return "; ".join(pairs)
+
+
+class HttpConnectionPool:
+    """
+    (scheme, host, port)별로 keep-alive 연결을 재사용하는 작은 연결 풀.
+    응답 본문을 끝까지 읽은 연결만 풀로 돌려보냅니다.
+    """
+
+    def __init__(self, maxsize=4, timeout=15):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.created = 0
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        conn, reused = self._checkout(key)
+        try:
+            conn.request(method, target, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            # 서버가 닫아버린 keep-alive 연결이면 새 연결로 한 번 더 시도
+            conn, _ = self._checkout(key, fresh=True)
+            conn.request(method, target, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        return response.status, response.headers, body
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _checkout(self, key, fresh=False):
+        if not fresh:
+            with self._lock:
+                conns = self._idle.get(key)
+                if conns:
+                    return conns.pop(), True
+
+        scheme, host, port = key
+        conn_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.created += 1
+        return conn_class(host, port, timeout=self.timeout), False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.maxsize:
+                conns.append(conn)
+                return
+        conn.close()
+
+
+class HttpScraper:
+    """
+    브라우저 없이 auth.json의 쿠키로 Buckler 페이지를 요청하고 __NEXT_DATA__만 파싱하는 백엔드.
+    403 응답이나 error-system 리다이렉트처럼 브라우저가 필요한 상황에서는
+    HTTP_FALLBACK 예외를 던져 호출 측(Scraper)이 브라우저 경로로 넘어가게 합니다.
+    """
+
+    def __init__(self, auth_file=AUTH_FILE, base_url=TARGET_URL, pool=None):
+        self.auth_file = auth_file
+        self.base_url = base_url.rstrip("/")
+        self.pool = pool or HttpConnectionPool()
+        self._cookies = []
+        self._auth_mtime = None
+
+    def close(self):
+        self.pool.close()
+
+    def fetch(self, url):
+        """리다이렉트를 따라가며 페이지를 가져오고 (최종 URL, HTML)을 반환합니다."""
+        for _ in range(MAX_REDIRECTS + 1):
+            if "error-system" in url:
+                raise Exception(f"HTTP_FALLBACK: Redirected to system error page ({url})")
+
+            status, headers, body = self.pool.request("GET", url, self._headers(url))
+            if status in (301, 302, 303, 307, 308) and headers.get("Location"):
+                url = urljoin(url, headers["Location"])
+                continue
+            if status == 403:
+                raise Exception(f"HTTP_FALLBACK: 403 Forbidden ({url})")
+            if status != 200:
+                raise Exception(f"HTTP_FALLBACK: Unexpected status {status} ({url})")
+
+            if headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return url, body.decode("utf-8", errors="replace")
+
+        raise Exception(f"HTTP_FALLBACK: Too many redirects ({url})")
+
+    def fetch_props(self, url):
+        _, body = self.fetch(url)
+        props = next_data_props(body)
+        if props.get("common", {}).get("statusCode") == 403:
+            raise Exception(f"HTTP_FALLBACK: Buckler returned statusCode 403 ({url})")
+        return props, body
+
+    def find_user_code(self):
+        _, body = self.fetch(self.base_url)
+        user_code = first_user_code(PROFILE_HREF_RE.findall(body))
+        if user_code:
+            return user_code
+        raise Exception("HTTP_FALLBACK: User Code link not found on landing page")
+
+    def get_stats(self, user_code=None):
+        if not user_code or user_code == "unknown_code":
+            user_code = self.find_user_code()
+
+        props, _ = self.fetch_props(f"{self.base_url}/ko-kr/profile/{user_code}")
+        if not props.get("fighter_banner_info"):
+            raise Exception("HTTP_FALLBACK: fighter_banner_info not found")
+        return profile_from_props(props, user_code)
+
+    def get_match_history(self, user_code, my_name=None, limit=20, stop_at=None):
+        props, _ = self.fetch_props(battlelog_url(user_code, "rank", 1, self.base_url))
+        rows = battlelog_rows_from_props(props)
+        if rows is None:
+            raise Exception("HTTP_FALLBACK: replay_list not found")
+
+        matches, _ = matches_from_rows(rows, my_name, user_code, limit, stop_at, source="HttpScraper")
+        return matches
+
+    def fetch_battlelog_page(self, user_code, my_name, tab, page_no, before_request=None):
+        if before_request:
+            before_request()
+        props, _ = self.fetch_props(battlelog_url(user_code, tab, page_no, self.base_url))
+        return battlelog_page_result(props, page_no, my_name, user_code)
+
+    def fetch_battlelog_pages(self, user_code, my_name, tab, page_numbers, before_request=None):
+        """여러 페이지를 연결 풀 크기만큼 병렬로 가져옵니다."""
+        with ThreadPoolExecutor(max_workers=max(1, min(len(page_numbers), self.pool.maxsize))) as executor:
+            return list(executor.map(
+                lambda n: self.fetch_battlelog_page(user_code, my_name, tab, n, before_request),
+                page_numbers
+            ))
+
+    def collect(self, user_code=None, limit=20, stop_at=None):
+        player = self.get_stats(user_code)
+        matches = self.get_match_history(player["user_code"], player["name"], limit, stop_at)
+        return {"player": player, "matches": matches}
+
+    def _headers(self, url):
+        mtime = file_mtime(self.auth_file)
+        if mtime != self._auth_mtime:
+            self._cookies = load_storage_cookies(self.auth_file)
+            self._auth_mtime = mtime
+
+        headers = {
+            "User-Agent": CONTEXT_OPTIONS["user_agent"],
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "ko-KR,ko;q=0.9",
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+        }
+        cookies = cookie_header(self._cookies, url)
+        if cookies:
+            headers["Cookie"] = cookies
+        return headers
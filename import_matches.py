@@ -0,0 +1,66 @@
+"""
+대전 기록 가져오기 CLI. 서버와 같은 폴더(sf6viewer.db가 있는 곳)에서 실행하세요.
+
+    python import_matches.py export.ndjson [--user-code 1234567890]
+    python import_matches.py export.csv --user-code 1234567890
+    python import_matches.py old/sf6viewer.db
+"""
+import argparse
+import json
+import os
+import sys
+
+from database import init_db
+from match_import import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, MAX_IMPORT_CHUNK_SIZE, ImportJob
+
+USER_CONFIG_FILE = "user_config.json"
+
+
+def configured_user_code():
+    if os.path.exists(USER_CONFIG_FILE):
+        with open(USER_CONFIG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("user_code")
+    return None
+
+
+def print_progress(status):
+    print(f"\r[Import] 읽음 {status['read']:,} / 추가 {status['inserted']:,} / 중복 {status['skipped']:,} "
+          f"/ 오류 {status['invalid']:,}", end="", flush=True)
+
+
+def chunk_size(value):
+    size = int(value)
+    if not 1 <= size <= MAX_IMPORT_CHUNK_SIZE:
+        raise argparse.ArgumentTypeError(f"1 ~ {MAX_IMPORT_CHUNK_SIZE} 사이여야 합니다")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NDJSON/CSV 내보내기 파일 또는 다른 sf6viewer.db에서 대전 기록을 가져옵니다.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="생략하면 확장자/파일 내용으로 판단")
+    parser.add_argument("--user-code", help="NDJSON/CSV 기록을 저장할 플레이어 (기본: user_config.json의 user_code)")
+    parser.add_argument("--chunk-size", type=chunk_size, default=IMPORT_CHUNK_SIZE,
+                        help=f"한 트랜잭션에 저장할 행 수 (최대 {MAX_IMPORT_CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    init_db()
+    try:
+        job = ImportJob(args.path, args.format, args.user_code or configured_user_code(),
+                        chunk_size=args.chunk_size, on_progress=print_progress)
+    except (OSError, ValueError) as e:
+        raise SystemExit(str(e))
+
+    status = job.run()
+    print()
+    for error in status["errors"]:
+        print(f"  ⚠️ {error}")
+    print(f"[Import] {status['status']}: {status['inserted']:,}개 추가, {status['skipped']:,}개 중복, "
+          f"{status['invalid']:,}개 건너뜀 ({status['chunks']} chunks)")
+    if status["status"] == "error":
+        print(f"  {status['error']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,36 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from database import get_db, init_db, Player, Match, engine, Base
-from scraper import Scraper, AUTH_FILE
+from typing import Optional
+from database import (
+    get_db, init_db, Player, Match, CollectCursor, BackfillProgress, SessionLocal, engine, Base,
+    PlayerStats, OpponentStats, MatchupStats,
+    STORAGE_PROFILES, DEFAULT_STORAGE_PROFILE, OPTIMIZE_INTERVAL, configure_storage, optimize_database, storage_status
+)
+from backfill import BackfillJob, DEFAULT_CONCURRENCY, DEFAULT_REQUESTS_PER_SECOND
+from async_scraper import AsyncScraper
+from collector import collect_player_matches_async, upsert_player
+from data_version import data_version, etag_matches
+from events import broker, install as install_events
+from result_cache import result_cache
+from opponent_directory import DEFAULT_PAGE_SIZE, search_opponents
+import match_history
+from mr_history import MAX_POINTS, downsample_mr_history
+from matchup_matrix import matchup_matrix
+from analytics import DEFAULT_SESSION_GAP, DEFAULT_SESSION_LIMIT, detect_sessions, performance
+from match_import import IMPORT_CHUNK_SIZE, MAX_IMPORT_CHUNK_SIZE, ImportJob
+from rollups import clear_rollups, rebuild_rollups
+from scheduler import (
+    ScrapeScheduler,
+    DEFAULT_CONCURRENCY as SCHEDULER_CONCURRENCY,
+    DEFAULT_INTERVAL as SCHEDULER_INTERVAL,
+    DEFAULT_MAX_INTERVAL as SCHEDULER_MAX_INTERVAL
+)
+from scraper import Scraper, AUTH_FILE, BATTLELOG_TABS, DEFAULT_POOL_SIZE, DEFAULT_IDLE_TIMEOUT, SCRAPER_BACKENDS
+import asyncio
 import os
+import tempfile
 import threading
 import webbrowser
 from datetime import datetime
@@ -41,10 +67,27 @@ async def get_overlay():
     """오버레이 HTML 페이지 반환"""
     return FileResponse(resource_path("static/overlay.html"))
 
+def not_modified(request, response, *parts):
+    """
+    폴링 엔드포인트의 조건부 GET 처리.
+    If-None-Match가 현재 ETag(데이터 버전 + 경로/쿼리 + parts)와 같으면 DB를 읽지 않고 돌려줄 304 응답을,
+    아니면 None을 반환하고 response에 ETag를 붙입니다.
+    """
+    etag = data_version.etag(request.url.path, sorted(request.query_params.multi_items()), *parts)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 @app.get("/api/status")
-async def get_status(db: Session = Depends(get_db)):
+async def get_status(request: Request, response: Response, db: Session = Depends(get_db)):
     """시스템 상태 및 최신 플레이어 데이터 반환"""
     auth_exists = os.path.exists(AUTH_FILE)
+    # 로그인 세션 파일은 DB 밖에서 바뀌므로 수정 시각도 ETag에 포함
+    cached = not_modified(request, response, os.path.getmtime(AUTH_FILE) if auth_exists else None)
+    if cached:
+        return cached
     
     # DB 연결 확인 및 최신 데이터 조회
     try:
@@ -70,23 +113,32 @@ async def get_status(db: Session = Depends(get_db)):
     }
 
 @app.post("/api/login")
-async def trigger_login(background_tasks: BackgroundTasks):
-    """백그라운드에서 로그인 프로세스 시작"""
-    def run_login():
-        # 별도 스레드에서 실행하여 서버 블로킹 방지
-        scraper.login_and_save_state()
-    
-    background_tasks.add_task(run_login)
+async def trigger_login():
+    """로그인 브라우저를 이벤트 루프의 태스크로 띄웁니다 (LOGIN_TIMEOUT 후 자동 종료, 서버 종료 시 취소)"""
+    if async_scraper.login_running():
+        return {"message": "Login browser is already open"}
+    async_scraper.start_login()
     return {"message": "Login browser launching..."}
 
 @app.get("/api/stats")
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(request: Request, response: Response, db: Session = Depends(get_db), player_id: Optional[int] = None):
     """
     최신 통계 반환.
-    DB에서 가장 최근 업데이트된 플레이어 정보를 가져옵니다.
+    player_id가 없으면 설정된 내 플레이어, 그것도 없으면 가장 최근 업데이트된 플레이어 정보를 가져옵니다.
     없으면 더미 데이터를 반환합니다.
     """
-    player = db.query(Player).order_by(Player.last_updated.desc()).first()
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    player_id = resolve_player_id(db, player_id)
+    return result_cache.get_or_compute("stats", (player_id,), player_id, lambda: player_profile(db, player_id))
+
+def player_profile(db, player_id):
+    """get_stats의 계산 부분 (결과는 result_cache에 보관)"""
+    if player_id is not None:
+        player = db.get(Player, player_id)
+    else:
+        player = db.query(Player).order_by(Player.last_updated.desc()).first()
     
     if player:
         return {
@@ -108,6 +160,7 @@ async def get_stats(db: Session = Depends(get_db)):
 import json
 
 USER_CONFIG_FILE = "user_config.json"
+AUTO_COLLECT_INTERVAL = 30  # 새 매치 직후의 내 플레이어 수집 주기 (초)
 
 def load_user_config():
     if os.path.exists(USER_CONFIG_FILE):
@@ -121,6 +174,128 @@ def load_user_config():
 def save_user_config(config):
     with open(USER_CONFIG_FILE, "w", encoding="utf-8") as f:
         json.dump(config, f, indent=4)
+    # user_code 등은 통계 조회 범위를 바꾸므로 ETag도 새로 만듦
+    data_version.bump()
+
+def resolve_player_id(db, player_id=None):
+    """
+    통계 조회 범위가 될 플레이어 id.
+    지정하지 않으면 설정된 내 user_code의 플레이어를 사용합니다 (DB에 없으면 전체 범위 = None).
+    """
+    if player_id is not None:
+        return player_id
+    user_code = load_user_config().get("user_code")
+    if not user_code:
+        return None
+    # 플레이어 행은 수집 커밋 때만 생기므로 전체 범위(None) 항목으로 캐시 -> 다음 수집 때 무효화
+    return result_cache.get_or_compute("resolve_player_id", (user_code,), None, lambda: player_id_for(db, user_code))
+
+def player_id_for(db, user_code):
+    player = db.query(Player.id).filter(Player.user_code == user_code).first()
+    return player.id if player else None
+
+def scoped(query, player_id):
+    return query.filter(Match.player_id == player_id) if player_id is not None else query
+
+def scoped_stats(query, model, player_id):
+    return query.filter(model.player_id == player_id) if player_id is not None else query
+
+def tracked_players(config):
+    """다른 스트리머/라이벌 등 추가로 추적하는 플레이어 목록"""
+    return config.get("tracked_players", [])
+
+def auto_collect_config(config):
+    settings = config.get("auto_collect", {})
+    return {
+        "enabled": bool(settings.get("enabled", False)),
+        "interval": settings.get("interval", AUTO_COLLECT_INTERVAL),
+        "max_interval": settings.get("max_interval", SCHEDULER_MAX_INTERVAL)
+    }
+
+def scheduled_players(config):
+    """스케줄러가 수집할 전체 목록: 추적 플레이어 + (자동 수집이 켜져 있으면) 내 플레이어"""
+    players = list(tracked_players(config))
+    settings = auto_collect_config(config)
+    user_code = config.get("user_code")
+    if settings["enabled"] and user_code and all(p["user_code"] != user_code for p in players):
+        players.append({"user_code": user_code, "interval": settings["interval"], "max_interval": settings["max_interval"]})
+    return players
+
+async def collect_tracked_player(user_code):
+    # 스케줄러 태스크에서 실행되므로 요청과 별개의 세션을 사용
+    return await collect_player_matches_async(SessionLocal, async_scraper, user_code=user_code, limit=20)
+
+def publish_collector_status(user_code=None):
+    broker.publish("collector", auto_collect_status(load_user_config()))
+
+async_scraper = AsyncScraper(scraper)
+scheduler = ScrapeScheduler(collect_tracked_player, on_run=publish_collector_status)
+
+# 수집 트랜잭션이 커밋되면 /api/events 구독자에게 player/matches/summary 이벤트 전송
+install_events(SessionLocal)
+
+def browser_pool_config(config):
+    return {
+        "browser_pool_size": config.get("browser_pool_size", DEFAULT_POOL_SIZE),
+        "browser_idle_timeout": config.get("browser_idle_timeout", DEFAULT_IDLE_TIMEOUT)
+    }
+
+@app.on_event("startup")
+def configure_scraper():
+    config = load_user_config()
+    settings = browser_pool_config(config)
+    scraper.configure_pool(
+        pool_size=settings["browser_pool_size"],
+        idle_timeout=settings["browser_idle_timeout"]
+    )
+    scraper.configure_backend(config.get("scraper_backend", "browser"))
+    scraper.configure_navigation(config.get("fast_navigation", True))
+
+storage_maintenance_task = None
+
+async def optimize_periodically():
+    while True:
+        await asyncio.sleep(OPTIMIZE_INTERVAL)
+        try:
+            await asyncio.to_thread(optimize_database)
+        except Exception as e:
+            print(f"⚠️ [DB] PRAGMA optimize 실패: {e}")
+
+@app.on_event("startup")
+async def start_storage_maintenance():
+    global storage_maintenance_task
+    configure_storage(load_user_config().get("storage_profile", DEFAULT_STORAGE_PROFILE))
+    storage_maintenance_task = asyncio.get_running_loop().create_task(optimize_periodically())
+
+@app.on_event("shutdown")
+async def stop_storage_maintenance():
+    if storage_maintenance_task is not None:
+        storage_maintenance_task.cancel()
+    optimize_database()
+
+@app.on_event("startup")
+async def start_event_broker():
+    broker.bind(asyncio.get_running_loop())
+
+@app.on_event("shutdown")
+async def stop_event_broker():
+    broker.close()
+
+@app.on_event("startup")
+async def start_scheduler():
+    config = load_user_config()
+    scheduler.configure(concurrency=config.get("scrape_concurrency", SCHEDULER_CONCURRENCY))
+    scheduler.set_players(scheduled_players(config))
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    await scheduler.stop()
+
+@app.on_event("shutdown")
+async def close_scraper():
+    await async_scraper.close()
+    scraper.close()
 
 @app.get("/api/config/user_code")
 def get_user_code_config():
@@ -128,11 +303,13 @@ def get_user_code_config():
     return {"user_code": config.get("user_code", "")}
 
 @app.post("/api/config/user_code")
-def set_user_code_config(data: dict):
+async def set_user_code_config(data: dict):
     user_code = data.get("user_code")
     config = load_user_config()
     config["user_code"] = user_code
     save_user_config(config)
+    result_cache.invalidate()  # 기본 조회 범위(내 플레이어)가 바뀜
+    scheduler.set_players(scheduled_players(config))
     return {"status": "success", "user_code": user_code}
 
 from fastapi import Request
@@ -153,11 +330,193 @@ def set_bg_image_config(data: dict):
     if "bg_opacity" in data:
         config["bg_opacity"] = data["bg_opacity"]
     save_user_config(config)
-    return {
-        "status": "success",
+    result = {
         "bg_image": config.get("bg_image", ""),
         "bg_opacity": config.get("bg_opacity", 100)
     }
+    broker.publish("config", result)
+    return {"status": "success", **result}
+
+@app.get("/api/players")
+def get_tracked_players(db: Session = Depends(get_db)):
+    """추적 중인 플레이어 목록과 스케줄러 상태"""
+    config = load_user_config()
+    players = []
+    for entry in tracked_players(config):
+        player = db.query(Player).filter(Player.user_code == entry["user_code"]).first()
+        players.append({
+            "user_code": entry["user_code"],
+            "interval": entry.get("interval", SCHEDULER_INTERVAL),
+            "max_interval": entry.get("max_interval", SCHEDULER_MAX_INTERVAL),
+            "player_id": player.id if player else None,
+            "name": player.name if player else None
+        })
+    return {
+        "players": players,
+        "scrape_concurrency": scheduler.concurrency,
+        "scheduler": scheduler.status()
+    }
+
+@app.post("/api/players")
+async def add_tracked_player(data: dict):
+    """
+    추적할 플레이어 등록 (이미 있으면 수집 주기만 변경)
+    스케줄러의 큐/Event는 이벤트 루프 전용이므로, 스케줄러를 바꾸는 엔드포인트는 모두 async로 루프에서 실행합니다.
+    """
+    user_code = str(data.get("user_code") or "").strip()
+    if not user_code.isdigit():
+        raise HTTPException(status_code=400, detail="user_code must be a numeric Buckler user code")
+    interval = max(10, int(data.get("interval", SCHEDULER_INTERVAL)))
+    max_interval = max(interval, int(data.get("max_interval", SCHEDULER_MAX_INTERVAL)))
+
+    config = load_user_config()
+    players = [p for p in tracked_players(config) if p["user_code"] != user_code]
+    players.append({"user_code": user_code, "interval": interval, "max_interval": max_interval})
+    config["tracked_players"] = players
+    save_user_config(config)
+
+    scheduler.set_players(scheduled_players(config))
+    return {"status": "success", "user_code": user_code, "interval": interval, "max_interval": max_interval}
+
+@app.delete("/api/players/{user_code}")
+async def remove_tracked_player(user_code: str):
+    config = load_user_config()
+    config["tracked_players"] = [p for p in tracked_players(config) if p["user_code"] != user_code]
+    save_user_config(config)
+
+    scheduler.set_players(scheduled_players(config))
+    return {"status": "success", "user_code": user_code}
+
+def auto_collect_status(config):
+    user_code = config.get("user_code")
+    entry = next((p for p in scheduler.status()["players"] if p["user_code"] == user_code), None)
+    return {**auto_collect_config(config), "user_code": user_code, "scheduler_running": scheduler.is_running(), "player": entry}
+
+@app.get("/api/auto_collect/status")
+def get_auto_collect_status():
+    """서버 스케줄러가 내 플레이어를 자동 수집 중인지, 현재 주기와 마지막 결과"""
+    return auto_collect_status(load_user_config())
+
+@app.post("/api/auto_collect/start")
+async def start_auto_collect(data: dict = None):
+    """
+    내 플레이어 자동 수집 시작. 브라우저 탭이 닫혀도 서버에서 계속 수집하며 재시작 후에도 유지됩니다.
+    interval: 새 매치 직후의 주기, max_interval: 변화가 없을 때 늘어나는 주기의 상한
+    """
+    data = data or {}
+    config = load_user_config()
+    if not config.get("user_code"):
+        raise HTTPException(status_code=400, detail="User Code is not configured")
+
+    settings = auto_collect_config(config)
+    interval = max(10, int(data.get("interval", settings["interval"])))
+    max_interval = max(interval, int(data.get("max_interval", settings["max_interval"])))
+    config["auto_collect"] = {"enabled": True, "interval": interval, "max_interval": max_interval}
+    save_user_config(config)
+
+    scheduler.set_players(scheduled_players(config))
+    publish_collector_status()
+    return auto_collect_status(config)
+
+@app.post("/api/auto_collect/stop")
+async def stop_auto_collect():
+    config = load_user_config()
+    config["auto_collect"] = {**auto_collect_config(config), "enabled": False}
+    save_user_config(config)
+
+    scheduler.set_players(scheduled_players(config))
+    publish_collector_status()
+    return auto_collect_status(config)
+
+@app.post("/api/config/scrape_concurrency")
+async def set_scrape_concurrency(data: dict):
+    """동시에 수집할 수 있는 플레이어 수"""
+    concurrency = max(1, int(data.get("scrape_concurrency", SCHEDULER_CONCURRENCY)))
+    config = load_user_config()
+    config["scrape_concurrency"] = concurrency
+    save_user_config(config)
+    scheduler.configure(concurrency=concurrency)
+    return {"status": "success", "scrape_concurrency": concurrency}
+
+@app.get("/api/config/browser_pool")
+async def get_browser_pool_config():
+    """
+    browser_pool_size는 브라우저 스택마다 따로 적용됩니다.
+    status: 백필용 동기 BrowserPool의 워커 수 / async_status: 새로고침·자동 수집·로그인용 AsyncScraper의 페이지 수
+    (둘이 동시에 돌면 Chromium 페이지는 최대 2 × browser_pool_size개까지 열릴 수 있음)
+    AsyncScraper 상태는 이벤트 루프의 객체이므로 async 엔드포인트에서 읽습니다.
+    """
+    return {
+        **browser_pool_config(load_user_config()),
+        "status": scraper.pool.stats(),
+        "async_status": async_scraper.stats(),
+    }
+
+@app.post("/api/config/browser_pool")
+def set_browser_pool_config(data: dict):
+    config = load_user_config()
+    if "browser_pool_size" in data:
+        config["browser_pool_size"] = max(1, int(data["browser_pool_size"]))
+    if "browser_idle_timeout" in data:
+        config["browser_idle_timeout"] = max(0, int(data["browser_idle_timeout"]))
+    save_user_config(config)
+
+    settings = browser_pool_config(config)
+    scraper.configure_pool(
+        pool_size=settings["browser_pool_size"],
+        idle_timeout=settings["browser_idle_timeout"]
+    )
+    return {"status": "success", **settings}
+
+@app.get("/api/config/scraper_backend")
+def get_scraper_backend_config():
+    return {"scraper_backend": scraper.backend, "available": list(SCRAPER_BACKENDS)}
+
+@app.post("/api/config/scraper_backend")
+def set_scraper_backend_config(data: dict):
+    backend = data.get("scraper_backend")
+    if backend not in SCRAPER_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"scraper_backend must be one of {list(SCRAPER_BACKENDS)}")
+
+    config = load_user_config()
+    config["scraper_backend"] = backend
+    save_user_config(config)
+    scraper.configure_backend(backend)
+    return {"status": "success", "scraper_backend": backend}
+
+@app.get("/api/config/storage_profile")
+def get_storage_profile_config():
+    return {**storage_status(), "available": list(STORAGE_PROFILES)}
+
+@app.post("/api/config/storage_profile")
+def set_storage_profile_config(data: dict):
+    """SQLite 연결 설정 (performance: WAL 등 / compat: 기존 rollback journal)"""
+    profile = data.get("storage_profile", DEFAULT_STORAGE_PROFILE)
+    if profile not in STORAGE_PROFILES:
+        raise HTTPException(status_code=400, detail=f"storage_profile must be one of {list(STORAGE_PROFILES)}")
+
+    config = load_user_config()
+    config["storage_profile"] = profile
+    save_user_config(config)
+    configure_storage(profile)
+    return {"status": "success", **storage_status()}
+
+@app.get("/api/config/fast_navigation")
+def get_fast_navigation_config():
+    return {"fast_navigation": scraper.pool.fast_navigation}
+
+@app.post("/api/config/fast_navigation")
+def set_fast_navigation_config(data: dict):
+    config = load_user_config()
+    config["fast_navigation"] = bool(data.get("fast_navigation", True))
+    save_user_config(config)
+    scraper.configure_navigation(config["fast_navigation"])
+    return {"status": "success", "fast_navigation": config["fast_navigation"]}
+
+@app.get("/api/scraper/timings")
+def get_scraper_timings():
+    """페이지 이동별 소요 시간 (fast / networkidle 모드 비교용)"""
+    return scraper.navigation_stats()
 
 @app.post("/api/upload_bg_raw")
 async def upload_bg_raw(request: Request):
@@ -170,6 +529,7 @@ async def upload_bg_raw(request: Request):
         config = load_user_config()
         config["bg_image"] = "/api/custom_bg"
         save_user_config(config)
+        broker.publish("config", {"bg_image": "/api/custom_bg", "bg_opacity": config.get("bg_opacity", 100)})
         
         return {"status": "success", "bg_image": "/api/custom_bg"}
     except Exception as e:
@@ -182,8 +542,32 @@ def get_custom_bg():
     raise HTTPException(status_code=404, detail="No custom background found")
 
 
+@app.get("/api/events")
+async def event_stream():
+    """
+    Server-Sent Events 스트림. 수집이 커밋될 때 player / matches / summary 이벤트,
+    자동 수집 상태(collector), 배경 설정(config), DB 삭제(reset), 그리고 HEARTBEAT_INTERVAL마다 heartbeat를 보냅니다.
+    """
+    return StreamingResponse(
+        broker.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def scrape_error_status(error_msg):
+    if "AUTH_ERROR" in error_msg:
+        return 401
+    if "TIMEOUT_ERROR" in error_msg:
+        return 504
+    return 500
+
+def save_player(data):
+    with SessionLocal() as db:
+        upsert_player(db, data)
+        db.commit()
+
 @app.post("/api/refresh")
-def refresh_stats(db: Session = Depends(get_db)):
+async def refresh_stats():
     """
     스크래핑을 트리거하여 DB를 업데이트합니다.
     """
@@ -191,317 +575,481 @@ def refresh_stats(db: Session = Depends(get_db)):
         config = load_user_config()
         user_code_config = config.get("user_code")
         
-        data = scraper.get_stats(user_code=user_code_config)
+        data = await async_scraper.get_stats(user_code=user_code_config)
         if data:
-            user_code = data.get("user_code", "unknown_code")
-            
-            # DB 업데이트 로직 (Upsert)
-            player = db.query(Player).filter(Player.user_code == user_code).first()
-            
-            if player:
-                # 기존 플레이어 업데이트
-                player.name = data.get("name")
-                player.lp = data.get("lp")
-                player.rank = data.get("rank")
-                player.character = data.get("character")
-                player.last_updated = datetime.now()
-            else:
-                # 새 플레이어 생성
-                player = Player(
-                    user_code=user_code,
-                    name=data.get("name"),
-                    lp=data.get("lp"),
-                    rank=data.get("rank"),
-                    character=data.get("character")
-                )
-                db.add(player)
-            
-            db.commit()
+            # DB 업데이트 로직 (Upsert) - 쓰기 잠금을 기다릴 수 있으므로 이벤트 루프 밖에서
+            await asyncio.to_thread(save_player, data)
             return {"status": "success", "data": data}
         else:
             raise HTTPException(status_code=500, detail="Scraping failed or not logged in")
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
-        if "AUTH_ERROR" in error_msg:
-            raise HTTPException(status_code=401, detail=error_msg)
-        raise HTTPException(status_code=500, detail=error_msg)
+        raise HTTPException(status_code=scrape_error_status(error_msg), detail=error_msg)
 
 @app.post("/api/collect_matches")
-def collect_matches(db: Session = Depends(get_db), limit: int = 20):
+async def collect_matches(limit: int = 20):
     """
     대전 기록을 수집하여 DB에 저장합니다.
     limit: 가져올 매치 수 (자동 수집 시 1, 수동 시 20)
+    이전 수집 위치(cursor)에 도달하면 더 읽지 않습니다.
     """
     try:
-        # 먼저 플레이어 정보 가져오기
         config = load_user_config()
-        user_code_config = config.get("user_code")
-        
-        player_data = scraper.get_stats(user_code=user_code_config)
-        if not player_data:
-            raise HTTPException(status_code=500, detail="Failed to get player data")
-        
-        user_code = player_data.get("user_code")
-        
-        # 플레이어 찾기 또는 생성
-        player = db.query(Player).filter(Player.user_code == user_code).first()
-        if not player:
-            player = Player(
-                user_code=user_code,
-                name=player_data.get("name"),
-                lp=player_data.get("lp"),
-                rank=player_data.get("rank"),
-                character=player_data.get("character")
-            )
-            db.add(player)
-        else:
-            # 기존 플레이어 정보도 최신으로 업데이트
-            player.name = player_data.get("name")
-            player.lp = player_data.get("lp")
-            player.rank = player_data.get("rank")
-            player.character = player_data.get("character")
-            player.last_updated = datetime.now()
-            
-        db.commit()
-        db.refresh(player)
-        
-        # 대전 기록 수집 (내 이름 전달)
-        my_name = player_data.get("name")
-        matches = scraper.get_match_history(user_code, my_name=my_name, limit=limit)
-        
-        if not matches:
-            return {"status": "success", "message": "No new matches found", "count": 0}
-        
-        # DB에 저장 (중복 체크: 상대이름+캐릭터+결과+MR/LP로 판단)
-        new_count = 0
-        for match in matches:
-            # 날짜 파싱 - 여러 형식 시도
-            match_datetime = None
-            date_formats = [
-                "%Y/%m/%d %H:%M",      # 요청된 포맷: 2025/11/23 23:03
-                "%m/%d/%Y %H:%M",      # 기존 포맷: 11/23/2025 14:38
-                "%Y. %m. %d. %p %I:%M:%S", # 한국어 포맷: 2025. 11. 23. 오후 2:38:00
-                "%Y. %m. %d. %H:%M:%S",    # 한국어 포맷: 2025. 11. 23. 14:38:00
-                "%Y-%m-%d %H:%M:%S"        # ISO 포맷
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    match_datetime = datetime.strptime(match["date"], fmt)
-                    # print(f"날짜 파싱 성공: {match['date']} -> {match_datetime}")
-                    break
-                except ValueError:
-                    continue
-            
-            if not match_datetime:
-                print(f"⚠️ 날짜 파싱 실패: {match['date']} -> 현재 시간으로 대체")
-                match_datetime = datetime.now()
-            
-            # 중복 체크: 상대 이름, 캐릭터, 결과, MR/LP가 모두 같으면 중복으로 간주
-            existing = db.query(Match).filter(
-                Match.player_id == player.id,
-                Match.opponent_name == match["opponent_name"],
-                Match.opponent_character == match["opponent_character"],
-                Match.result == match["result"],
-                Match.my_mr == match["my_mr"],
-                Match.my_lp == match["my_lp"]
-            ).first()
-            
-            if not existing:
-                new_match = Match(
-                    player_id=player.id,
-                    opponent_name=match["opponent_name"],
-                    opponent_character=match["opponent_character"],
-                    opponent_mr=match["opponent_mr"],
-                    opponent_lp=match["opponent_lp"],
-                    my_character=match["my_character"],
-                    my_mr=match["my_mr"],
-                    my_lp=match["my_lp"],
-                    result=match["result"],
-                    match_date=match_datetime
-                )
-                db.add(new_match)
-                new_count += 1
-        
-        db.commit()
-        
-        return {
-            "status": "success",
-            "message": f"Collected {new_count} new matches out of {len(matches)} total",
-            "new_count": new_count,
-            "total_scraped": len(matches)
-        }
-        
+        return await collect_player_matches_async(SessionLocal, async_scraper, user_code=config.get("user_code"),
+                                                  limit=limit)
     except Exception as e:
         error_msg = str(e)
-        if "AUTH_ERROR" in error_msg:
-            raise HTTPException(status_code=401, detail=error_msg)
-        raise HTTPException(status_code=500, detail=error_msg)
+        raise HTTPException(status_code=scrape_error_status(error_msg), detail=error_msg)
+
+backfill_job = None
+
+@app.post("/api/backfill")
+def start_backfill(concurrency: int = DEFAULT_CONCURRENCY, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                   tabs: str = ",".join(BATTLELOG_TABS), restart: bool = False):
+    """
+    Battle Log 전체(탭/페이지)를 거슬러 올라가며 과거 대전 기록을 가져옵니다.
+    중단되었던 작업은 마지막으로 저장한 페이지부터 이어서 진행합니다. (restart=true면 처음부터)
+    """
+    global backfill_job
+    if backfill_job and backfill_job.is_running():
+        raise HTTPException(status_code=409, detail="Backfill is already running")
+
+    user_code = load_user_config().get("user_code")
+    if not user_code:
+        raise HTTPException(status_code=400, detail="user_code is not configured")
+
+    selected_tabs = [t for t in tabs.split(",") if t in BATTLELOG_TABS]
+    if not selected_tabs:
+        raise HTTPException(status_code=400, detail=f"tabs must be a subset of {list(BATTLELOG_TABS)}")
+
+    backfill_job = BackfillJob(
+        scraper,
+        user_code,
+        tabs=selected_tabs,
+        concurrency=concurrency,
+        requests_per_second=requests_per_second,
+        restart=restart
+    )
+    backfill_job.start()
+    return {"status": "started", "backfill": backfill_job.status()}
+
+@app.get("/api/backfill/status")
+def get_backfill_status():
+    if not backfill_job:
+        return {"status": "idle"}
+    return backfill_job.status()
+
+@app.post("/api/backfill/stop")
+def stop_backfill():
+    if not backfill_job or not backfill_job.is_running():
+        return {"status": "idle"}
+    backfill_job.stop()
+    return {"status": "stopping"}
+
+import_job = None
+
+@app.post("/api/import")
+async def start_import(request: Request, format: Optional[str] = None, user_code: Optional[str] = None,
+                       chunk_size: int = Query(IMPORT_CHUNK_SIZE, ge=1, le=MAX_IMPORT_CHUNK_SIZE)):
+    """
+    대전 기록 가져오기 (NDJSON / CSV 내보내기 파일 또는 다른 sf6viewer.db).
+    파일은 요청 본문(raw binary)으로만 받습니다. 서버가 0.0.0.0에 열려 있으므로 서버 PC의 경로는 받지 않습니다
+    (로컬 파일은 import_matches.py CLI 사용).
+    NDJSON/CSV는 user_code(기본: 설정된 내 User Code)의 기록으로 저장하며, 진행 상황은 /api/import/status
+    """
+    global import_job
+    if import_job and import_job.is_running():
+        raise HTTPException(status_code=409, detail="Import is already running")
+
+    # 큰 파일도 메모리에 올리지 않도록 받은 만큼 바로 임시 파일에 기록
+    fd, path = tempfile.mkstemp(prefix="sf6_import_")
+    with os.fdopen(fd, "wb") as f:
+        async for chunk in request.stream():
+            f.write(chunk)
+
+    try:
+        import_job = ImportJob(path, format, user_code or load_user_config().get("user_code"),
+                               chunk_size=chunk_size, remove_after=True)
+    except ValueError as e:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail=str(e))
+    import_job.start()
+    return {"status": "started", "import": import_job.status()}
+
+@app.get("/api/import/status")
+def get_import_status():
+    if not import_job:
+        return {"status": "idle"}
+    return import_job.status()
+
+@app.post("/api/import/stop")
+def stop_import():
+    """읽은 행까지 저장하고 멈춥니다."""
+    if not import_job or not import_job.is_running():
+        return {"status": "idle"}
+    import_job.stop()
+    return {"status": "stopping"}
 
 @app.get("/api/matches")
-def get_matches(db: Session = Depends(get_db), limit: int = 50):
+def get_matches(request: Request, response: Response, db: Session = Depends(get_db), limit: int = 50,
+                player_id: Optional[int] = None):
     """
     저장된 대전 기록을 조회합니다.
     """
+    cached = not_modified(request, response)
+    if cached:
+        return cached
     try:
-        matches = db.query(Match).order_by(Match.match_date.desc()).limit(limit).all()
-        return [{
-            "id": m.id,
-            "opponent_name": m.opponent_name,
-            "opponent_character": m.opponent_character,
-            "opponent_mr": m.opponent_mr,
-            "opponent_lp": m.opponent_lp,
-            "my_character": m.my_character,
-            "my_mr": m.my_mr,
-            "my_lp": m.my_lp,
-            "result": m.result,
-            "match_date": m.match_date.isoformat() if m.match_date else None
-        } for m in matches]
+        player_id = resolve_player_id(db, player_id)
+        return result_cache.get_or_compute("matches", (limit, player_id), player_id,
+                                           lambda: recent_matches(db, limit, player_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def match_filters(character, opponent_character, opponent, result, date_from, date_to):
+    return {"character": character, "opponent_character": opponent_character, "opponent": opponent,
+            "result": result, "date_from": date_from, "date_to": date_to}
+
+@app.get("/api/matches/page")
+def get_matches_page(db: Session = Depends(get_db), limit: int = match_history.DEFAULT_PAGE_SIZE,
+                     cursor: Optional[str] = None, character: Optional[str] = None,
+                     opponent_character: Optional[str] = None, opponent: Optional[str] = None,
+                     result: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                     player_id: Optional[int] = None):
+    """
+    대전 기록을 최신순으로 페이지 단위 조회 (cursor = 이전 응답의 next_cursor)
+    - character: 내 캐릭터, opponent_character: 상대 캐릭터, opponent: 상대 이름, result: WIN/LOSE/DRAW
+    - date_from / date_to: ISO 날짜(시간) 범위, 날짜만 주면 date_to는 그날 끝까지 포함
+    """
+    try:
+        player_id = resolve_player_id(db, player_id)
+        filters = match_filters(character, opponent_character, opponent, result, date_from, date_to)
+        return result_cache.get_or_compute(
+            "matches_page", (limit, cursor, tuple(filters.items()), player_id), player_id,
+            lambda: match_history.page_matches(db, player_id, limit=limit, cursor=cursor, **filters)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/matches/export")
+def export_matches(db: Session = Depends(get_db), format: str = "ndjson", character: Optional[str] = None,
+                   opponent_character: Optional[str] = None, opponent: Optional[str] = None,
+                   result: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                   player_id: Optional[int] = None):
+    """
+    조건에 맞는 전체 대전 기록을 NDJSON(format=ndjson) 또는 CSV(format=csv)로 스트리밍합니다.
+    기록 수와 관계없이 서버 메모리는 EXPORT_BATCH_SIZE행 분량만 사용합니다.
+    """
+    try:
+        player_id = resolve_player_id(db, player_id)
+        lines = match_history.export_matches(
+            engine, format, player_id, **match_filters(character, opponent_character, opponent, result, date_from, date_to)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type, extension = match_history.EXPORT_FORMATS[format]
+    filename = f"sf6_matches_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(lines, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+def recent_matches(db, limit, player_id):
+    """최근 매치 limit개 (최신순)"""
+    matches = scoped(db.query(Match), player_id).order_by(Match.match_date.desc()).limit(limit).all()
+    return [{
+        "id": m.id,
+        "opponent_name": m.opponent_name,
+        "opponent_character": m.opponent_character,
+        "opponent_mr": m.opponent_mr,
+        "opponent_lp": m.opponent_lp,
+        "my_character": m.my_character,
+        "my_mr": m.my_mr,
+        "my_lp": m.my_lp,
+        "result": m.result,
+        "match_date": m.match_date.isoformat() if m.match_date else None
+    } for m in matches]
+
 @app.get("/stats")
 def stats_page():
     """통계 페이지 제공"""
     return FileResponse(resource_path("static/stats.html"))
 
+def stats_summary(db, limit, player_id):
+    """get_stats_summary의 계산 부분 (결과는 result_cache에 보관)"""
+    from sqlalchemy import func, case
+
+    # 1. 전체 통계 (player_stats)
+    player_rows = scoped_stats(db.query(PlayerStats), PlayerStats, player_id).all()
+    total_wins = sum(p.wins or 0 for p in player_rows)
+    total_losses = sum(p.losses or 0 for p in player_rows)
+    total_matches = sum(p.total or 0 for p in player_rows)
+
+    # 2. 최근 N개 통계 (서브쿼리로 최적화)
+    recent_subquery = scoped(db.query(Match.id, Match.result), player_id).order_by(Match.match_date.desc()).limit(limit).subquery()
+    recent_stats = db.query(
+        func.count(recent_subquery.c.id).label('total'),
+        func.sum(case((recent_subquery.c.result == "WIN", 1), else_=0)).label('wins'),
+        func.sum(case((recent_subquery.c.result == "LOSE", 1), else_=0)).label('losses')
+    ).first()
+
+    recent_total = recent_stats.total or 0
+    recent_wins = recent_stats.wins or 0
+    recent_losses = recent_stats.losses or 0
+
+    # 3. 마지막 대전 상대 정보 (player_stats에 기록된 가장 최근 매치)
+    last = max((p for p in player_rows if p.last_match_date), key=lambda p: p.last_match_date, default=None)
+    last_opponent_name_stats = None
+    last_opponent_char_stats = None
+    my_character = None
+
+    if last:
+        opponent_name = last.last_opponent_name
+        opponent_char = last.last_opponent_character
+        my_character = last.last_my_character
+
+        # 상대 유저와의 전적 (opponent_stats 기본키 조회)
+        name_stats = scoped_stats(db.query(
+            func.sum(OpponentStats.total).label('total'),
+            func.sum(OpponentStats.wins).label('wins'),
+            func.sum(OpponentStats.losses).label('losses')
+        ), OpponentStats, player_id).filter(OpponentStats.opponent_name == opponent_name).first()
+
+        last_opponent_name_stats = {
+            "name": opponent_name,
+            "wins": name_stats.wins or 0,
+            "losses": name_stats.losses or 0,
+            "total": name_stats.total or 0
+        }
+
+        # 상대 캐릭터와의 전적 (matchup_stats 기본키 앞부분 범위 조회, 내 캐릭터 수만큼의 행)
+        char_stats = scoped_stats(db.query(
+            func.sum(MatchupStats.total).label('total'),
+            func.sum(MatchupStats.wins).label('wins'),
+            func.sum(MatchupStats.losses).label('losses')
+        ), MatchupStats, player_id).filter(MatchupStats.opponent_character == opponent_char).first()
+
+        last_opponent_char_stats = {
+            "character": opponent_char,
+            "wins": char_stats.wins or 0,
+            "losses": char_stats.losses or 0,
+            "total": char_stats.total or 0
+        }
+
+    return {
+        "total": {
+            "wins": total_wins,
+            "losses": total_losses,
+            "total": total_matches
+        },
+        "recent_100": {
+            "wins": recent_wins,
+            "losses": recent_losses,
+            "total": recent_total
+        },
+        "player_id": player_id,
+        "my_character": my_character,
+        "last_opponent_name": last_opponent_name_stats,
+        "last_opponent_char": last_opponent_char_stats
+    }
+
 @app.get("/api/stats/summary")
-def get_stats_summary(db: Session = Depends(get_db), limit: int = 100):
+def get_stats_summary(request: Request, response: Response, db: Session = Depends(get_db), limit: int = 100,
+                      player_id: Optional[int] = None):
     """
-    전체 승률 및 최근 N개 승률 통계 (최적화된 버전)
-    - 기존: 7+ 개별 쿼리 -> 최적화: 3개 쿼리로 통합
+    전체 승률 및 최근 N개 승률 통계
+    - 전체/상대 유저/상대 캐릭터 전적은 집계 테이블의 기본키 조회 (기록이 쌓여도 비용이 늘지 않음)
+    - 최근 N개만 (player_id, match_date) 인덱스로 N행을 읽어 계산
+    - 데이터 버전이 그대로면 304 (If-None-Match)
     """
-    from sqlalchemy import func, case
-    
+    cached = not_modified(request, response)
+    if cached:
+        return cached
     try:
-        # 1. 단일 쿼리로 전체 통계 집계 (count 3번 -> 1번)
-        total_stats = db.query(
-            func.count(Match.id).label('total'),
-            func.sum(case((Match.result == "WIN", 1), else_=0)).label('wins'),
-            func.sum(case((Match.result == "LOSE", 1), else_=0)).label('losses')
-        ).first()
-        
-        total_matches = total_stats.total or 0
-        total_wins = total_stats.wins or 0
-        total_losses = total_stats.losses or 0
-        
-        # 2. 최근 N개 통계 (서브쿼리로 최적화)
-        recent_subquery = db.query(Match.id, Match.result).order_by(Match.match_date.desc()).limit(limit).subquery()
-        recent_stats = db.query(
-            func.count(recent_subquery.c.id).label('total'),
-            func.sum(case((recent_subquery.c.result == "WIN", 1), else_=0)).label('wins'),
-            func.sum(case((recent_subquery.c.result == "LOSE", 1), else_=0)).label('losses')
-        ).first()
-        
-        recent_total = recent_stats.total or 0
-        recent_wins = recent_stats.wins or 0
-        recent_losses = recent_stats.losses or 0
-        
-        # 3. 마지막 대전 상대 정보
-        last_match = db.query(Match).order_by(Match.match_date.desc()).first()
-        last_opponent_name_stats = None
-        last_opponent_char_stats = None
-        my_character = None
-        
-        if last_match:
-            opponent_name = last_match.opponent_name
-            opponent_char = last_match.opponent_character
-            my_character = last_match.my_character
-            
-            # 상대 유저와의 전적 (단일 집계 쿼리)
-            name_stats = db.query(
-                func.count(Match.id).label('total'),
-                func.sum(case((Match.result == "WIN", 1), else_=0)).label('wins'),
-                func.sum(case((Match.result == "LOSE", 1), else_=0)).label('losses')
-            ).filter(Match.opponent_name == opponent_name).first()
-            
-            last_opponent_name_stats = {
-                "name": opponent_name,
-                "wins": name_stats.wins or 0,
-                "losses": name_stats.losses or 0,
-                "total": name_stats.total or 0
-            }
-            
-            # 상대 캐릭터와의 전적 (단일 집계 쿼리)
-            char_stats = db.query(
-                func.count(Match.id).label('total'),
-                func.sum(case((Match.result == "WIN", 1), else_=0)).label('wins'),
-                func.sum(case((Match.result == "LOSE", 1), else_=0)).label('losses')
-            ).filter(Match.opponent_character == opponent_char).first()
-            
-            last_opponent_char_stats = {
-                "character": opponent_char,
-                "wins": char_stats.wins or 0,
-                "losses": char_stats.losses or 0,
-                "total": char_stats.total or 0
-            }
-        
-        return {
-            "total": {
-                "wins": total_wins,
-                "losses": total_losses,
-                "total": total_matches
-            },
-            "recent_100": {
-                "wins": recent_wins,
-                "losses": recent_losses,
-                "total": recent_total
-            },
-            "my_character": my_character,
-            "last_opponent_name": last_opponent_name_stats,
-            "last_opponent_char": last_opponent_char_stats
-        }
+        player_id = resolve_player_id(db, player_id)
+        return result_cache.get_or_compute("summary", (limit, player_id), player_id,
+                                           lambda: stats_summary(db, limit, player_id))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/stats/cache")
+def get_stats_cache():
+    """조회 결과 캐시의 크기와 hit/miss 카운터"""
+    return result_cache.stats()
+
+@app.post("/api/stats/rebuild")
+def rebuild_stats(db: Session = Depends(get_db), player_id: Optional[int] = None):
+    """집계 테이블을 matches에서 처음부터 다시 계산합니다 (player_id를 주면 해당 플레이어만)."""
+    try:
+        rebuild_rollups(db, player_id)
+        db.commit()
+        result_cache.invalidate(None if player_id is None else [player_id])
+        data_version.bump()
+        broker.publish("summary", {"player_id": player_id})
+        return {"status": "success", "player_id": player_id}
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stats/opponent/{opponent_name}")
-def get_opponent_stats(opponent_name: str, db: Session = Depends(get_db)):
+def get_opponent_stats(opponent_name: str, db: Session = Depends(get_db), player_id: Optional[int] = None):
     """
-    특정 상대와의 전적
+    특정 상대와의 전적 (opponent_stats 합계, 매치 행은 읽지 않음)
     """
     try:
-        matches = db.query(Match).filter(Match.opponent_name == opponent_name).all()
-        wins = sum(1 for m in matches if m.result == "WIN")
-        losses = sum(1 for m in matches if m.result == "LOSE")
-        
-        return {
-            "opponent_name": opponent_name,
-            "wins": wins,
-            "losses": losses,
-            "total": len(matches)
-        }
+        from sqlalchemy import func
+
+        player_id = resolve_player_id(db, player_id)
+
+        def compute():
+            stats = scoped_stats(db.query(
+                func.sum(OpponentStats.total).label('total'),
+                func.sum(OpponentStats.wins).label('wins'),
+                func.sum(OpponentStats.losses).label('losses'),
+                func.max(OpponentStats.last_match_date).label('last_match_date')
+            ), OpponentStats, player_id).filter(OpponentStats.opponent_name == opponent_name).first()
+            return {
+                "opponent_name": opponent_name,
+                "wins": stats.wins or 0,
+                "losses": stats.losses or 0,
+                "total": stats.total or 0,
+                "last_match_date": stats.last_match_date.isoformat() if stats.last_match_date else None
+            }
+
+        return result_cache.get_or_compute("opponent", (opponent_name, player_id), player_id, compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stats/mr_history")
-def get_mr_history(db: Session = Depends(get_db), limit: int = 100):
+def get_mr_history(request: Request, response: Response, db: Session = Depends(get_db), limit: int = 100,
+                   player_id: Optional[int] = None, points: Optional[int] = None,
+                   date_from: Optional[str] = None, date_to: Optional[str] = None):
     """
     MR 변화 히스토리 (그래프용)
+    points를 주면 (limit=0이면 기간 전체) 구간별 최저/최고 MR만 남긴 points개 안팎의 점과 구간별 승/패를 반환
     """
+    cached = not_modified(request, response)
+    if cached:
+        return cached
     try:
+        player_id = resolve_player_id(db, player_id)
+        if points is not None or date_from or date_to:
+            return result_cache.get_or_compute(
+                "mr_history", (limit, player_id, points, date_from, date_to), player_id,
+                lambda: downsample_mr_history(db, player_id, points=points or MAX_POINTS, limit=limit,
+                                              date_from=date_from, date_to=date_to)
+            )
+
         # 최근 limit 개수만큼 먼저 가져온 뒤, 그래프 표시를 위해 시간순(오름차순)으로 정렬
-        recent_matches = db.query(Match).filter(Match.my_mr.isnot(None)).order_by(Match.match_date.desc()).limit(limit).all()
-        matches = list(reversed(recent_matches))
-        
-        history = [{
-            "date": m.match_date.isoformat() if m.match_date else None,
-            "mr": m.my_mr,
-            "result": m.result
-        } for m in matches]
-        
-        return history
+        def compute():
+            recent = scoped(db.query(Match), player_id).filter(Match.my_mr.isnot(None)).order_by(Match.match_date.desc()).limit(limit).all()
+            return [{
+                "date": m.match_date.isoformat() if m.match_date else None,
+                "mr": m.my_mr,
+                "result": m.result
+            } for m in reversed(recent)]
+
+        return result_cache.get_or_compute("mr_history", (limit, player_id), player_id, compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/stats/performance")
+def get_performance(request: Request, response: Response, db: Session = Depends(get_db), by: str = "day",
+                    player_id: Optional[int] = None, date_from: Optional[str] = None, date_to: Optional[str] = None):
+    """
+    날짜(day) / 시간대(hour) / 요일(weekday)별 승률과 MR 변화량 (SQLite 윈도 함수 + GROUP BY)
+    """
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    try:
+        player_id = resolve_player_id(db, player_id)
+        return result_cache.get_or_compute(
+            "performance", (by, player_id, date_from, date_to), player_id,
+            lambda: performance(db, player_id, by=by, date_from=date_from, date_to=date_to)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/stats/sessions")
+def get_sessions(request: Request, response: Response, db: Session = Depends(get_db),
+                 gap_minutes: int = DEFAULT_SESSION_GAP, limit: int = DEFAULT_SESSION_LIMIT,
+                 player_id: Optional[int] = None, date_from: Optional[str] = None, date_to: Optional[str] = None):
+    """
+    최근 플레이 세션 (매치 사이가 gap_minutes분 넘게 비면 새 세션)별 전적과 MR 변화량
+    """
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    try:
+        player_id = resolve_player_id(db, player_id)
+        return result_cache.get_or_compute(
+            "sessions", (gap_minutes, limit, player_id, date_from, date_to), player_id,
+            lambda: detect_sessions(db, player_id, gap_minutes=gap_minutes, limit=limit,
+                                    date_from=date_from, date_to=date_to)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/stats/matchups")
+def get_matchups(request: Request, response: Response, db: Session = Depends(get_db),
+                 player_id: Optional[int] = None):
+    """
+    내 캐릭터 × 상대 캐릭터 상성표 (승/패, 승률, MR 변화량). matchup_stats 집계 테이블만 읽음
+    """
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    try:
+        player_id = resolve_player_id(db, player_id)
+        return result_cache.get_or_compute("matchups", (player_id,), player_id,
+                                           lambda: matchup_matrix(db, player_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stats/opponents")
-def get_all_opponents(db: Session = Depends(get_db)):
+def get_all_opponents(db: Session = Depends(get_db), player_id: Optional[int] = None):
+    """
+    모든 상대 목록 (드롭다운용). 검색/페이지가 필요하면 /api/opponents를 사용하세요.
+    """
+    try:
+        # 고유한 상대 이름 목록 (opponent_stats 기본키 순서)
+        player_id = resolve_player_id(db, player_id)
+
+        def compute():
+            opponents = scoped_stats(db.query(OpponentStats.opponent_name), OpponentStats, player_id).distinct().all()
+            return [{"name": opp[0]} for opp in opponents if opp[0]]
+
+        return result_cache.get_or_compute("opponents", (player_id,), player_id, compute)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/opponents")
+def get_opponent_directory(db: Session = Depends(get_db), q: str = "", fuzzy: bool = False, sort: str = "games",
+                           limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                           player_id: Optional[int] = None):
     """
-    모든 상대 목록 (드롭다운용)
+    상대 유저 목록 (전적 포함)
+    - q: 이름 접두사 검색 (대소문자 무시), fuzzy=true면 오타/부분 일치까지 점수순
+    - sort: games(판수) / last_seen(마지막 대전) / name
+    - cursor: 이전 응답의 next_cursor로 다음 페이지
     """
     try:
-        # 고유한 상대 이름 목록
-        opponents = db.query(Match.opponent_name).distinct().all()
-        return [{"name": opp[0]} for opp in opponents if opp[0]]
+        player_id = resolve_player_id(db, player_id)
+        return result_cache.get_or_compute(
+            "opponents_directory", (q, fuzzy, sort, limit, cursor, player_id), player_id,
+            lambda: search_opponents(db, player_id, q=q, sort=sort, limit=limit, cursor=cursor, fuzzy=fuzzy)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -511,11 +1059,18 @@ def delete_database(db: Session = Depends(get_db)):
     데이터베이스의 모든 데이터를 삭제합니다.
     """
     try:
-        # 모든 매치 기록 삭제
+        # 모든 매치 기록과 집계 삭제
         db.query(Match).delete()
+        clear_rollups(db)
+        # 수집 위치/백필 진행 상황 삭제
+        db.query(CollectCursor).delete()
+        db.query(BackfillProgress).delete()
         # 모든 플레이어 정보 삭제
         db.query(Player).delete()
         db.commit()
+        result_cache.invalidate()
+        data_version.bump()
+        broker.publish("reset")
         
         return {
             "status": "success",
@@ -0,0 +1,134 @@
+"""
+대전 기록 조회/내보내기.
+- page_matches: (match_date, id) 최신순 keyset 페이지네이션 + 캐릭터/상대/결과/기간 필터
+- export_matches: 전체 기록을 NDJSON/CSV 줄 단위로 내보내는 제너레이터 (서버 측 커서로 조금씩 읽어 메모리 사용량 일정)
+"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from database import Match
+from pagination import clamp_page_size, decode_cursor, encode_cursor, keyset_after, order_by_keys, sort_key
+
+DEFAULT_PAGE_SIZE = 50
+EXPORT_BATCH_SIZE = 500  # 내보내기 때 한 번에 가져오는 행 수
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+# match_key는 다시 가져올 때(match_import.py) 같은 매치를 중복 판정하는 데 사용
+MATCH_COLUMNS = ("id", "opponent_name", "opponent_character", "opponent_mr", "opponent_lp",
+                 "my_character", "my_mr", "my_lp", "result", "match_date", "match_key")
+RESULTS = ("WIN", "LOSE", "DRAW")
+
+_table = Match.__table__
+# 최신순. (player_id, match_date) 인덱스는 rowid(id)를 마지막 키로 포함하므로 정렬 없이 읽힘
+SORT_KEYS = [sort_key(_table.c.match_date, desc=True), sort_key(_table.c.id, desc=True)]
+
+
+def parse_date_bound(text, end=False):
+    """
+    기간 필터 값 (ISO 날짜 또는 날짜+시간). 날짜만 주면 date_to는 그날 끝까지 포함합니다.
+    반환값: (비교 연산에 쓸 datetime, 미만 비교 여부)
+    """
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Invalid date: {text}")
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    if end and len(text) == 10:
+        return value + timedelta(days=1), True
+    return value, False
+
+
+def filtered_query(player_id=None, character=None, opponent_character=None, opponent=None, result=None,
+                   date_from=None, date_to=None):
+    """필터를 적용한 matches SELECT (정렬/개수 제한 없음). 잘못된 값은 ValueError"""
+    query = select(*(_table.c[c] for c in MATCH_COLUMNS))
+    if player_id is not None:
+        query = query.where(_table.c.player_id == player_id)
+    if character:
+        query = query.where(_table.c.my_character == character)
+    if opponent_character:
+        query = query.where(_table.c.opponent_character == opponent_character)
+    if opponent:
+        query = query.where(_table.c.opponent_name == opponent)
+    if result:
+        result = result.upper()
+        if result not in RESULTS:
+            raise ValueError(f"Unknown result: {result} ({', '.join(RESULTS)})")
+        query = query.where(_table.c.result == result)
+    if date_from:
+        query = query.where(_table.c.match_date >= parse_date_bound(date_from)[0])
+    if date_to:
+        bound, exclusive = parse_date_bound(date_to, end=True)
+        query = query.where(_table.c.match_date < bound if exclusive else _table.c.match_date <= bound)
+    return query
+
+
+def match_record(row):
+    record = {c: row[c] for c in MATCH_COLUMNS}
+    record["match_date"] = row["match_date"].isoformat() if row["match_date"] else None
+    return record
+
+
+def page_matches(db, player_id=None, limit=DEFAULT_PAGE_SIZE, cursor=None, **filters):
+    """
+    최신순 한 페이지. cursor는 이전 응답의 next_cursor (마지막 행의 match_date, id).
+    반환값: {"items": [...], "next_cursor": str 또는 None}
+    """
+    limit = clamp_page_size(limit)
+    query = filtered_query(player_id, **filters)
+    if cursor:
+        match_date, match_id = decode_cursor(cursor, len(SORT_KEYS))
+        try:
+            match_date = datetime.fromisoformat(match_date)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        query = query.where(keyset_after(SORT_KEYS, [match_date, match_id]))
+    query = query.order_by(*order_by_keys(SORT_KEYS)).limit(limit + 1)
+    rows = db.execute(query).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["match_date"].isoformat(), rows[-1]["id"]])
+    return {"items": [match_record(row) for row in rows], "next_cursor": next_cursor}
+
+
+def export_matches(bind, fmt="ndjson", player_id=None, **filters):
+    """
+    조건에 맞는 전체 기록을 최신순으로 한 줄씩 내보냅니다 (fmt: ndjson / csv).
+    요청 세션과 별개로 bind에서 연결을 열고, stream_results로 EXPORT_BATCH_SIZE행씩만 읽습니다.
+    필터 검증은 첫 줄을 내보내기 전에 끝나므로 호출 측에서 ValueError를 400으로 바꿀 수 있습니다.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format: {fmt} ({', '.join(EXPORT_FORMATS)})")
+    query = filtered_query(player_id, **filters).order_by(*order_by_keys(SORT_KEYS))
+    return _export_lines(bind, fmt, query)
+
+
+def _export_lines(bind, fmt, query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def csv_line(values):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    if fmt == "csv":
+        yield "\ufeff" + csv_line(MATCH_COLUMNS)  # BOM: 엑셀에서 한글 이름이 깨지지 않도록
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(query)
+        for row in result.mappings():
+            record = match_record(row)
+            if fmt == "csv":
+                yield csv_line([record[c] for c in MATCH_COLUMNS])
+            else:
+                yield json.dumps(record, ensure_ascii=False) + "\n"
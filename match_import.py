@@ -0,0 +1,223 @@
+"""
+대전 기록 가져오기 (새 PC로 옮기거나 예전 DB를 합칠 때).
+- NDJSON / CSV: /api/matches/export로 내보낸 파일 (user_code를 지정한 플레이어의 기록으로 저장)
+- db: 다른 sf6viewer.db 파일 (원본의 플레이어별로 저장, 읽기 전용으로 열기)
+파일을 한 줄씩 읽어 chunk_size행마다 ingest_matches로 저장하고 커밋하므로 메모리 사용량은 일정하며,
+중복 판정은 수집과 같은 (player_id, match_key) 규칙을 따릅니다.
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from collector import MATCH_FIELDS, ingest_matches, upsert_player
+from database import Player, SessionLocal
+from date_parser import DateParser, to_storage
+from match_keys import legacy_match_key
+
+IMPORT_CHUNK_SIZE = 5000  # 한 트랜잭션에 저장하는 행 수
+MAX_IMPORT_CHUNK_SIZE = 10000  # 한 트랜잭션이 너무 커지지 않도록 (쓰기 잠금/메모리) 받는 chunk_size의 상한
+IMPORT_FORMATS = ("ndjson", "csv", "db")
+INT_FIELDS = ("opponent_mr", "opponent_lp", "my_mr", "my_lp")
+SQLITE_HEADER = b"SQLite format 3\x00"
+MAX_ERROR_SAMPLES = 20
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if extension == ".csv":
+        return "csv"
+    # 확장자가 없으면 (업로드된 임시 파일 등) 내용으로 판단
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    if head.startswith(SQLITE_HEADER):
+        return "db"
+    first_line = head.decode("utf-8", "ignore").lstrip("\ufeff \r\n").split("\n", 1)[0]
+    if first_line.startswith("{"):
+        return "ndjson"
+    if "," in first_line:
+        return "csv"
+    raise ValueError(f"Cannot detect import format of {path} ({', '.join(IMPORT_FORMATS)})")
+
+
+# --- 읽기: (user_code, 원본 행 dict, 플레이어 프로필 또는 None)을 하나씩 내보냄 ---
+
+def read_ndjson(path, user_code):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            if line.strip():
+                yield user_code, json.loads(line), None
+
+
+def read_csv(path, user_code):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            yield user_code, row, None
+
+
+def read_database(path, user_code=None):
+    """다른 sf6viewer.db의 플레이어/매치. 원본 파일은 읽기 전용으로 열고 커서로 조금씩 읽습니다."""
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        match_columns = {row[1] for row in conn.execute("PRAGMA table_info(matches)")}
+        if not match_columns:
+            raise ValueError(f"{path} has no matches table")
+        columns = ", ".join(f"m.{c}" for c in (*MATCH_FIELDS, "match_date", "match_key") if c in match_columns)
+        rows = conn.execute(
+            f"SELECT p.user_code AS source_user_code, p.name, p.lp, p.rank, p.character, {columns} "
+            "FROM matches m JOIN players p ON p.id = m.player_id ORDER BY m.player_id, m.id"
+        )
+        for row in rows:
+            row = dict(row)
+            profile = {"name": row.pop("name"), "lp": row.pop("lp"), "rank": row.pop("rank"),
+                       "character": row.pop("character")}
+            yield row.pop("source_user_code"), row, profile
+    finally:
+        conn.close()
+
+
+READERS = {"ndjson": read_ndjson, "csv": read_csv, "db": read_database}
+
+
+def _int_or_none(value):
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def normalize(row, parser):
+    """
+    가져온 행을 수집한 매치와 같은 형태로 바꿉니다.
+    match_key가 없으면 (예전 DB/외부 파일) 저장된 값으로 행 해시 키를 계산 - 마이그레이션과 같은 규칙.
+    날짜를 읽을 수 없는 행은 ValueError (수집과 달리 현재 시간으로 대체하지 않음)
+    """
+    date_text = row.get("match_date") or row.get("date")
+    match_date = to_storage(parser.parse(str(date_text))) if date_text else None
+    if match_date is None:
+        raise ValueError(f"invalid date: {date_text!r}")
+
+    match = {f: None if row.get(f) == "" else row.get(f) for f in MATCH_FIELDS}
+    for f in INT_FIELDS:
+        match[f] = _int_or_none(match[f])
+    if match["result"]:
+        match["result"] = match["result"].upper()
+    match["date"] = match_date.isoformat()
+    match["match_key"] = row.get("match_key") or legacy_match_key({**match, "match_date": match_date})
+    return match
+
+
+class ImportJob:
+    """
+    파일 하나를 가져오는 작업. start()로 백그라운드 스레드에서, run()으로 현재 스레드에서 실행합니다.
+    chunk_size행마다 한 트랜잭션으로 저장/커밋하고 status()에 진행 상황을 남깁니다.
+    on_progress(status)가 있으면 커밋할 때마다 호출합니다 (CLI 출력용).
+    """
+
+    def __init__(self, path, fmt=None, user_code=None, chunk_size=IMPORT_CHUNK_SIZE, session_factory=SessionLocal,
+                 on_progress=None, remove_after=False):
+        self.path = path
+        self.format = fmt or detect_format(path)
+        if self.format not in IMPORT_FORMATS:
+            raise ValueError(f"Unknown import format: {self.format} ({', '.join(IMPORT_FORMATS)})")
+        if self.format != "db" and not user_code:
+            raise ValueError("user_code is required for ndjson/csv imports")
+        self.user_code = user_code
+        self.chunk_size = int(chunk_size)
+        if not 1 <= self.chunk_size <= MAX_IMPORT_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_IMPORT_CHUNK_SIZE}")
+        self.session_factory = session_factory
+        self.on_progress = on_progress
+        self.remove_after = remove_after  # 업로드된 임시 파일이면 끝난 뒤 삭제
+        self._stop = threading.Event()
+        self._thread = None
+        self.state = {
+            "status": "idle",
+            "read": 0,
+            "inserted": 0,
+            "skipped": 0,
+            "invalid": 0,
+            "chunks": 0,
+            "players": [],
+            "errors": [],
+            "error": None,
+            "started_at": None,
+            "finished_at": None
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="import", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self):
+        return {**self.state, "format": self.format, "chunk_size": self.chunk_size}
+
+    def run(self):
+        self.state.update(status="running", started_at=datetime.now().isoformat(timespec="seconds"))
+        parser = DateParser()
+        pending = {}  # user_code -> (프로필, 행 목록)
+        try:
+            with self.session_factory() as db:
+                for user_code, row, profile in READERS[self.format](self.path, self.user_code):
+                    if self._stop.is_set():
+                        break
+                    self.state["read"] += 1
+                    try:
+                        match = normalize(row, parser)
+                    except (ValueError, TypeError) as e:
+                        self._invalid(e)
+                        continue
+                    entry = pending.setdefault(user_code, (profile, []))
+                    entry[1].append(match)
+                    if len(entry[1]) >= self.chunk_size:
+                        self._flush(db, user_code, *pending.pop(user_code))
+
+                for user_code, (profile, matches) in list(pending.items()):
+                    self._flush(db, user_code, profile, matches)
+            self.state["status"] = "stopped" if self._stop.is_set() else "done"
+        except Exception as e:
+            print(f"⚠️ [Import] 실패: {e}")
+            self.state.update(status="error", error=str(e))
+        finally:
+            self.state["finished_at"] = datetime.now().isoformat(timespec="seconds")
+            if self.remove_after:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+        return self.status()
+
+    def _invalid(self, error):
+        self.state["invalid"] += 1
+        if len(self.state["errors"]) < MAX_ERROR_SAMPLES:
+            self.state["errors"].append(f"row {self.state['read']}: {error}")
+
+    def _flush(self, db, user_code, profile, matches):
+        """한 플레이어의 행 묶음을 저장하고 커밋 (실패하면 이 묶음만 롤백하고 예외를 그대로 올림)"""
+        try:
+            player = db.query(Player).filter(Player.user_code == user_code).first()
+            if player is None:
+                # 기존 플레이어의 현재 프로필은 예전 파일의 값으로 덮어쓰지 않음
+                player, _ = upsert_player(db, {"user_code": user_code, **(profile or {})})
+            ingested = ingest_matches(db, player, matches)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        self.state["inserted"] += ingested["inserted"]
+        self.state["skipped"] += ingested["skipped"]
+        self.state["chunks"] += 1
+        if user_code not in self.state["players"]:
+            self.state["players"].append(user_code)
+        if self.on_progress:
+            self.on_progress(self.status())
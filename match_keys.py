@@ -0,0 +1,30 @@
+import hashlib
+
+# 매치 한 줄을 구성하는 원본 필드 (날짜는 파싱 전 문자열 그대로)
+FINGERPRINT_FIELDS = ("date", "opponent_name", "opponent_character", "opponent_mr", "opponent_lp",
+                      "my_character", "my_mr", "my_lp", "result")
+LEGACY_DATE_FORMAT = "%Y/%m/%d %H:%M"
+
+
+def match_fingerprint(match):
+    """매치 한 줄을 구분하는 해시 (원본 날짜 문자열 포함). 마지막 수집 위치 표시에 사용합니다."""
+    raw = "|".join("" if match.get(f) is None else str(match.get(f)) for f in FINGERPRINT_FIELDS)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def match_key(match):
+    """
+    매치 식별 키. Buckler가 replay ID를 주면 그것을 쓰고, 없으면 행 전체의 해시를 사용합니다.
+    날짜 파싱에 실패해도 원본 문자열이 같으면 같은 키가 나오므로 재수집 시 중복이 생기지 않습니다.
+    """
+    if match.get("replay_id"):
+        return f"replay:{match['replay_id']}"
+    return f"row:{match.get('fingerprint') or match_fingerprint(match)}"
+
+
+def legacy_match_key(row):
+    """match_key 컬럼이 생기기 전에 저장된 행의 키. 저장된 match_date를 스크랩 시 날짜 형식으로 되돌려 계산합니다."""
+    match = dict(row)
+    match_date = match.pop("match_date", None)
+    match["date"] = match_date.strftime(LEGACY_DATE_FORMAT) if match_date else ""
+    return match_key(match)
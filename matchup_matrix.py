@@ -0,0 +1,55 @@
+"""
+캐릭터 상성표 (내 캐릭터 × 상대 캐릭터별 승/패와 MR 변화량).
+matchup_stats 집계 테이블만 읽으므로 비용은 매치 수가 아니라 캐릭터 조합 수에 비례합니다.
+"""
+from sqlalchemy import func, select
+
+from database import MatchupStats
+
+
+def _cell(wins, losses, total, mr_delta):
+    decided = wins + losses
+    return {
+        "total": total,
+        "wins": wins,
+        "losses": losses,
+        "win_rate": round(wins / decided * 100, 1) if decided else 0,
+        "mr_delta": mr_delta,
+    }
+
+
+def matchup_matrix(db, player_id=None):
+    """
+    반환값: {
+        "my_characters": [판수 많은 순], "opponent_characters": [판수 많은 순],
+        "cells": [{"my_character", "opponent_character", "total", "wins", "losses", "win_rate", "mr_delta"}, ...],
+        "by_my_character": {캐릭터: 합계}, "by_opponent_character": {캐릭터: 합계}
+    }
+    player_id가 None이면 모든 플레이어의 합계
+    """
+    t = MatchupStats
+    query = select(
+        t.my_character, t.opponent_character,
+        func.sum(t.total).label("total"), func.sum(t.wins).label("wins"),
+        func.sum(t.losses).label("losses"), func.sum(t.mr_delta).label("mr_delta"),
+    ).group_by(t.my_character, t.opponent_character)
+    if player_id is not None:
+        query = query.where(t.player_id == player_id)
+
+    cells, mine, theirs = [], {}, {}
+    for row in db.execute(query):
+        counts = (row.wins or 0, row.losses or 0, row.total or 0, row.mr_delta or 0)
+        cells.append({"my_character": row.my_character, "opponent_character": row.opponent_character, **_cell(*counts)})
+        for totals, key in ((mine, row.my_character), (theirs, row.opponent_character)):
+            totals[key] = [a + b for a, b in zip(totals.get(key, (0, 0, 0, 0)), counts)]
+
+    def ranked(totals):
+        return sorted(totals, key=lambda name: (-totals[name][2], name))
+
+    return {
+        "my_characters": ranked(mine),
+        "opponent_characters": ranked(theirs),
+        "cells": cells,
+        "by_my_character": {name: _cell(*mine[name]) for name in ranked(mine)},
+        "by_opponent_character": {name: _cell(*theirs[name]) for name in ranked(theirs)},
+    }
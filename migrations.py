@@ -0,0 +1,96 @@
+"""
+sf6viewer.db 스키마 마이그레이션.
+DB 파일의 PRAGMA user_version에 적용된 마지막 버전을 기록하고, 시작할 때 그 이후의 단계만 실행합니다.
+새 DB는 create_all로 최신 스키마가 만들어지므로 각 단계는 이미 적용된 상태에서 실행되어도 안전해야 합니다.
+"""
+from sqlalchemy import select, text
+
+from database import MATCH_IDENTITY_KEY, Match, OpponentStats
+from match_keys import legacy_match_key
+from rollups import rebuild_rollups, recompute_matchup_mr
+
+LEGACY_KEY_FIELDS = ("opponent_name", "opponent_character", "opponent_mr", "opponent_lp",
+                     "my_character", "my_mr", "my_lp", "result", "match_date")
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))]
+
+
+def add_match_key(conn):
+    """
+    match_key 컬럼/인덱스 없이 만들어진 기존 DB를 업그레이드합니다.
+    - 컬럼을 추가하고, 키가 없는 행은 저장된 값으로 행 해시 키를 계산해 채움
+    - 같은 키가 된 중복 행은 가장 먼저 저장된 행만 남기고 삭제
+    - 이전의 자연키 unique 인덱스를 match_key unique 인덱스로 교체
+    """
+    if "match_key" not in table_columns(conn, "matches"):
+        conn.execute(text("ALTER TABLE matches ADD COLUMN match_key VARCHAR"))
+
+    rows = conn.execute(
+        select(Match.id, *(getattr(Match, f) for f in LEGACY_KEY_FIELDS)).where(Match.match_key.is_(None))
+    ).mappings().all()
+    if rows:
+        conn.execute(
+            text("UPDATE matches SET match_key = :match_key WHERE id = :id"),
+            [{"id": row["id"], "match_key": legacy_match_key({f: row[f] for f in LEGACY_KEY_FIELDS})} for row in rows]
+        )
+
+    key_columns = ", ".join(MATCH_IDENTITY_KEY)
+    conn.execute(text(
+        f"DELETE FROM matches WHERE id NOT IN (SELECT MIN(id) FROM matches GROUP BY {key_columns})"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS uq_matches_natural_key"))
+    conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS uq_matches_match_key ON matches ({key_columns})"))
+
+
+def add_player_composite_indexes(conn):
+    """플레이어별로 날짜 정렬/상대별/캐릭터별/MR 조회를 하는 통계 쿼리용 인덱스"""
+    for index in Match.__table__.indexes:
+        if index.name.startswith("ix_matches_player_"):
+            index.create(conn, checkfirst=True)
+    conn.execute(text("ANALYZE matches"))
+
+
+def add_opponent_directory_indexes(conn):
+    """상대 목록(/api/opponents)의 접두사 검색과 판수/마지막 대전 정렬용 인덱스"""
+    for index in OpponentStats.__table__.indexes:
+        index.create(conn, checkfirst=True)
+    conn.execute(text("ANALYZE opponent_stats"))
+
+
+def add_matchup_mr_delta(conn):
+    """matchup_stats에 MR 변화량 합계 컬럼을 추가하고 기존 매치에서 계산 (캐릭터 상성표용)"""
+    if "mr_delta" not in table_columns(conn, "matchup_stats"):
+        conn.execute(text("ALTER TABLE matchup_stats ADD COLUMN mr_delta INTEGER DEFAULT 0"))
+    recompute_matchup_mr(conn)
+
+
+# (버전, 설명, 함수). 버전은 1부터 순서대로 늘리고, 이미 배포된 단계는 수정하지 않습니다.
+MIGRATIONS = [
+    (1, "match_key column and unique index", add_match_key),
+    (2, "per-player composite indexes", add_player_composite_indexes),
+    (3, "win/loss rollup tables from existing matches", rebuild_rollups),
+    (4, "opponent directory indexes", add_opponent_directory_indexes),
+    (5, "matchup MR delta totals", add_matchup_mr_delta),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(bind):
+    with bind.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def run_migrations(bind):
+    """적용되지 않은 단계를 하나씩 각자의 트랜잭션으로 실행하고 user_version을 올립니다."""
+    current = schema_version(bind)
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        print(f"[DB] 스키마 업그레이드 v{version}: {description}")
+        with bind.begin() as conn:
+            migrate(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+        current = version
+    return current
@@ -0,0 +1,103 @@
+"""
+긴 기간의 MR 그래프용 다운샘플링.
+매치를 시간순으로 같은 개수씩 구간(bucket)으로 나누고, 구간마다 MR 최저/최고 매치만 남깁니다 (min/max bucketing).
+모양(급등/급락)은 그대로 두면서 점 개수를 points 안팎으로 줄이고, 구간별 승/패 수를 함께 돌려줘 승률 표시가 정확합니다.
+번호 매기기(윈도 함수)와 구간 집계(GROUP BY)를 모두 SQLite에서 계산하므로 Python으로는 남길 점만 읽습니다.
+"""
+from sqlalchemy import DateTime, bindparam, text
+
+from match_history import parse_date_bound
+
+MIN_POINTS = 4
+MAX_POINTS = 2000
+
+DOWNSAMPLE_SQL = """
+WITH recent AS (
+    SELECT id, match_date, my_mr, result FROM matches
+    WHERE my_mr IS NOT NULL {filters}
+    ORDER BY match_date DESC, id DESC
+    LIMIT :limit
+),
+bucketed AS MATERIALIZED (
+    -- 점이 points개 이하면 매치마다 한 구간(원본 그대로), 아니면 points/2개 구간 (구간마다 최저/최고 2점)
+    SELECT idx, n, match_date, my_mr, result,
+           CASE WHEN n <= :points THEN idx ELSE idx * (:points / 2) / n END AS bucket
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (ORDER BY match_date, id) - 1 AS idx, COUNT(*) OVER () AS n FROM recent
+    )
+),
+buckets AS (
+    SELECT bucket, COUNT(*) AS matches, SUM(result = 'WIN') AS wins, SUM(result = 'LOSE') AS losses,
+           MIN(match_date) AS bucket_start, MAX(match_date) AS bucket_end, MIN(my_mr) AS min_mr, MAX(my_mr) AS max_mr,
+           MIN(idx) AS first_idx, MAX(idx) AS last_idx
+    FROM bucketed GROUP BY bucket
+),
+picked AS (
+    -- SQLite는 MIN()/MAX() 집계의 나머지 컬럼에 그 값을 가진 행을 돌려줌 -> 구간별 최저/최고 MR 매치
+    SELECT idx FROM (SELECT MIN(my_mr), idx FROM bucketed GROUP BY bucket)
+    UNION SELECT idx FROM (SELECT MAX(my_mr), idx FROM bucketed GROUP BY bucket)
+    -- 처음/마지막 매치는 항상 포함 (그래프의 시작점과 현재 MR)
+    UNION SELECT MIN(first_idx) FROM buckets
+    UNION SELECT MAX(last_idx) FROM buckets
+)
+SELECT b.idx, b.n, b.match_date, b.my_mr, b.result, b.bucket, s.matches, s.wins, s.losses,
+       s.bucket_start, s.bucket_end, s.min_mr, s.max_mr
+FROM picked p
+JOIN bucketed b ON b.idx = p.idx
+JOIN buckets s ON s.bucket = b.bucket
+ORDER BY b.idx
+"""
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def downsample_mr_history(db, player_id=None, points=300, limit=None, date_from=None, date_to=None):
+    """
+    player_id의 MR 기록 (date_from~date_to, 최근 limit개)을 points개 안팎의 점으로 줄입니다.
+    반환값: {"points": [...], "buckets": [...], "total": 원본 매치 수, "downsampled": 줄였는지}
+    잘못된 날짜는 ValueError
+    """
+    points = max(MIN_POINTS, min(int(points), MAX_POINTS))
+    filters = []
+    params = {"points": points, "limit": int(limit) if limit and limit > 0 else -1}  # LIMIT -1 = 제한 없음
+    if player_id is not None:
+        filters.append("AND player_id = :player_id")
+        params["player_id"] = player_id
+    if date_from:
+        filters.append("AND match_date >= :date_from")
+        params["date_from"] = parse_date_bound(date_from)[0]
+    if date_to:
+        bound, exclusive = parse_date_bound(date_to, end=True)
+        filters.append("AND match_date < :date_to" if exclusive else "AND match_date <= :date_to")
+        params["date_to"] = bound
+
+    statement = text(DOWNSAMPLE_SQL.format(filters=" ".join(filters)))
+    # 날짜 파라미터도 ORM과 같은 DateTime 저장 형식으로 바인딩해야 문자열 비교가 맞음
+    statement = statement.bindparams(*(bindparam(k, type_=DateTime) for k in ("date_from", "date_to") if k in params))
+    statement = statement.columns(match_date=DateTime, bucket_start=DateTime, bucket_end=DateTime)
+    rows = db.execute(statement, params).mappings().all()
+
+    series, buckets = [], {}
+    for row in rows:
+        series.append({
+            "index": row["idx"],
+            "date": _iso(row["match_date"]),
+            "mr": row["my_mr"],
+            "result": row["result"],
+            "bucket": row["bucket"],
+        })
+        buckets.setdefault(row["bucket"], {
+            "bucket": row["bucket"],
+            "start": _iso(row["bucket_start"]),
+            "end": _iso(row["bucket_end"]),
+            "matches": row["matches"],
+            "wins": row["wins"] or 0,
+            "losses": row["losses"] or 0,
+            "min_mr": row["min_mr"],
+            "max_mr": row["max_mr"],
+        })
+
+    total = rows[0]["n"] if rows else 0
+    return {"points": series, "buckets": list(buckets.values()), "total": total, "downsampled": total > points}
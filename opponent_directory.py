@@ -0,0 +1,148 @@
+"""
+상대 유저 목록(opponent directory) 검색.
+opponent_stats 집계 테이블만 읽습니다.
+- 접두사 검색 / 판수·마지막 대전·이름 정렬 / 커서 페이지네이션은 인덱스 범위 검색으로 처리
+- fuzzy 검색은 앞 FUZZY_PREFIX_LENGTH글자가 같은 이름만 NOCASE 인덱스로 좁힌 뒤 오타를 허용하는 점수를 매기고,
+  상위 이름의 전적만 다시 조회
+"""
+from datetime import datetime
+from difflib import SequenceMatcher
+
+from sqlalchemy import func, select
+
+from database import OpponentStats
+from pagination import clamp_page_size, decode_cursor, encode_cursor, keyset_after, order_by_keys, sort_key
+
+DEFAULT_PAGE_SIZE = 50
+FUZZY_CUTOFF = 0.6  # 이 점수 미만인 이름은 fuzzy 결과에서 제외
+FUZZY_PREFIX_LENGTH = 2  # fuzzy 후보: 앞 두 글자는 맞게 입력했다고 보고 접두사 인덱스 범위만 읽음
+SORTS = ("games", "last_seen", "name")
+
+
+def escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _columns(player_id):
+    """
+    조회 범위의 상대별 전적 컬럼. 플레이어를 지정하면 행을 그대로 (인덱스 사용),
+    전체 범위(None)면 이름별 합계를 씁니다. 반환값: (컬럼 dict, 집계 여부)
+    """
+    t = OpponentStats
+    if player_id is not None:
+        return {"name": t.opponent_name, "total": t.total, "wins": t.wins, "losses": t.losses,
+                "last_match_date": t.last_match_date}, False
+    return {"name": t.opponent_name, "total": func.sum(t.total), "wins": func.sum(t.wins),
+            "losses": func.sum(t.losses), "last_match_date": func.max(t.last_match_date)}, True
+
+
+def _base_query(player_id):
+    columns, grouped = _columns(player_id)
+    query = select(*(expr.label(key) for key, expr in columns.items()))
+    if grouped:
+        query = query.group_by(OpponentStats.opponent_name)
+    else:
+        query = query.where(OpponentStats.player_id == player_id)
+    return query, columns, grouped
+
+
+def _sort_keys(sort, columns):
+    """sort_key 목록. 마지막 키는 항상 이름이라 순서가 유일하게 정해짐 (마지막 대전 시각이 없는 상대는 맨 뒤)"""
+    name = columns["name"]
+    if sort == "games":
+        return [sort_key(columns["total"], desc=True), sort_key(name)]
+    if sort == "last_seen":
+        return [sort_key(columns["last_match_date"], desc=True, nullable=True), sort_key(name)]
+    return [sort_key(name.collate("NOCASE")), sort_key(name)]
+
+
+def _record(row, score=None):
+    record = {
+        "name": row.name,
+        "total": row.total or 0,
+        "wins": row.wins or 0,
+        "losses": row.losses or 0,
+        "win_rate": round((row.wins or 0) / row.total * 100, 1) if row.total else 0,
+        "last_match_date": row.last_match_date.isoformat() if row.last_match_date else None,
+    }
+    if score is not None:
+        record["score"] = round(score, 3)
+    return record
+
+
+def search_opponents(db, player_id=None, q="", sort="games", limit=DEFAULT_PAGE_SIZE, cursor=None, fuzzy=False):
+    """
+    상대 목록 한 페이지.
+    q: 이름 접두사 (대소문자 무시), fuzzy=True면 오타/부분 일치까지 점수순으로 (페이지네이션 없음)
+    sort: games(판수) / last_seen(마지막 대전) / name
+    cursor: 이전 응답의 next_cursor
+    반환값: {"items": [...], "next_cursor": str 또는 None, ...}
+    잘못된 sort/cursor는 ValueError
+    """
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort: {sort} ({', '.join(SORTS)})")
+    limit = clamp_page_size(limit)
+    q = (q or "").strip()
+    if fuzzy and q:
+        return {"items": fuzzy_search(db, player_id, q, limit), "next_cursor": None, "sort": "score", "q": q, "fuzzy": True}
+
+    query, columns, grouped = _base_query(player_id)
+    if q:
+        query = query.where(OpponentStats.opponent_name.like(f"{escape_like(q)}%", escape="\\"))
+
+    keys = _sort_keys(sort, columns)
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        if sort == "last_seen" and values[0] is not None:
+            values[0] = datetime.fromisoformat(values[0])
+        condition = keyset_after(keys, values)
+        query = query.having(condition) if grouped else query.where(condition)
+
+    query = query.order_by(*order_by_keys(keys)).limit(limit + 1)
+    rows = db.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        last_values = {
+            "games": [last.total, last.name],
+            "last_seen": [last.last_match_date, last.name],
+            "name": [last.name, last.name],
+        }[sort]
+        next_cursor = encode_cursor(last_values)
+    return {"items": [_record(row) for row in rows], "next_cursor": next_cursor, "sort": sort, "q": q, "fuzzy": False}
+
+
+def fuzzy_score(query, name):
+    """접두사 > 부분 문자열 > 앞부분/전체의 유사도 순으로 0~1 점수"""
+    query, name = query.lower(), name.lower()
+    if name.startswith(query):
+        return 1.0
+    if query in name:
+        return 0.9
+    return max(SequenceMatcher(None, query, name).ratio(),
+               SequenceMatcher(None, query, name[:len(query)]).ratio() * 0.85)
+
+
+def fuzzy_search(db, player_id, q, limit):
+    """앞 FUZZY_PREFIX_LENGTH글자가 같은 이름(대소문자 무시)만 후보로 읽어 fuzzy_score 순으로 반환합니다."""
+    prefix = escape_like(q[:FUZZY_PREFIX_LENGTH])
+    names = select(OpponentStats.opponent_name).where(
+        OpponentStats.opponent_name.like(f"{prefix}%", escape="\\")
+    ).distinct()
+    if player_id is not None:
+        names = names.where(OpponentStats.player_id == player_id)
+    scored = []
+    for name in db.execute(names).scalars():
+        score = fuzzy_score(q, name)
+        if score >= FUZZY_CUTOFF:
+            scored.append((score, name))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    scored = scored[:limit]
+    if not scored:
+        return []
+
+    query, _, _ = _base_query(player_id)
+    rows = {row.name: row for row in db.execute(query.where(OpponentStats.opponent_name.in_([n for _, n in scored])))}
+    return [_record(rows[name], score) for score, name in scored if name in rows]
@@ -0,0 +1,58 @@
+"""
+keyset(커서) 페이지네이션 공용 함수.
+커서는 이전 페이지 마지막 행의 정렬 키 값 목록을 JSON -> URL-safe base64로 감싼 문자열입니다.
+"""
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, length=None):
+    """잘못된 커서는 ValueError (엔드포인트에서 400으로 변환)"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or (length is not None and len(values) != length):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def clamp_page_size(limit, maximum=MAX_PAGE_SIZE):
+    return max(1, min(int(limit), maximum))
+
+
+def sort_key(expr, desc=False, nullable=False):
+    """정렬 키 (식, 내림차순 여부, NULL 허용 여부). NULL 허용 키는 NULL을 항상 마지막에 둡니다 (order_by_keys)."""
+    return expr, desc, nullable
+
+
+def order_by_keys(keys):
+    clauses = []
+    for expr, desc, nullable in keys:
+        clause = expr.desc() if desc else expr
+        clauses.append(clause.nulls_last() if nullable else clause)
+    return clauses
+
+
+def keyset_after(keys, values):
+    """
+    keyset 조건: keys(sort_key 목록) 순서상 values(이전 페이지의 마지막 행) 다음에 오는 행.
+    (a, b) 정렬이면 a 다음 값이거나, a가 같고 b 다음 값인 행.
+    NULL 허용 키는 NULL이 마지막이므로, 값이 있으면 NULL인 행도 다음이고 값이 NULL이면 같은 NULL끼리만 비교합니다.
+    """
+    clauses = []
+    for i, (expr, desc, nullable) in enumerate(keys):
+        equal = [keys[j][0].is_(None) if values[j] is None else keys[j][0] == values[j] for j in range(i)]
+        if values[i] is None:
+            continue  # NULL 다음에 오는 값은 없음 (뒤 키로만 비교)
+        after = expr < values[i] if desc else expr > values[i]
+        clauses.append(and_(*equal, or_(after, expr.is_(None)) if nullable else after))
+    return or_(*clauses)
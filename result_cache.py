@@ -0,0 +1,81 @@
+"""
+통계 조회 결과를 메모리에 보관하는 LRU 캐시.
+키는 (엔드포인트, 파라미터)이고 각 항목은 조회 범위(player_id, 전체 범위는 None)를 함께 기억합니다.
+수집 트랜잭션이 커밋되면 바뀐 플레이어의 항목과 전체 범위 항목만 지우므로, 매치 사이의 반복 조회는 DB를 읽지 않습니다.
+"""
+import threading
+from collections import OrderedDict
+
+RESULT_CACHE_SIZE = 256  # 엔드포인트 x limit/player_id 조합 수보다 넉넉하게
+
+
+class ResultCache:
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # (endpoint, params) -> (scope, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, endpoint, params, scope, compute):
+        """
+        캐시에 있으면 그 값을, 없으면 compute()를 실행해 저장한 뒤 반환합니다.
+        scope는 결과가 의존하는 플레이어 id (전체 범위면 None)로, invalidate 때 사용합니다.
+        compute는 락 밖에서 실행되므로 같은 키를 동시에 계산할 수 있지만 결과는 같습니다.
+        """
+        key = (endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self.invalidations
+
+        value = compute()
+
+        with self._lock:
+            # 계산하는 동안 무효화가 있었다면 이미 낡았을 수 있으므로 저장하지 않음
+            if generation == self.invalidations:
+                self._entries[key] = (scope, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, player_ids=None):
+        """
+        player_ids의 항목과 전체 범위(None) 항목을 지웁니다. player_ids를 생략하면 전부 지웁니다.
+        반환값: 지운 항목 수
+        """
+        with self._lock:
+            self.invalidations += 1
+            if player_ids is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            scopes = {None, *player_ids}
+            stale = [key for key, (scope, _) in self._entries.items() if scope in scopes]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+result_cache = ResultCache()
@@ -0,0 +1,260 @@
+"""
+전적 집계 테이블(player_stats / opponent_stats / matchup_stats) 관리.
+매치를 저장하는 트랜잭션 안에서 새로 들어간 행만큼 더하고, 필요하면 matches에서 처음부터 다시 계산합니다.
+matchup_stats.mr_delta는 매치별 MR 변화량(직전 매치가 같은 캐릭터일 때 my_mr 차이, analytics.py와 같은 규칙)의 합계입니다.
+"""
+import json
+
+from sqlalchemy import bindparam, case, or_, text, update
+from sqlalchemy.dialects.sqlite import insert
+
+from database import MatchupStats, OpponentStats, PlayerStats
+
+ROLLUP_TABLES = ("player_stats", "opponent_stats", "matchup_stats")
+
+
+def _empty():
+    return {"total": 0, "wins": 0, "losses": 0}
+
+
+def _count(counts, row):
+    counts["total"] += 1
+    if row["result"] == "WIN":
+        counts["wins"] += 1
+    elif row["result"] == "LOSE":
+        counts["losses"] += 1
+
+
+def _add_counts(table, statement, columns=("total", "wins", "losses")):
+    return {c: getattr(table.c, c) + getattr(statement.excluded, c) for c in columns}
+
+
+def apply_rollups(db, rows):
+    """
+    새로 저장된 매치 행(dict: id, player_id, opponent_name, opponent_character, my_character, my_mr, result, match_date)을
+    집계 테이블에 더합니다. 커밋은 호출 측(수집 트랜잭션)에서 합니다.
+    upsert는 파라미터 목록으로 실행(executemany)하므로 문장은 한 번만 컴파일되고,
+    상대/캐릭터 조합이 많아도 SQLite 바인딩 변수 개수 제한에 걸리지 않습니다.
+    """
+    if not rows:
+        return
+
+    mr_deltas, mr_adjustments = _mr_deltas(db, rows)
+    players, opponents, matchups = {}, {}, {}
+    for row in rows:
+        player = players.setdefault(row["player_id"], {**_empty(), "last": None})
+        _count(player, row)
+        if player["last"] is None or row["match_date"] > player["last"]["match_date"]:
+            player["last"] = row
+
+        # 이름/캐릭터를 읽지 못한 행은 REBUILD_STATEMENTS와 같이 상대별/캐릭터별 집계에서 제외
+        if row["opponent_name"] is not None:
+            opponent = opponents.setdefault((row["player_id"], row["opponent_name"]), {**_empty(), "last_match_date": None})
+            _count(opponent, row)
+            if opponent["last_match_date"] is None or row["match_date"] > opponent["last_match_date"]:
+                opponent["last_match_date"] = row["match_date"]
+
+        if row["opponent_character"] is not None and row["my_character"] is not None:
+            matchup = matchups.setdefault((row["player_id"], row["opponent_character"], row["my_character"]),
+                                          {**_empty(), "mr_delta": 0})
+            _count(matchup, row)
+            matchup["mr_delta"] += mr_deltas.get(row["id"]) or 0
+
+    # player_stats: 합계를 더하고, 더 최근 매치일 때만 마지막 상대 정보를 교체
+    table = PlayerStats.__table__
+    statement = insert(table)
+    is_newer = or_(table.c.last_match_date.is_(None), statement.excluded.last_match_date >= table.c.last_match_date)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.player_id],
+        set_={
+            **_add_counts(table, statement),
+            **{c: case((is_newer, getattr(statement.excluded, c)), else_=getattr(table.c, c))
+               for c in ("last_match_date", "last_opponent_name", "last_opponent_character", "last_my_character")}
+        }
+    ), [{
+        "player_id": player_id,
+        "total": p["total"], "wins": p["wins"], "losses": p["losses"],
+        "last_match_date": p["last"]["match_date"],
+        "last_opponent_name": p["last"]["opponent_name"],
+        "last_opponent_character": p["last"]["opponent_character"],
+        "last_my_character": p["last"]["my_character"],
+    } for player_id, p in players.items()])
+
+    if opponents:
+        _upsert_opponents(db, opponents)
+    if matchups:
+        _upsert_matchups(db, matchups)
+    if mr_adjustments:
+        table = MatchupStats.__table__
+        db.execute(
+            update(table)
+            .where(table.c.player_id == bindparam("owner_id"),
+                   table.c.opponent_character == bindparam("opponent"),
+                   table.c.my_character == bindparam("mine"))
+            .values(mr_delta=table.c.mr_delta + bindparam("change")),
+            [{"owner_id": player_id, "opponent": opponent, "mine": mine, "change": change}
+             for (player_id, opponent, mine), change in mr_adjustments.items()]
+        )
+
+
+def _mr_deltas(db, rows):
+    """
+    새 행의 MR 변화량 {id: 변화량}과, 새 행 때문에 직전 매치가 바뀐 기존 행의 변화량 차이
+    {(player_id, opponent_character, my_character): 차이}를 반환합니다.
+    매치 하나의 변화량은 직전 매치에만 의존하므로 전체 기록 대신 MR_DELTA_NEIGHBORS
+    (새 행 + 각 새 행의 앞/뒤 기존 행)만 읽습니다. 과거 매치가 기존 기록 사이에 끼어드는
+    백필/가져오기도 배치 크기에 비례하는 비용으로 끝납니다.
+    """
+    statement = text(MR_DELTA_NEIGHBORS)
+    deltas, adjustments = {}, {}
+    for row in db.execute(statement, {"ids": json.dumps([row["id"] for row in rows])}).mappings():
+        if row["inserted"]:
+            deltas[row["id"]] = row["mr_delta"]
+            continue
+        change = (row["mr_delta"] or 0) - (row["old_mr_delta"] or 0)
+        if change and row["opponent_character"] is not None and row["my_character"] is not None:
+            key = (row["player_id"], row["opponent_character"], row["my_character"])
+            adjustments[key] = adjustments.get(key, 0) + change
+    return deltas, adjustments
+
+
+def recompute_matchup_mr(conn, player_id=None):
+    """matchup_stats.mr_delta만 matches에서 다시 계산합니다 (player_id를 주면 해당 플레이어만)."""
+    params = {} if player_id is None else {"player_id": player_id}
+    player_filter = "" if player_id is None else "AND m.player_id = :player_id"
+    conn.execute(text(f"""
+        UPDATE matchup_stats SET mr_delta = d.mr_delta
+        FROM ({MATCHUP_MR_DELTA.format(player_filter=player_filter)}) AS d
+        WHERE matchup_stats.player_id = d.player_id
+          AND matchup_stats.opponent_character = d.opponent_character
+          AND matchup_stats.my_character = d.my_character
+    """), params)
+
+
+def _upsert_opponents(db, opponents):
+    table = OpponentStats.__table__
+    statement = insert(table)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.player_id, table.c.opponent_name],
+        set_={
+            **_add_counts(table, statement),
+            "last_match_date": case(
+                (or_(table.c.last_match_date.is_(None), statement.excluded.last_match_date > table.c.last_match_date),
+                 statement.excluded.last_match_date),
+                else_=table.c.last_match_date
+            )
+        }
+    ), [
+        {"player_id": player_id, "opponent_name": name, **counts}
+        for (player_id, name), counts in opponents.items()
+    ])
+
+
+def _upsert_matchups(db, matchups):
+    table = MatchupStats.__table__
+    statement = insert(table)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.player_id, table.c.opponent_character, table.c.my_character],
+        set_=_add_counts(table, statement, ("total", "wins", "losses", "mr_delta"))
+    ), [
+        {"player_id": player_id, "opponent_character": opponent_character, "my_character": my_character, **counts}
+        for (player_id, opponent_character, my_character), counts in matchups.items()
+    ])
+
+
+# 매치별 MR 변화량: 같은 플레이어의 직전 매치(match_date, id 순)가 같은 캐릭터일 때만 my_mr 차이.
+# 윈도 하나(player_id, match_date, id)만 쓰므로 (player_id, match_date) 인덱스 순서대로 읽힘
+MR_DELTA_ROWS = """
+    SELECT m.*, CASE WHEN LAG(m.my_character) OVER w = m.my_character THEN m.my_mr - LAG(m.my_mr) OVER w END AS mr_delta
+    FROM matches m
+    WHERE m.player_id IS NOT NULL {player_filter}
+    WINDOW w AS (PARTITION BY m.player_id ORDER BY m.match_date, m.id)
+"""
+
+# 새 행(:ids, JSON 배열)과, 새 행 바로 앞/뒤에 있는 기존 행(= 새 행 묶음마다 앞/뒤 경계)만 모아 MR_DELTA_ROWS와 같은 윈도를 적용합니다.
+# 새 행과 그 뒤 기존 행의 실제 직전 매치는 항상 이 집합 안에 있으므로 mr_delta는 전체 기록으로 계산한 값과 같고,
+# old_mr_delta(기존 행끼리만의 윈도)는 새 행이 들어오기 전 값입니다. 앞쪽 경계 행은 두 값이 같아 차이가 0이 됩니다.
+# 앞/뒤 행은 (match_date, id) 행 값 비교로 (player_id, match_date) 인덱스에서 한 번씩만 찾습니다.
+MR_DELTA_NEIGHBORS = """
+    WITH inserted AS (SELECT value AS id FROM json_each(:ids)),
+    new AS (SELECT m.* FROM matches m WHERE m.id IN (SELECT id FROM inserted)),
+    neighbors AS (
+        SELECT (SELECT e.id FROM matches e
+                WHERE e.player_id = n.player_id AND (e.match_date, e.id) < (n.match_date, n.id)
+                ORDER BY e.match_date DESC, e.id DESC LIMIT 1) AS id
+        FROM new n
+        UNION
+        SELECT (SELECT e.id FROM matches e
+                WHERE e.player_id = n.player_id AND (e.match_date, e.id) > (n.match_date, n.id)
+                ORDER BY e.match_date, e.id LIMIT 1)
+        FROM new n
+    ),
+    rows AS (
+        SELECT *, 1 AS inserted FROM new
+        UNION ALL
+        SELECT m.*, 0 FROM matches m
+        WHERE m.id IN (SELECT id FROM neighbors) AND m.id NOT IN (SELECT id FROM inserted)
+    )
+    SELECT r.id, r.player_id, r.opponent_character, r.my_character, r.inserted,
+           CASE WHEN LAG(r.my_character) OVER w = r.my_character THEN r.my_mr - LAG(r.my_mr) OVER w END AS mr_delta,
+           CASE WHEN LAG(r.my_character) OVER old = r.my_character THEN r.my_mr - LAG(r.my_mr) OVER old END AS old_mr_delta
+    FROM rows r
+    WINDOW w AS (PARTITION BY r.player_id ORDER BY r.match_date, r.id),
+           old AS (PARTITION BY r.player_id, r.inserted ORDER BY r.match_date, r.id)
+"""
+
+MATCHUP_MR_DELTA = """
+    SELECT m.player_id, m.opponent_character, m.my_character, COUNT(*) AS total,
+           SUM(CASE WHEN m.result = 'WIN' THEN 1 ELSE 0 END) AS wins,
+           SUM(CASE WHEN m.result = 'LOSE' THEN 1 ELSE 0 END) AS losses,
+           COALESCE(SUM(m.mr_delta), 0) AS mr_delta
+    FROM (""" + MR_DELTA_ROWS + """) m
+    WHERE m.opponent_character IS NOT NULL AND m.my_character IS NOT NULL
+    GROUP BY m.player_id, m.opponent_character, m.my_character
+"""
+
+
+REBUILD_STATEMENTS = (
+    """
+    INSERT INTO player_stats (player_id, total, wins, losses, last_match_date,
+                              last_opponent_name, last_opponent_character, last_my_character)
+    SELECT m.player_id, COUNT(*),
+           SUM(CASE WHEN m.result = 'WIN' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN m.result = 'LOSE' THEN 1 ELSE 0 END),
+           last.match_date, last.opponent_name, last.opponent_character, last.my_character
+    FROM matches m
+    JOIN matches last ON last.id = (
+        SELECT l.id FROM matches l WHERE l.player_id = m.player_id ORDER BY l.match_date DESC, l.id DESC LIMIT 1
+    )
+    WHERE m.player_id IS NOT NULL {player_filter}
+    GROUP BY m.player_id
+    """,
+    """
+    INSERT INTO opponent_stats (player_id, opponent_name, total, wins, losses, last_match_date)
+    SELECT m.player_id, m.opponent_name, COUNT(*),
+           SUM(CASE WHEN m.result = 'WIN' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN m.result = 'LOSE' THEN 1 ELSE 0 END),
+           MAX(m.match_date)
+    FROM matches m
+    WHERE m.player_id IS NOT NULL AND m.opponent_name IS NOT NULL {player_filter}
+    GROUP BY m.player_id, m.opponent_name
+    """,
+    "INSERT INTO matchup_stats (player_id, opponent_character, my_character, total, wins, losses, mr_delta)"
+    + MATCHUP_MR_DELTA,
+)
+
+
+def rebuild_rollups(conn, player_id=None):
+    """집계 테이블을 matches에서 다시 계산합니다 (player_id를 주면 해당 플레이어만). conn은 Session/Connection 모두 가능."""
+    params = {} if player_id is None else {"player_id": player_id}
+    where = "" if player_id is None else "WHERE player_id = :player_id"
+    for table in ROLLUP_TABLES:
+        conn.execute(text(f"DELETE FROM {table} {where}"), params)
+    player_filter = "" if player_id is None else "AND m.player_id = :player_id"
+    for statement in REBUILD_STATEMENTS:
+        conn.execute(text(statement.format(player_filter=player_filter)), params)
+
+
+def clear_rollups(conn):
+    for table in ROLLUP_TABLES:
+        conn.execute(text(f"DELETE FROM {table}"))
@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+
+DEFAULT_CONCURRENCY = 2
+DEFAULT_INTERVAL = 120  # 초
+DEFAULT_MAX_INTERVAL = 600  # 새 매치가 없을 때 늘어나는 주기의 상한
+BACKOFF_FACTOR = 2
+
+
+class _Entry:
+    def __init__(self, user_code, interval, max_interval):
+        self.user_code = user_code
+        self.min_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.interval = interval
+        self.idle_runs = 0
+        self.next_run = 0.0
+        self.running = False
+        self.deferred = False  # 같은 user_code의 이전 수집이 아직 진행 중이라 미뤄둔 상태
+        self.runs = 0
+        self.last_run = None
+        self.last_result = None
+        self.last_error = None
+
+
+class ScrapeScheduler:
+    """
+    여러 플레이어의 수집을 이벤트 루프 위에서 예약 실행하는 스케줄러.
+    - 플레이어별 수집 주기(interval): 새 매치를 찾으면 interval로 되돌리고,
+      아무 변화가 없으면 max_interval까지 BACKOFF_FACTOR배씩 늘림
+    - 실행 시각이 된 순서대로 꺼내는 큐 (같은 시각이면 등록 순서) -> 한 플레이어가 독점하지 않음
+    - 동시에 실행되는 수집 수를 concurrency로 제한
+    collect_fn(user_code)가 코루틴 함수이면 이벤트 루프에서 바로 실행하고, 동기 함수이면 스레드에서 실행합니다.
+    on_run(user_code)이 있으면 수집이 한 번 끝나고 상태가 갱신된 뒤 호출합니다 (실시간 알림용).
+    큐(heap)와 asyncio.Event는 스레드 안전하지 않으므로 register/unregister/set_players/configure는
+    이벤트 루프 스레드에서 호출해야 합니다 (FastAPI에서는 async 엔드포인트).
+    """
+
+    def __init__(self, collect_fn, concurrency=DEFAULT_CONCURRENCY, default_interval=DEFAULT_INTERVAL,
+                 default_max_interval=DEFAULT_MAX_INTERVAL, on_run=None):
+        self.collect_fn = collect_fn
+        self.on_run = on_run
+        self.concurrency = max(1, int(concurrency))
+        self.default_interval = default_interval
+        self.default_max_interval = default_max_interval
+        self._entries = {}
+        self._queue = []
+        self._seq = itertools.count()
+        self._semaphore = None
+        self._wakeup = None
+        self._task = None
+        self._running_tasks = set()
+        self._in_flight = set()  # 수집 중인 user_code (등록 해제 후 다시 등록돼도 같은 플레이어를 두 번 수집하지 않도록)
+
+    def register(self, user_code, interval=None, max_interval=None):
+        interval = interval or self.default_interval
+        max_interval = max_interval or self.default_max_interval
+        entry = self._entries.get(user_code)
+        if entry is None:
+            entry = _Entry(user_code, interval, max_interval)
+            self._entries[user_code] = entry
+            self._push(entry, time.monotonic())
+        elif (interval, max(interval, max_interval)) != (entry.min_interval, entry.max_interval):
+            # 설정이 바뀌면 백오프를 초기화하고 새 주기로 다시 예약
+            entry.min_interval = entry.interval = interval
+            entry.max_interval = max(interval, max_interval)
+            entry.idle_runs = 0
+            if not entry.running:
+                self._push(entry, time.monotonic() + interval)
+        return entry
+
+    def unregister(self, user_code):
+        # 큐에 남아 있는 항목은 꺼낼 때 무시됩니다.
+        self._entries.pop(user_code, None)
+        self._notify()
+
+    def set_players(self, players):
+        """[{"user_code": ..., "interval": ..., "max_interval": ...}] 목록과 일치하도록 등록 상태를 맞춥니다."""
+        wanted = {p["user_code"]: p for p in players if p.get("user_code")}
+        for user_code in list(self._entries):
+            if user_code not in wanted:
+                self.unregister(user_code)
+        for user_code, p in wanted.items():
+            self.register(user_code, p.get("interval"), p.get("max_interval"))
+
+    def configure(self, concurrency=None):
+        if concurrency:
+            self.concurrency = max(1, int(concurrency))
+            if self._semaphore is not None:
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """이벤트 루프 안에서 호출해야 합니다 (FastAPI startup 등)."""
+        if self.is_running():
+            return
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._dispatch_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        for task in list(self._running_tasks):
+            task.cancel()
+        await asyncio.gather(self._task, *self._running_tasks, return_exceptions=True)
+        self._task = None
+
+    def status(self):
+        now = time.monotonic()
+        return {
+            "running": self.is_running(),
+            "concurrency": self.concurrency,
+            "players": [{
+                "user_code": e.user_code,
+                "interval": e.min_interval,
+                "max_interval": e.max_interval,
+                "current_interval": e.interval,
+                "idle_runs": e.idle_runs,
+                "collecting": e.running,
+                "runs": e.runs,
+                "next_run_in": None if e.running else max(0, round(e.next_run - now)),
+                "last_run": e.last_run,
+                "last_result": e.last_result,
+                "last_error": e.last_error
+            } for e in self._entries.values()]
+        }
+
+    @staticmethod
+    def _adapt(entry, result, error):
+        """새 매치가 있으면 최소 주기로, 없거나 실패하면 지수적으로 주기를 늘립니다."""
+        new_count = result.get("new_count", 0) if isinstance(result, dict) else 0
+        if not error and new_count:
+            entry.idle_runs = 0
+            entry.interval = entry.min_interval
+        else:
+            entry.idle_runs += 1
+            entry.interval = min(entry.interval * BACKOFF_FACTOR, entry.max_interval)
+
+    def _push(self, entry, at):
+        entry.next_run = at
+        heapq.heappush(self._queue, (at, next(self._seq), entry.user_code))
+        self._notify()
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _dispatch_loop(self):
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            if self._queue and self._queue[0][0] <= now:
+                at, _, user_code = heapq.heappop(self._queue)
+                entry = self._entries.get(user_code)
+                # 등록 해제되었거나 다시 예약되어 더 이상 유효하지 않은 항목은 건너뜀
+                if entry is None or entry.running or at != entry.next_run:
+                    continue
+                if user_code in self._in_flight:
+                    # 해제 전에 시작된 수집이 끝나면 _run에서 바로 다시 예약
+                    entry.deferred = True
+                    continue
+                semaphore = self._semaphore
+                await semaphore.acquire()
+                entry.running = True
+                self._in_flight.add(user_code)
+                task = asyncio.get_running_loop().create_task(self._run(entry, semaphore))
+                self._running_tasks.add(task)
+                task.add_done_callback(self._running_tasks.discard)
+                continue
+
+            timeout = self._queue[0][0] - now if self._queue else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, entry, semaphore):
+        result = error = None
+        try:
+            if asyncio.iscoroutinefunction(self.collect_fn):
+                result = await self.collect_fn(entry.user_code)
+            else:
+                result = await asyncio.to_thread(self.collect_fn, entry.user_code)
+            entry.last_result = result
+            entry.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ [Scheduler] {entry.user_code} 수집 실패: {e}")
+            error = entry.last_error = str(e)
+        finally:
+            semaphore.release()
+            entry.running = False
+            self._in_flight.discard(entry.user_code)
+            self._adapt(entry, result, error)
+            entry.runs += 1
+            entry.last_run = datetime.now().isoformat(timespec="seconds")
+            current = self._entries.get(entry.user_code)
+            if current is entry:
+                self._push(entry, time.monotonic() + entry.interval)
+            elif current is not None and current.deferred:
+                current.deferred = False
+                self._push(current, time.monotonic())
+        if self.on_run is not None:
+            self.on_run(entry.user_code)
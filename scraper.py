@@ -1,12 +1,47 @@
+import html
 import json
 import os
+import queue
+import re
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
 from playwright.sync_api import sync_playwright
 
+from match_keys import match_fingerprint, match_key
+
 AUTH_FILE = "auth.json"
 TARGET_URL = "https://www.streetfighter.com/6/buckler"
 
+# 시스템 Chrome -> Edge -> 번들 Chromium 순서로 실행을 시도합니다.
+BROWSER_CHANNELS = ("chrome", "msedge", None)
+LOGIN_CHANNELS = ("chrome", "msedge")  # 로그인 창은 사용자가 쓰는 시스템 브라우저로 띄웁니다.
+UNKNOWN_CHANNEL = object()  # 아직 브라우저를 실행한 적이 없음
+CONTEXT_OPTIONS = {
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    "viewport": {'width': 1920, 'height': 1080},
+    "locale": 'ko-KR',
+    "timezone_id": 'Asia/Seoul',
+}
+KST = timezone(timedelta(hours=9))
+UNKNOWN_PLAYER = {"user_code": "unknown", "name": "Unknown", "lp": 0, "rank": "Unknown", "character": "Unknown"}
+DEFAULT_POOL_SIZE = 1
+DEFAULT_IDLE_TIMEOUT = 300  # 초. 이 시간 동안 사용이 없으면 브라우저를 닫습니다.
+SCRAPER_BACKENDS = ("browser", "http")
+
+# 빠른 탐색 모드: 읽지 않는 리소스(이미지/미디어/폰트)와 외부 도메인 요청을 차단합니다.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+FIRST_PARTY_DOMAIN = "streetfighter.com"
+NEXT_DATA_SELECTOR = "#__NEXT_DATA__"
+READY_TIMEOUT_MS = 15000
+BATTLELOG_TABS = ("rank", "casual", "custom", "hub")
+NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
 if hasattr(sys.stdout, "reconfigure"):
     sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 if hasattr(sys.stderr, "reconfigure"):
@@ -26,37 +61,637 @@ def auth_state_has_session(path=AUTH_FILE):
     return bool(state.get("cookies") or state.get("origins"))
 
 
+def props_from_next_data(text):
+    """#__NEXT_DATA__ 스크립트 원문(JSON)에서 pageProps를 꺼냅니다."""
+    try:
+        next_data = json.loads(text or "")
+    except json.JSONDecodeError:
+        return {}
+
+    return next_data.get("props", {}).get("pageProps", {})
+
+
 def next_page_props(page):
     next_data_el = page.locator("#__NEXT_DATA__")
     if next_data_el.count() == 0:
         return {}
+    return props_from_next_data(next_data_el.text_content())
 
-    try:
-        next_data = json.loads(next_data_el.text_content())
-    except json.JSONDecodeError:
-        return {}
 
-    return next_data.get("props", {}).get("pageProps", {})
+def next_data_props(body):
+    """HTML 본문의 #__NEXT_DATA__ 스크립트에서 pageProps를 꺼냅니다."""
+    found = NEXT_DATA_RE.search(body)
+    if not found:
+        return {}
+    return props_from_next_data(html.unescape(found.group(1)))
 
 
-def page_is_auth_blocked(page):
-    props = next_page_props(page)
+def props_are_auth_blocked(props, login_links):
+    """403 응답이거나, 로그인 링크만 있고 프로필 데이터가 없으면 로그인이 필요한 상태로 봅니다."""
     if props.get("common", {}).get("statusCode") == 403:
         return True
+    return login_links > 0 and not props.get("fighter_banner_info")
+
 
-    login_links = page.locator("a[href*='/auth/loginep']").count()
-    profile_data = props.get("fighter_banner_info")
-    return login_links > 0 and not profile_data
+def page_is_auth_blocked(page, props=None):
+    if props is None:
+        props = next_page_props(page)
+    return props_are_auth_blocked(props, page.locator("a[href*='/auth/loginep']").count())
+
+
+def raise_if_error_page(url):
+    if "error-system" in url:
+        print("❌ [Scraper] 시스템 에러 페이지 감지됨. 인증 만료 또는 시스템 오류.")
+        raise Exception("AUTH_ERROR: System error page detected")
 
 
 def class_contains(name):
     return f"[class*='{name}']"
 
-class Scraper:
+
+BATTLELOG_ITEMS = f"{class_contains('battle_data_battlelog__list')} > li"
+
+# Battle Log의 모든 행을 한 번의 evaluate 호출로 읽어옵니다 (행마다 locator 왕복을 하지 않도록).
+BATTLELOG_EXTRACT_JS = """
+([itemSelector, limit]) => {
+    const has = (name) => `[class*='${name}']`;
+    const text = (root, selector) => {
+        const el = root.querySelector(selector);
+        return el ? el.textContent.trim() : null;
+    };
+    const attr = (root, selector, name) => {
+        const el = root.querySelector(selector);
+        return el ? el.getAttribute(name) : null;
+    };
+    return Array.from(document.querySelectorAll(itemSelector)).slice(0, limit).map((li) => {
+        const row = { date: text(li, has('battle_data_date')) };
+        for (const n of [1, 2]) {
+            const player = `${has('battle_data_player' + n)}`;
+            row[`p${n}_name`] = text(li, `${has('battle_data_name_p' + n)} ${has('battle_data_name')}`);
+            row[`p${n}_class`] = attr(li, player, 'class');
+            row[`p${n}_character`] = attr(li, `${player} ${has('battle_data_character')} img`, 'alt');
+            row[`p${n}_lp`] = text(li, `${player} ${has('battle_data_lp')}`);
+        }
+        return row;
+    });
+}
+"""
+
+
+# 현재 페이지의 세션 쿠키로 여러 Battle Log 페이지를 동시에 요청합니다 (한 번의 evaluate 왕복).
+FETCH_PAGES_JS = """
+async (urls) => Promise.all(urls.map(async (url) => {
+    try {
+        const res = await fetch(url, { credentials: 'include' });
+        return { url, status: res.status, final_url: res.url, body: res.ok ? await res.text() : '' };
+    } catch (e) {
+        return { url, status: 0, final_url: url, body: '', error: String(e) };
+    }
+}))
+"""
+
+PROFILE_HREFS_JS = "() => Array.from(document.querySelectorAll(\"a[href*='/profile/']\"), a => a.getAttribute('href'))"
+
+
+def parse_rating(text):
+    """'1,650 MR' / '25,000 LP' 형태의 텍스트를 (mr, lp)로 변환합니다."""
+    text = (text or "").strip()
+    if "MR" in text:
+        return int(text.replace("MR", "").replace(",", "").strip()), None
+    if "LP" in text:
+        return None, int(text.replace("LP", "").replace(",", "").strip())
+    return None, None
+
+
+def result_from_class(class_name):
+    class_name = class_name or ""
+    if "battle_data_win" in class_name:
+        return "WIN"
+    if "battle_data_lose" in class_name:
+        return "LOSE"
+    return "UNKNOWN"
+
+
+def battlelog_row_from_dom(raw):
+    """DOM에서 읽은 원시 텍스트/클래스 값을 match_from_row 입력 형식으로 변환합니다."""
+    row = {"date": (raw.get("date") or "").strip()}
+    for n in (1, 2):
+        mr, lp = parse_rating(raw.get(f"p{n}_lp") or "0")
+        row[f"p{n}_name"] = (raw.get(f"p{n}_name") or "").strip() or "Unknown"
+        row[f"p{n}_result"] = result_from_class(raw.get(f"p{n}_class"))
+        row[f"p{n}_character"] = raw.get(f"p{n}_character") or "Unknown"
+        row[f"p{n}_mr"] = mr
+        row[f"p{n}_lp"] = lp
+    return row
+
+
+def battlelog_rows_from_props(props):
+    """
+    Battle Log 페이지의 __NEXT_DATA__ (pageProps.replay_list)를 행 목록으로 변환합니다.
+    replay_list가 없으면 None을 반환하여 DOM 파싱으로 넘어가게 합니다.
+    """
+    replays = props.get("replay_list")
+    if not isinstance(replays, list):
+        return None
+
+    rows = []
+    for replay in replays:
+        uploaded_at = replay.get("uploaded_at")
+        date_str = ""
+        if uploaded_at:
+            date_str = datetime.fromtimestamp(uploaded_at, KST).strftime("%Y/%m/%d %H:%M")
+
+        row = {"date": date_str, "replay_id": replay.get("replay_id") or None}
+        rounds = {}
+        for n in (1, 2):
+            info = replay.get(f"player{n}_info") or {}
+            player = info.get("player") or {}
+            mr = info.get("master_rating") or None
+            row[f"p{n}_name"] = player.get("fighter_id") or "Unknown"
+            row[f"p{n}_user_code"] = str(player["short_id"]) if player.get("short_id") else None
+            row[f"p{n}_character"] = info.get("character_name") or "Unknown"
+            row[f"p{n}_mr"] = mr
+            row[f"p{n}_lp"] = None if mr else info.get("league_point")
+            # round_results: 라운드별 결과 코드 (0 = 패배, 그 외 = 승리 방식)
+            rounds[n] = sum(1 for r in info.get("round_results") or [] if r)
+
+        if rounds[1] == rounds[2]:
+            row["p1_result"] = row["p2_result"] = "UNKNOWN"
+        else:
+            row["p1_result"] = "WIN" if rounds[1] > rounds[2] else "LOSE"
+            row["p2_result"] = "WIN" if rounds[2] > rounds[1] else "LOSE"
+        rows.append(row)
+    return rows
+
+
+def match_from_row(row, my_name, user_code=None):
+    """양쪽 플레이어 정보가 담긴 행을 '내' 기준의 매치 dict로 변환합니다."""
+    p1_name, p2_name = row["p1_name"], row["p2_name"]
+
+    # 내 이름(또는 User Code)과 비교하여 누가 나인지 판단
+    if user_code and row.get("p1_user_code") == str(user_code):
+        me, opponent = 1, 2
+    elif user_code and row.get("p2_user_code") == str(user_code):
+        me, opponent = 2, 1
+    elif my_name and p1_name == my_name:
+        me, opponent = 1, 2
+    elif my_name and p2_name == my_name:
+        me, opponent = 2, 1
+    else:
+        # 이름을 알 수 없는 경우 기본값 (Player 2가 나)
+        print(f"   - 경고: 이름 매칭 실패 (P1: {p1_name}, P2: {p2_name}, My: {my_name})")
+        me, opponent = 2, 1
+
+    match = {
+        "date": row["date"],
+        "opponent_name": row[f"p{opponent}_name"],
+        "opponent_character": row[f"p{opponent}_character"],
+        "opponent_mr": row[f"p{opponent}_mr"],
+        "opponent_lp": row[f"p{opponent}_lp"],
+        "my_character": row[f"p{me}_character"],
+        "my_mr": row[f"p{me}_mr"],
+        "my_lp": row[f"p{me}_lp"],
+        "result": row[f"p{me}_result"],
+        "replay_id": row.get("replay_id")
+    }
+    match["fingerprint"] = match_fingerprint(match)
+    match["match_key"] = match_key(match)
+    return match
+
+
+def should_block_request(resource_type, url, is_navigation=False):
+    # 페이지 이동(로그인 리다이렉트 포함)은 항상 허용
+    if is_navigation:
+        return False
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlsplit(url).hostname or ""
+    return host != FIRST_PARTY_DOMAIN and not host.endswith("." + FIRST_PARTY_DOMAIN)
+
+
+def block_unused_requests(route):
+    request = route.request
+    if should_block_request(request.resource_type, request.url, request.is_navigation_request()):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def file_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def battlelog_url(user_code, tab="rank", page_no=1, base_url=TARGET_URL):
+    url = f"{base_url}/ko-kr/profile/{user_code}/battlelog/{tab}"
+    return url if page_no == 1 else f"{url}?page={page_no}"
+
+
+def battlelog_page_result(props, page_no, my_name, user_code):
+    """Battle Log 한 페이지의 pageProps를 {page, matches, total_page}로 변환합니다."""
+    rows = battlelog_rows_from_props(props) or []
+    return {
+        "page": page_no,
+        "matches": [match_from_row(row, my_name, user_code) for row in rows],
+        "total_page": props.get("total_page")
+    }
+
+
+def profile_from_props(props, user_code):
+    """프로필 페이지 pageProps.fighter_banner_info에서 이름/LP/랭크/캐릭터를 읽습니다."""
+    name = "Unknown"
+    lp = 0
+    rank = "Unknown"
+    character = "Unknown"
+
+    # JSON 데이터 파싱 (Next.js Hydration Data 사용)
+    try:
+        if props:
+
+            # 데이터 경로: props -> pageProps -> fighter_banner_info
+            info = props.get("fighter_banner_info", {})
+
+            if info:
+                # 이름
+                name = info.get("personal_info", {}).get("fighter_id", "Unknown")
+                print(f"   - [JSON] 이름: {name}")
+
+                # 캐릭터 (영어 대문자, 예: RASHID)
+                character = info.get("favorite_character_alpha", "Unknown")
+                print(f"   - [JSON] 캐릭터: {character}")
+
+                # 리그 정보
+                league_info = info.get("favorite_character_league_info", {})
+                if league_info:
+                    # LP
+                    lp = league_info.get("league_point", 0)
+                    print(f"   - [JSON] LP: {lp}")
+
+                    # MR & Rank
+                    mr_val = league_info.get("master_rating", 0)
+                    rank_name = league_info.get("league_rank_info", {}).get("league_rank_name", "Unknown")
+
+                    if mr_val and mr_val > 0:
+                        mr = mr_val
+                        rank = f"{rank_name} ({mr} MR)"
+                        print(f"   - [JSON] MR: {mr}")
+                    else:
+                        rank = rank_name
+                        print(f"   - [JSON] Rank: {rank}")
+            else:
+                print("   - [JSON] fighter_banner_info가 비어있음")
+        else:
+            print("   - [JSON] __NEXT_DATA__ 태그를 찾을 수 없음 (DOM 파싱으로 전환 필요)")
+
+    except Exception as e:
+        print(f"   - JSON 파싱 중 에러: {e}")
+
+    if name == "Unknown":
+        raise Exception("PROFILE_PARSE_ERROR: fighter_banner_info not found")
+
+    return {
+        "user_code": user_code,
+        "name": name,
+        "lp": lp,
+        "rank": rank,
+        "character": character
+    }
+
+
+def user_code_from_href(href):
+    # href에서 숫자(User Code) 추출 시도
+    for part in reversed((href or "").split("/")):
+        if part.isdigit() and len(part) > 5: # User Code는 보통 깁니다 (최소 6자리 이상 가정)
+            return part
+    return None
+
+
+def first_user_code(hrefs):
+    """프로필 링크 href 목록에서 처음 나오는 User Code를 반환합니다. 없으면 None."""
+    for href in hrefs:
+        user_code = user_code_from_href(href)
+        if user_code:
+            return user_code
+    return None
+
+
+def matches_from_rows(rows, my_name, user_code, limit, stop_at=None, source="Scraper"):
+    """
+    Battle Log 행을 최대 limit개까지 매치로 변환합니다 (동기/비동기/http 스크래퍼 공용).
+    행은 필요한 만큼만 읽으므로, stop_at(이미 저장된 최신 매치의 fingerprint)을 만나면 나머지는 읽지 않습니다.
+    반환값: (matches, 읽은 행 수)
+    """
+    matches = []
+    parsed = 0
+    for i, row in enumerate(islice(rows, limit)):
+        parsed += 1
+        try:
+            match_data = match_from_row(row, my_name, user_code)
+        except Exception as e:
+            print(f"⚠️ [{source}] 대전 기록 {i+1} 파싱 중 에러: {e}")
+            continue
+
+        if stop_at and match_data["fingerprint"] == stop_at:
+            print(f"   - 매치 {i+1}: 이미 저장된 최신 매치에 도달하여 파싱을 중단합니다.")
+            break
+        matches.append(match_data)
+    return matches, parsed
+
+
+def launch_channels(last_channel=UNKNOWN_CHANNEL):
+    """실행을 시도할 브라우저 채널 순서. 지난번에 성공한 채널을 먼저 시도합니다."""
+    channels = list(BROWSER_CHANNELS)
+    if last_channel is not UNKNOWN_CHANNEL:
+        channels.remove(last_channel)
+        channels.insert(0, last_channel)
+    return channels
+
+
+def channel_label(channel):
+    return None if channel is UNKNOWN_CHANNEL else (channel or "bundled")
+
+
+def record_navigation(timings, url, fast, started):
+    """페이지 이동 소요 시간을 기록하고 ms 단위로 반환합니다."""
+    elapsed_ms = round((time.perf_counter() - started) * 1000)
+    timings.append({
+        "url": url,
+        "mode": "fast" if fast else "networkidle",
+        "elapsed_ms": elapsed_ms,
+        "at": datetime.now().isoformat(timespec="seconds")
+    })
+    return elapsed_ms
+
+
+class _BrowserSlot:
+    """워커 스레드 하나가 소유하는 playwright/browser/context/page 묶음"""
+
     def __init__(self):
+        self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.auth_mtime = None
+        self.fast_navigation = None
+
+
+class BrowserPool:
+    """
+    헤드리스 브라우저를 호출마다 띄우지 않고 재사용하는 풀.
+    Playwright sync 객체는 생성한 스레드에서만 사용할 수 있으므로
+    워커 스레드마다 자신의 브라우저/컨텍스트/페이지를 소유하고, 작업은 큐로 전달합니다.
+    - 성공한 브라우저 채널(chrome/msedge/번들)을 기억해 다음 실행 때 먼저 시도
+    - 페이지를 닫지 않고 다음 호출에서 재사용 (warm page)
+    - 브라우저가 죽었으면 재시작 후 작업을 한 번 재시도
+    - auth.json이 바뀌면 컨텍스트를 새 세션으로 다시 생성
+    - idle_timeout 동안 작업이 없으면 브라우저를 닫아 메모리를 반환
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 auth_file=AUTH_FILE, headless=True, fast_navigation=True):
+        self.pool_size = max(1, int(pool_size))
+        self.idle_timeout = idle_timeout
+        self.auth_file = auth_file
+        self.headless = headless
+        self.fast_navigation = fast_navigation
+        self.channel = UNKNOWN_CHANNEL
+        self.launch_count = 0
+        self._tasks = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def configure(self, pool_size=None, idle_timeout=None):
+        """풀 크기/유휴 타임아웃 변경. 줄어든 만큼의 워커는 현재 작업을 마친 뒤 종료됩니다."""
+        with self._lock:
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+            if pool_size is not None:
+                self.pool_size = max(1, int(pool_size))
+                alive = [w for w in self._workers if w.is_alive()]
+                for _ in range(len(alive) - self.pool_size):
+                    self._tasks.put(None)
+
+    def run(self, fn, timeout=None):
+        """풀의 페이지 하나로 fn(page)를 실행하고 결과를 반환합니다."""
+        self._ensure_workers()
+        future = Future()
+        self._tasks.put((fn, future))
+        return future.result(timeout)
+
+    def stats(self):
+        with self._lock:
+            workers = sum(1 for w in self._workers if w.is_alive())
+        return {
+            "pool_size": self.pool_size,
+            "idle_timeout": self.idle_timeout,
+            "channel": channel_label(self.channel),
+            "workers": workers,
+            "launch_count": self.launch_count,
+        }
+
+    def close(self):
+        with self._lock:
+            workers = [w for w in self._workers if w.is_alive()]
+            self._workers = []
+        for _ in workers:
+            self._tasks.put(None)
+        for w in workers:
+            w.join(timeout=10)
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self.pool_size:
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"browser-pool-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self):
+        slot = _BrowserSlot()
+        try:
+            while True:
+                try:
+                    item = self._tasks.get(timeout=self.idle_timeout or None)
+                except queue.Empty:
+                    if slot.browser is not None:
+                        print(f"[BrowserPool] {self.idle_timeout}초 동안 사용이 없어 브라우저를 닫습니다.")
+                        self._close_slot(slot)
+                    continue
+
+                if item is None:
+                    break
+
+                fn, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self._run_in_slot(slot, fn))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            self._close_slot(slot)
+
+    def _run_in_slot(self, slot, fn):
+        page = self._acquire_page(slot)
+        try:
+            return fn(page)
+        except Exception:
+            if slot.browser is not None and not slot.browser.is_connected():
+                print("[BrowserPool] 브라우저가 비정상 종료되었습니다. 재시작 후 다시 시도합니다.")
+                self._close_slot(slot)
+                return fn(self._acquire_page(slot))
+            raise
+
+    def _acquire_page(self, slot):
+        if slot.browser is None or not slot.browser.is_connected():
+            self._close_slot(slot)
+            self._launch(slot)
+
+        auth_mtime = file_mtime(self.auth_file)
+        if slot.context is not None and slot.auth_mtime != auth_mtime:
+            print("[BrowserPool] auth.json 변경 감지. 컨텍스트를 다시 생성합니다.")
+            self._close_context(slot)
+        if slot.context is not None and slot.fast_navigation != self.fast_navigation:
+            self._close_context(slot)
+
+        if slot.context is None:
+            slot.context = slot.browser.new_context(storage_state=self.auth_file, **CONTEXT_OPTIONS)
+            if self.fast_navigation:
+                slot.context.route("**/*", block_unused_requests)
+            slot.auth_mtime = auth_mtime
+            slot.fast_navigation = self.fast_navigation
+
+        if slot.page is None or slot.page.is_closed():
+            slot.page = slot.context.new_page()
+        return slot.page
+
+    def _launch(self, slot):
+        channels = launch_channels(self.channel)
+        slot.playwright = sync_playwright().start()
+        errors = []
+        for channel in channels:
+            options = {"headless": self.headless}
+            if channel:
+                options["channel"] = channel
+            try:
+                slot.browser = slot.playwright.chromium.launch(**options)
+            except Exception as e:
+                errors.append(f"{channel or 'bundled'}: {e}")
+                continue
+
+            self.channel = channel
+            self.launch_count += 1
+            print(f"[BrowserPool] 브라우저 실행 완료 (channel={channel or 'bundled'})")
+            return
+
+        self._close_slot(slot)
+        raise Exception("BROWSER_ERROR: Failed to launch browser. " + " | ".join(errors))
+
+    def _close_context(self, slot):
+        for obj in (slot.page, slot.context):
+            if obj is None:
+                continue
+            try:
+                obj.close()
+            except Exception:
+                pass
+        slot.page = None
+        slot.context = None
+        slot.auth_mtime = None
+        slot.fast_navigation = None
+
+    def _close_slot(self, slot):
+        self._close_context(slot)
+        if slot.browser is not None:
+            try:
+                slot.browser.close()
+            except Exception:
+                pass
+        if slot.playwright is not None:
+            try:
+                slot.playwright.stop()
+            except Exception:
+                pass
+        slot.browser = None
+        slot.playwright = None
+
+
+class Scraper:
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, backend="browser"):
+        from http_scraper import HttpScraper
+
+        self.pool = BrowserPool(pool_size=pool_size, idle_timeout=idle_timeout)
+        self.http = HttpScraper()
+        self.nav_timings = deque(maxlen=100)
+        self.configure_backend(backend)
+
+    def configure_pool(self, pool_size=None, idle_timeout=None):
+        self.pool.configure(pool_size=pool_size, idle_timeout=idle_timeout)
+
+    def configure_backend(self, backend):
+        """browser: 항상 Playwright 사용 / http: 쿠키로 직접 요청하고 실패 시 브라우저로 전환"""
+        if backend not in SCRAPER_BACKENDS:
+            raise ValueError(f"Unknown scraper backend: {backend}")
+        self.backend = backend
+
+    def configure_navigation(self, fast_navigation):
+        """fast: 불필요한 요청 차단 + 필요한 요소가 나타나면 바로 진행 / 아니면 networkidle 대기"""
+        self.pool.fast_navigation = bool(fast_navigation)
+
+    def navigation_stats(self):
+        timings = list(self.nav_timings)
+        summary = {}
+        for mode in ("fast", "networkidle"):
+            elapsed = [t["elapsed_ms"] for t in timings if t["mode"] == mode]
+            if elapsed:
+                summary[mode] = {
+                    "count": len(elapsed),
+                    "avg_ms": round(sum(elapsed) / len(elapsed)),
+                    "max_ms": max(elapsed)
+                }
+        return {
+            "fast_navigation": self.pool.fast_navigation,
+            "summary": summary,
+            "recent": timings[-20:]
+        }
+
+    def close(self):
+        self.pool.close()
+        self.http.close()
+
+    def _goto(self, page, url, ready_selector=NEXT_DATA_SELECTOR):
+        """페이지 이동 후 파싱에 필요한 요소가 준비될 때까지 대기하고, 소요 시간을 기록합니다."""
+        fast = self.pool.fast_navigation
+        started = time.perf_counter()
+        if fast:
+            page.goto(url, wait_until="domcontentloaded")
+            try:
+                page.wait_for_selector(ready_selector, state="attached", timeout=READY_TIMEOUT_MS)
+            except Exception as e:
+                # 에러/로그인 페이지에는 해당 요소가 없을 수 있으므로 이후 검사에 맡깁니다.
+                print(f"   - 준비 요소 대기 실패 ({ready_selector}): {e}")
+        else:
+            page.goto(url, wait_until='networkidle')
+            page.wait_for_load_state("networkidle")
+
+        elapsed_ms = record_navigation(self.nav_timings, url, fast, started)
+        print(f"   - 페이지 이동 완료 ({elapsed_ms}ms, {'fast' if fast else 'networkidle'})")
+
+    def _try_http(self, method, *args):
+        """http 백엔드로 먼저 시도합니다. 브라우저가 필요하면 None을 반환합니다."""
+        if self.backend != "http":
+            return None
+        try:
+            return getattr(self.http, method)(*args)
+        except Exception as e:
+            print(f"⚠️ [Scraper] HTTP 백엔드 실패, 브라우저로 전환합니다: {e}")
+            return None
 
     def login_and_save_state(self):
         """
@@ -68,14 +703,17 @@ class Scraper:
             with sync_playwright() as p:
                 print("[Scraper] Playwright initialized. Launching chromium...")
                 try:
-                    # 시스템 브라우저(Chrome/Edge) 사용 시도
-                    try:
-                        print("[Scraper] Trying to launch system Chrome...")
-                        browser = p.chromium.launch(headless=False, channel="chrome")
-                    except Exception:
-                        print("[Scraper] Chrome not found. Trying Edge...")
-                        browser = p.chromium.launch(headless=False, channel="msedge")
-                    
+                    # 시스템 브라우저(Chrome -> Edge) 사용 시도
+                    browser = None
+                    for channel in LOGIN_CHANNELS:
+                        try:
+                            print(f"[Scraper] Trying to launch system {channel}...")
+                            browser = p.chromium.launch(headless=False, channel=channel)
+                            break
+                        except Exception as e:
+                            launch_error = e
+                    if browser is None:
+                        raise launch_error
                     print("[Scraper] Browser launched successfully.")
                 except Exception as e:
                     print(f"❌ [Scraper] Browser launch failed: {e}")
@@ -121,363 +759,273 @@ class Scraper:
             print("❌ [Scraper] 인증 파일이 없습니다. 먼저 로그인을 진행해주세요.")
             raise Exception("AUTH_ERROR: Missing or empty auth state. Please login again.")
 
-        data = {}
-        with sync_playwright() as p:
-            print("1. 브라우저 실행 중 (Headless: True)...")
-            try:
-                browser = p.chromium.launch(headless=True, channel="chrome")
-            except Exception:
-                try:
-                    browser = p.chromium.launch(headless=True, channel="msedge")
-                except Exception:
-                    # Fallback to bundled if available (unlikely in this case but good practice)
-                    try:
-                         browser = p.chromium.launch(headless=True)
-                    except Exception as e:
-                        print(f"❌ [Scraper] Failed to launch browser in get_stats: {e}")
-                        return None
-            context = browser.new_context(
-                storage_state=AUTH_FILE,
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
-                locale='ko-KR',
-                timezone_id='Asia/Seoul'
-            )
-            page = context.new_page()
-            
-            print(f"2. 타겟 URL 접속 중: {TARGET_URL}")
-            page.goto(TARGET_URL, wait_until='networkidle')
-            page.wait_for_load_state("networkidle")
-            
-            if "error-system" in page.url:
-                print("❌ [Scraper] 시스템 에러 페이지 감지됨. 인증 만료 또는 시스템 오류.")
-                browser.close()
-                raise Exception("AUTH_ERROR: System error page detected")
-            if page_is_auth_blocked(page):
-                browser.close()
-                raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
-            
-            print("3. 페이지 로드 완료. 사용자 정보 파싱 시작...")
+        data = self._try_http("get_stats", user_code)
+        if data is not None:
+            print("=== [Scraper] get_stats 종료 (HTTP) ===")
+            return data
 
-            try:
-                # 이름 및 User Code 가져오기
-                name = "Unknown"
-                lp = 0
-                rank = "Unknown"
-                character = "Unknown"
-                extracted_user_code = "unknown_code"
-
-                # 전략 1: 프로필 링크(a 태그)에서 텍스트와 href 추출
-                print("   - 프로필 링크 탐색 중...")
-                # 1. 헤더의 '내 프로필' 또는 닉네임 링크 찾기
-                # 보통 href에 /profile/숫자 형태가 포함됨
-                profile_links = page.locator("a[href*='/profile/']").all()
-                print(f"   - 발견된 프로필 링크 후보 수: {len(profile_links)}")
-
-                target_link = None
-                for i, link in enumerate(profile_links):
-                    try:
-                        text = link.text_content().strip()
-                        href = link.get_attribute("href")
-                        print(f"     [{i}] 텍스트='{text}', href='{href}'")
-                        
-                        if href:
-                            # href에서 숫자(User Code) 추출 시도
-                            parts = href.split("/")
-                            for part in reversed(parts):
-                                if part.isdigit() and len(part) > 5: # User Code는 보통 깁니다 (최소 6자리 이상 가정)
-                                    extracted_user_code = part
-                                    target_link = link
-                                    print(f"       -> 유효한 User Code 후보 발견: {extracted_user_code}")
-                                    break
-                        
-                        if target_link:
-                            break
-                    except Exception as e:
-                        print(f"     [{i}] 링크 분석 중 에러: {e}")
-                        continue
-                
-                print(f"   - 최종 추출된 User Code: {extracted_user_code}")
-                
-                if not user_code or user_code == "unknown_code":
-                    user_code = extracted_user_code
-
-                # 상세 프로필 페이지로 이동
-                if user_code and user_code != "unknown_code":
-                    profile_url = f"{TARGET_URL}/ko-kr/profile/{user_code}"
-                    print(f"4. 상세 프로필 페이지로 이동: {profile_url}")
-                    page.goto(profile_url, wait_until='networkidle')
-                    page.wait_for_load_state("networkidle")
-                    if page_is_auth_blocked(page):
-                        browser.close()
-                        raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
-                    
-                    # 상세 페이지에서 정보 추출
-                    print("5. 상세 페이지 정보 파싱...")
-                    
-                    # JSON 데이터 파싱 (Next.js Hydration Data 사용)
-                    try:
-                        props = next_page_props(page)
-                        if props:
-                            
-                            # 데이터 경로: props -> pageProps -> fighter_banner_info
-                            info = props.get("fighter_banner_info", {})
-                            
-                            if info:
-                                # 이름
-                                name = info.get("personal_info", {}).get("fighter_id", "Unknown")
-                                print(f"   - [JSON] 이름: {name}")
-
-                                # 캐릭터 (영어 대문자, 예: RASHID)
-                                character = info.get("favorite_character_alpha", "Unknown")
-                                print(f"   - [JSON] 캐릭터: {character}")
-                                
-                                # 리그 정보
-                                league_info = info.get("favorite_character_league_info", {})
-                                if league_info:
-                                    # LP
-                                    lp = league_info.get("league_point", 0)
-                                    print(f"   - [JSON] LP: {lp}")
-                                    
-                                    # MR & Rank
-                                    mr_val = league_info.get("master_rating", 0)
-                                    rank_name = league_info.get("league_rank_info", {}).get("league_rank_name", "Unknown")
-                                    
-                                    if mr_val and mr_val > 0:
-                                        mr = mr_val
-                                        rank = f"{rank_name} ({mr} MR)"
-                                        print(f"   - [JSON] MR: {mr}")
-                                    else:
-                                        rank = rank_name
-                                        print(f"   - [JSON] Rank: {rank}")
-                            else:
-                                print("   - [JSON] fighter_banner_info가 비어있음")
-                        else:
-                            print("   - [JSON] __NEXT_DATA__ 태그를 찾을 수 없음 (DOM 파싱으로 전환 필요)")
-                            
-                    except Exception as e:
-                        print(f"   - JSON 파싱 중 에러: {e}")
-
-                    if name == "Unknown":
-                        raise Exception("PROFILE_PARSE_ERROR: fighter_banner_info not found")
-
-                    data = {
-                        "user_code": user_code,
-                        "name": name,
-                        "lp": lp,
-                        "rank": rank,
-                        "character": character
-                    }
-                    print(f"✅ [Scraper] 데이터 파싱 성공: {data}")
-
-                else:
-                    print("❌ [Scraper] 유효한 User Code를 찾지 못했습니다.")
-                    data = {
-                        "user_code": "unknown",
-                        "name": "Unknown",
-                        "lp": 0,
-                        "rank": "Unknown",
-                        "character": "Unknown"
-                    }
+        try:
+            data = self.pool.run(lambda page: self._get_stats(page, user_code))
+        except Exception as e:
+            if "BROWSER_ERROR" not in str(e):
+                raise
+            print(f"❌ [Scraper] Failed to launch browser in get_stats: {e}")
+            return None
 
-            except Exception as e:
-                print(f"❌ [Scraper] get_stats 실행 중 치명적 에러: {e}")
-                if "AUTH_ERROR" in str(e):
-                    raise
-                import traceback
-                traceback.print_exc()
-                return None
-
-            
-            browser.close()
-            print("=== [Scraper] get_stats 종료 ===")
-            
+        print("=== [Scraper] get_stats 종료 ===")
         return data
 
-    def get_match_history(self, user_code, my_name=None, limit=20):
+    def _get_stats(self, page, user_code):
+        print("1. 브라우저 풀의 페이지 사용 (Headless: True)...")
+        try:
+            # user_code를 이미 알고 있으면 메인(랜딩) 페이지 방문을 생략합니다.
+            if not user_code or user_code == "unknown_code":
+                user_code = self._find_user_code(page)
+
+            if user_code and user_code != "unknown_code":
+                data = self._load_profile(page, user_code)
+                print(f"✅ [Scraper] 데이터 파싱 성공: {data}")
+            else:
+                print("❌ [Scraper] 유효한 User Code를 찾지 못했습니다.")
+                data = dict(UNKNOWN_PLAYER)
+
+        except Exception as e:
+            print(f"❌ [Scraper] get_stats 실행 중 치명적 에러: {e}")
+            if "AUTH_ERROR" in str(e):
+                raise
+            import traceback
+            traceback.print_exc()
+            return None
+
+        return data
+
+    def _find_user_code(self, page):
+        """메인 페이지 헤더의 프로필 링크에서 로그인한 계정의 User Code를 찾습니다."""
+        print(f"2. 타겟 URL 접속 중: {TARGET_URL}")
+        self._goto(page, TARGET_URL, "a[href*='/profile/']")
+
+        raise_if_error_page(page.url)
+        if page_is_auth_blocked(page):
+            raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
+
+        print("3. 페이지 로드 완료. 사용자 정보 파싱 시작...")
+        # 헤더의 '내 프로필' 링크: href에 /profile/숫자 형태가 포함됨
+        hrefs = page.evaluate(PROFILE_HREFS_JS)
+        print(f"   - 발견된 프로필 링크 후보 수: {len(hrefs)}")
+        extracted_user_code = first_user_code(hrefs) or "unknown_code"
+        print(f"   - 최종 추출된 User Code: {extracted_user_code}")
+        return extracted_user_code
+
+    def _load_profile(self, page, user_code):
+        """상세 프로필 페이지의 Next.js Hydration Data에서 이름/LP/랭크/캐릭터를 읽습니다."""
+        # 상세 프로필 페이지로 이동
+        profile_url = f"{TARGET_URL}/ko-kr/profile/{user_code}"
+        print(f"4. 상세 프로필 페이지로 이동: {profile_url}")
+        self._goto(page, profile_url)
+
+        raise_if_error_page(page.url)
+        props = next_page_props(page)
+        if page_is_auth_blocked(page, props):
+            raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
+
+        # 상세 페이지에서 정보 추출
+        print("5. 상세 페이지 정보 파싱...")
+        return profile_from_props(props, user_code)
+
+    def collect(self, user_code=None, limit=20, stop_at=None):
+        """
+        프로필과 Battle Log를 하나의 컨텍스트/페이지에서 연속으로 가져옵니다.
+        user_code를 알고 있으면 메인 페이지를 거치지 않으므로 폴링 1회당 이동은 2번입니다.
+        stop_at: 이미 저장된 최신 매치의 fingerprint. 이 행에 도달하면 파싱을 멈춥니다.
+        반환값: {"player": 프로필 dict 또는 None, "matches": 대전 기록 list}
+        """
+        print(f"=== [Scraper] collect 시작 (User Code: {user_code}) ===")
+        if not auth_state_has_session():
+            print("❌ [Scraper] 인증 파일이 없습니다. 먼저 로그인을 진행해주세요.")
+            raise Exception("AUTH_ERROR: Missing or empty auth state. Please login again.")
+
+        result = self._try_http("collect", user_code, limit, stop_at)
+        if result is not None:
+            print("=== [Scraper] collect 종료 (HTTP) ===")
+            return result
+
+        try:
+            result = self.pool.run(lambda page: self._collect(page, user_code, limit, stop_at))
+        except Exception as e:
+            if "BROWSER_ERROR" not in str(e):
+                raise
+            print(f"❌ [Scraper] Failed to launch browser in collect: {e}")
+            return {"player": None, "matches": []}
+
+        print("=== [Scraper] collect 종료 ===")
+        return result
+
+    def _collect(self, page, user_code, limit, stop_at=None):
+        player = self._get_stats(page, user_code)
+        if not player or player.get("user_code") == "unknown":
+            return {"player": player, "matches": []}
+
+        matches = self._get_match_history(page, player["user_code"], player["name"], limit, stop_at)
+        return {"player": player, "matches": matches}
+
+    def fetch_battlelog_pages(self, user_code, my_name, tab, page_numbers, before_request=None):
+        """
+        Battle Log의 여러 페이지를 동시에 가져옵니다 (백필용).
+        http 백엔드는 스레드로 병렬 요청하고, 브라우저는 한 컨텍스트 안에서 fetch를 동시에 실행합니다.
+        before_request: 요청 직전마다 호출되는 함수 (rate limit 용)
+        반환값: 페이지 순서대로 정렬된 [{page, matches, total_page}, ...]
+        """
+        page_numbers = list(page_numbers)
+        if not auth_state_has_session():
+            raise Exception("AUTH_ERROR: Missing or empty auth state. Please login again.")
+
+        if self.backend == "http":
+            try:
+                return self.http.fetch_battlelog_pages(user_code, my_name, tab, page_numbers, before_request)
+            except Exception as e:
+                print(f"⚠️ [Scraper] HTTP 백엔드 실패, 브라우저로 전환합니다: {e}")
+
+        return self.pool.run(
+            lambda page: self._fetch_battlelog_pages(page, user_code, my_name, tab, page_numbers, before_request)
+        )
+
+    def _fetch_battlelog_pages(self, page, user_code, my_name, tab, page_numbers, before_request):
+        # fetch가 같은 출처의 쿠키를 사용하도록 Buckler 페이지 위에서 실행합니다.
+        if not page.url.startswith(TARGET_URL):
+            self._goto(page, battlelog_url(user_code, tab))
+
+        urls = [battlelog_url(user_code, tab, n) for n in page_numbers]
+        for _ in urls:
+            if before_request:
+                before_request()
+
+        started = time.perf_counter()
+        responses = page.evaluate(FETCH_PAGES_JS, urls)
+        print(f"   - [Backfill] {tab} {page_numbers[0]}~{page_numbers[-1]} 페이지 ({round((time.perf_counter() - started) * 1000)}ms)")
+
+        results = []
+        for page_no, response in zip(page_numbers, responses):
+            if "error-system" in (response.get("final_url") or "") or response.get("status") == 403:
+                raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
+            if response.get("status") != 200:
+                raise Exception(f"BACKFILL_ERROR: {response.get('url')} -> {response.get('status')} {response.get('error', '')}")
+
+            props = next_data_props(response["body"])
+            if props.get("common", {}).get("statusCode") == 403:
+                raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
+            results.append(battlelog_page_result(props, page_no, my_name, user_code))
+        return results
+
+    def get_match_history(self, user_code, my_name=None, limit=20, stop_at=None):
         """
         Battle Log 페이지에서 최근 대전 기록을 가져옵니다.
         my_name: 내 이름 (Player 1/2 구분을 위해 필요)
+        stop_at: 이미 저장된 최신 매치의 fingerprint (도달하면 중단)
         """
         print(f"=== [Scraper] get_match_history 시작 (User Code: {user_code}, My Name: {my_name}) ===")
         if not auth_state_has_session():
             print("❌ [Scraper] 인증 파일이 없습니다. 먼저 로그인을 진행해주세요.")
             raise Exception("AUTH_ERROR: Missing or empty auth state. Please login again.")
 
+        matches = self._try_http("get_match_history", user_code, my_name, limit, stop_at)
+        if matches is not None:
+            print("=== [Scraper] get_match_history 종료 (HTTP) ===")
+            return matches
+
+        try:
+            matches = self.pool.run(lambda page: self._get_match_history(page, user_code, my_name, limit, stop_at))
+        except Exception as e:
+            if "BROWSER_ERROR" not in str(e):
+                raise
+            print(f"❌ [Scraper] Failed to launch browser in get_match_history: {e}")
+            return []
+
+        print("=== [Scraper] get_match_history 종료 ===")
+        return matches
+
+    def _get_match_history(self, page, user_code, my_name, limit, stop_at=None):
         matches = []
-        with sync_playwright() as p:
-            print("1. 브라우저 실행 중 (Headless: True)...")
+        print("1. 브라우저 풀의 페이지 사용 (Headless: True)...")
+
+        # Use the Ranked Match URL
+        url = battlelog_url(user_code, "rank")
+        print(f"2. Battle Log (Ranked) 페이지 접속: {url}")
+        self._goto(page, url, f"{NEXT_DATA_SELECTOR}, {BATTLELOG_ITEMS}")
+
+        raise_if_error_page(page.url)
+
+        print("3. 대전 기록 파싱 시작...")
+        try:
+            props = next_page_props(page)
+            if page_is_auth_blocked(page, props):
+                raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
+
+            # 1순위: Next.js Hydration Data / 2순위: evaluate 한 번으로 DOM 일괄 추출 / 3순위: 행별 locator
+            rows = battlelog_rows_from_props(props)
+            if rows is not None:
+                print(f"   - [JSON] replay_list 항목 수: {len(rows)}")
+            else:
+                rows = self._battlelog_rows_from_dom(page, limit)
+
+            # 행은 필요한 만큼만 지연 파싱되므로, 이미 저장된 매치를 만나면 나머지는 읽지 않습니다.
+            matches, parsed = matches_from_rows(rows, my_name, user_code, limit, stop_at)
+
+            if not parsed:
+                print("⚠️ [Scraper] 대전 기록을 찾을 수 없습니다. 스크린샷을 저장합니다.")
+                page.screenshot(path="debug_scraper_no_matches.png")
+
+            print(f"✅ [Scraper] 총 {len(matches)}개의 새 대전 기록을 가져왔습니다. (파싱한 행: {parsed})")
+
+        except Exception as e:
+            print(f"❌ [Scraper] Battle Log 파싱 중 에러 발생: {e}")
+            if "AUTH_ERROR" in str(e):
+                raise
+            page.screenshot(path="debug_scraper_error.png")
+
+        return matches
+
+    def _battlelog_rows_from_dom(self, page, limit):
+        if self.pool.fast_navigation:
+            # 빠른 탐색 모드에서는 목록이 클라이언트에서 그려질 때까지 잠시 기다립니다.
             try:
-                browser = p.chromium.launch(headless=True, channel="chrome")
+                page.wait_for_selector(BATTLELOG_ITEMS, state="attached", timeout=5000)
             except Exception:
-                try:
-                    browser = p.chromium.launch(headless=True, channel="msedge")
-                except Exception:
-                     # Fallback
-                    try:
-                        browser = p.chromium.launch(headless=True)
-                    except Exception as e:
-                        print(f"❌ [Scraper] Failed to launch browser in get_match_history: {e}")
-                        return []
-            context = browser.new_context(
-                storage_state=AUTH_FILE,
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
-                locale='ko-KR',
-                timezone_id='Asia/Seoul'
-            )
-            page = context.new_page()
-            
-            # Use the Ranked Match URL
-            battlelog_url = f"{TARGET_URL}/ko-kr/profile/{user_code}/battlelog/rank"
-            print(f"2. Battle Log (Ranked) 페이지 접속: {battlelog_url}")
-            page.goto(battlelog_url, wait_until='networkidle')
-            page.wait_for_load_state("networkidle")
-            
-            if "error-system" in page.url:
-                print("❌ [Scraper] 시스템 에러 페이지 감지됨. 인증 만료 또는 시스템 오류.")
-                browser.close()
-                raise Exception("AUTH_ERROR: System error page detected")
-            
-            print("3. 대전 기록 파싱 시작...")
+                pass
+        try:
+            raw_rows = page.evaluate(BATTLELOG_EXTRACT_JS, [BATTLELOG_ITEMS, limit])
+            print(f"   - [DOM] 발견된 리스트 아이템 수: {len(raw_rows)}")
+        except Exception as e:
+            print(f"   - [DOM] 일괄 추출 실패, 행별 파싱으로 전환: {e}")
+            raw_rows = self._battlelog_raw_rows_from_locators(page, limit)
+
+        for i, raw in enumerate(raw_rows):
             try:
-                if page_is_auth_blocked(page):
-                    browser.close()
-                    raise Exception("AUTH_ERROR: Buckler login required. Please login again.")
-                match_items = page.locator(f"{class_contains('battle_data_battlelog__list')} > li").all()
-                print(f"   - 발견된 리스트 아이템 수: {len(match_items)}")
-                
-                if not match_items:
-                    print("⚠️ [Scraper] 대전 기록을 찾을 수 없습니다. 스크린샷을 저장합니다.")
-                    page.screenshot(path="debug_scraper_no_matches.png")
-                
-                for i, item in enumerate(match_items[:limit]):
-                    try:
-                        date_el = item.locator(class_contains("battle_data_date"))
-                        date_str = date_el.text_content().strip() if date_el.count() > 0 else ""
-                        
-                        # Player 1과 Player 2의 이름을 모두 가져오기
-                        p1_name_el = item.locator(f"{class_contains('battle_data_name_p1')} {class_contains('battle_data_name')}")
-                        p1_name = p1_name_el.text_content().strip() if p1_name_el.count() > 0 else "Unknown"
-                        
-                        p2_name_el = item.locator(f"{class_contains('battle_data_name_p2')} {class_contains('battle_data_name')}")
-                        p2_name = p2_name_el.text_content().strip() if p2_name_el.count() > 0 else "Unknown"
-                        
-                        # Player 1과 Player 2의 승패 상태 확인
-                        p1_div = item.locator(class_contains("battle_data_player1"))
-                        p1_class = p1_div.get_attribute("class") if p1_div.count() > 0 else ""
-                        
-                        p2_div = item.locator(class_contains("battle_data_player2"))
-                        p2_class = p2_div.get_attribute("class") if p2_div.count() > 0 else ""
-                        
-                        # 승패 판정
-                        p1_won = "battle_data_win" in p1_class
-                        p2_won = "battle_data_win" in p2_class
-                        p1_lost = "battle_data_lose" in p1_class
-                        p2_lost = "battle_data_lose" in p2_class
-                        
-                        # 내 이름과 비교하여 누가 나인지 판단
-                        if my_name and p1_name == my_name:
-                            # Player 1이 나
-                            opponent_name = p2_name
-                            my_char_el = item.locator(f"{class_contains('battle_data_player1')} {class_contains('battle_data_character')} img")
-                            opponent_char_el = item.locator(f"{class_contains('battle_data_player2')} {class_contains('battle_data_character')} img")
-                            my_lp_el = item.locator(f"{class_contains('battle_data_player1')} {class_contains('battle_data_lp')}")
-                            opponent_lp_el = item.locator(f"{class_contains('battle_data_player2')} {class_contains('battle_data_lp')}")
-                            
-                            # Player 1의 승패 결과가 내 결과
-                            if p1_won:
-                                result = "WIN"
-                            elif p1_lost:
-                                result = "LOSE"
-                            else:
-                                result = "UNKNOWN"
-                                
-                        elif my_name and p2_name == my_name:
-                            # Player 2가 나
-                            opponent_name = p1_name
-                            my_char_el = item.locator(f"{class_contains('battle_data_player2')} {class_contains('battle_data_character')} img")
-                            opponent_char_el = item.locator(f"{class_contains('battle_data_player1')} {class_contains('battle_data_character')} img")
-                            my_lp_el = item.locator(f"{class_contains('battle_data_player2')} {class_contains('battle_data_lp')}")
-                            opponent_lp_el = item.locator(f"{class_contains('battle_data_player1')} {class_contains('battle_data_lp')}")
-                            
-                            # Player 2의 승패 결과가 내 결과
-                            if p2_won:
-                                result = "WIN"
-                            elif p2_lost:
-                                result = "LOSE"
-                            else:
-                                result = "UNKNOWN"
-                                
-                        else:
-                            # 이름을 알 수 없는 경우 기본값 (Player 2가 나)
-                            print(f"   - 경고: 이름 매칭 실패 (P1: {p1_name}, P2: {p2_name}, My: {my_name})")
-                            opponent_name = p1_name
-                            my_char_el = item.locator(f"{class_contains('battle_data_player2')} {class_contains('battle_data_character')} img")
-                            opponent_char_el = item.locator(f"{class_contains('battle_data_player1')} {class_contains('battle_data_character')} img")
-                            my_lp_el = item.locator(f"{class_contains('battle_data_player2')} {class_contains('battle_data_lp')}")
-                            opponent_lp_el = item.locator(f"{class_contains('battle_data_player1')} {class_contains('battle_data_lp')}")
-                            
-                            # Player 2의 승패 결과가 내 결과 (기본값)
-                            if p2_won:
-                                result = "WIN"
-                            elif p2_lost:
-                                result = "LOSE"
-                            else:
-                                result = "UNKNOWN"
-                        
-                        # 캐릭터 정보 추출
-                        my_character = my_char_el.get_attribute("alt") if my_char_el.count() > 0 else "Unknown"
-                        opponent_character = opponent_char_el.get_attribute("alt") if opponent_char_el.count() > 0 else "Unknown"
-                        
-                        # 내 LP/MR
-                        my_lp_text = my_lp_el.text_content().strip() if my_lp_el.count() > 0 else "0"
-                        my_mr = None
-                        my_lp = None
-                        if "MR" in my_lp_text:
-                            my_mr = int(my_lp_text.replace("MR", "").replace(",", "").strip())
-                        elif "LP" in my_lp_text:
-                            my_lp = int(my_lp_text.replace("LP", "").replace(",", "").strip())
-                        
-                        # 상대 LP/MR
-                        opponent_lp_text = opponent_lp_el.text_content().strip() if opponent_lp_el.count() > 0 else "0"
-                        opponent_mr = None
-                        opponent_lp = None
-                        if "MR" in opponent_lp_text:
-                            opponent_mr = int(opponent_lp_text.replace("MR", "").replace(",", "").strip())
-                        elif "LP" in opponent_lp_text:
-                            opponent_lp = int(opponent_lp_text.replace("LP", "").replace(",", "").strip())
-                        
-                        match_data = {
-                            "date": date_str,
-                            "opponent_name": opponent_name,
-                            "opponent_character": opponent_character,
-                            "opponent_mr": opponent_mr,
-                            "opponent_lp": opponent_lp,
-                            "my_character": my_character,
-                            "my_mr": my_mr,
-                            "my_lp": my_lp,
-                            "result": result
-                        }
-                        matches.append(match_data)
-                        print(f"   - 매치 {i+1} 파싱 완료: {result} vs {opponent_name} ({opponent_character})")
-                        
-                    except Exception as e:
-                        print(f"⚠️ [Scraper] 대전 기록 {i+1} 파싱 중 에러: {e}")
-                        continue
-                
-                print(f"✅ [Scraper] 총 {len(matches)}개의 대전 기록을 가져왔습니다.")
-                
+                yield battlelog_row_from_dom(raw)
             except Exception as e:
-                print(f"❌ [Scraper] Battle Log 파싱 중 에러 발생: {e}")
-                if "AUTH_ERROR" in str(e):
-                    raise
-                page.screenshot(path="debug_scraper_error.png")
-            
-            browser.close()
-            print("=== [Scraper] get_match_history 종료 ===")
-        
-        return matches
+                print(f"⚠️ [Scraper] 대전 기록 {i+1} 파싱 중 에러: {e}")
+
+    def _battlelog_raw_rows_from_locators(self, page, limit):
+        """행/필드마다 locator를 사용하는 기존 CSS 셀렉터 파서 (fallback, 행 단위로 지연 실행)"""
+        match_items = page.locator(BATTLELOG_ITEMS).all()
+        print(f"   - 발견된 리스트 아이템 수: {len(match_items)}")
+
+        def text(item, selector):
+            el = item.locator(selector)
+            return el.text_content().strip() if el.count() > 0 else None
+
+        def attr(item, selector, name):
+            el = item.locator(selector)
+            return el.get_attribute(name) if el.count() > 0 else None
+
+        for item in match_items[:limit]:
+            raw = {"date": text(item, class_contains("battle_data_date"))}
+            for n in (1, 2):
+                player = class_contains(f"battle_data_player{n}")
+                raw[f"p{n}_name"] = text(item, f"{class_contains(f'battle_data_name_p{n}')} {class_contains('battle_data_name')}")
+                raw[f"p{n}_class"] = attr(item, player, "class")
+                raw[f"p{n}_character"] = attr(item, f"{player} {class_contains('battle_data_character')} img", "alt")
+                raw[f"p{n}_lp"] = text(item, f"{player} {class_contains('battle_data_lp')}")
+            yield raw
 
 if __name__ == "__main__":
     # 테스트 실행
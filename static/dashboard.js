@@ -40,7 +40,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // Fetch system status from /api/status
     async function fetchStatus() {
         try {
-            const res = await fetch('/api/status');
+            const res = await fetchWithETag('/api/status');
             if (!res.ok) throw new Error('Network response was not ok');
             const data = await res.json();
 
@@ -161,42 +161,83 @@ document.addEventListener('DOMContentLoaded', () => {
     // Manual collect button
     btnCollectMatches.addEventListener('click', collectMatchesOnce);
 
-    // Periodic collection logic
-    let collectIntervalId = null;
-
+    // Periodic collection logic (서버 스케줄러가 수집하고, 대시보드는 상태만 표시)
+    let autoCollectEnabled = false;
+    let lastAutoRun = null;
+
+    function renderAutoCollect(status) {
+        if (status.enabled && !autoCollectEnabled) collectIntervalInput.value = status.interval;
+        autoCollectEnabled = status.enabled;
+        btnStartCollect.textContent = autoCollectEnabled ? 'Stop Collect' : 'Start Collect';
+        btnStartCollect.classList.toggle('danger', autoCollectEnabled);
+        btnStartCollect.classList.toggle('primary', !autoCollectEnabled);
+        if (!autoCollectEnabled) {
+            if (collectStatusEl) collectStatusEl.textContent = '';
+            return;
+        }
 
-    btnStartCollect.addEventListener('click', () => {
-        if (collectIntervalId) {
-            // Stop Collection
-            clearInterval(collectIntervalId);
-            collectIntervalId = null;
-            btnStartCollect.textContent = 'Start Collect';
-            btnStartCollect.classList.remove('danger');
-            btnStartCollect.classList.add('primary');
-            if (collectStatusEl) collectStatusEl.textContent = 'Stopped';
-            logMessage('Periodic collection stopped.');
-        } else {
-            // Start Collection
-            const intervalSec = Number(collectIntervalInput.value) || 30;
+        const entry = status.player;
+        if (collectStatusEl) {
+            if (!entry) collectStatusEl.textContent = 'Waiting...';
+            else if (entry.collecting) collectStatusEl.textContent = 'Collecting...';
+            else collectStatusEl.textContent = `Every ${entry.current_interval}s (next in ${entry.next_run_in}s)`;
+        }
 
-            // Immediate collection (limit=1 for auto polling)
-            collectMatchesOnce(1);
+        // 서버에서 새로 수집이 끝났으면 로그/매치 목록 갱신
+        if (entry && entry.last_run && entry.last_run !== lastAutoRun) {
+            if (lastAutoRun !== null) {
+                if (entry.last_error) {
+                    logMessage(`Error: ${entry.last_error}`);
+                } else if (entry.last_result) {
+                    logMessage(`${entry.last_result.message} (New: ${entry.last_result.new_count})`);
+                    if (entry.last_result.new_count) displayMatchHistory();
+                }
+            }
+            lastAutoRun = entry.last_run;
+        }
+    }
 
-            collectStatusEl.textContent = `Running every ${intervalSec}s`;
-            logMessage(`Periodic collection started (every ${intervalSec}s).`);
+    async function fetchAutoCollectStatus() {
+        try {
+            const res = await fetch('/api/auto_collect/status');
+            if (res.ok) renderAutoCollect(await res.json());
+        } catch (e) {
+            console.error('Failed to fetch auto collect status', e);
+        }
+    }
 
-            btnStartCollect.textContent = 'Stop Collect';
-            btnStartCollect.classList.remove('primary');
-            btnStartCollect.classList.add('danger');
+    btnStartCollect.addEventListener('click', async () => {
+        btnStartCollect.disabled = true;
+        try {
+            let res;
+            if (autoCollectEnabled) {
+                res = await fetch('/api/auto_collect/stop', { method: 'POST' });
+            } else {
+                const intervalSec = Number(collectIntervalInput.value) || 30;
+                res = await fetch('/api/auto_collect/start', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ interval: intervalSec })
+                });
+            }
+            const data = await res.json();
+            if (!res.ok) throw new Error(data.detail || 'Unknown error');
 
-            collectIntervalId = setInterval(() => collectMatchesOnce(1), intervalSec * 1000);
+            logMessage(data.enabled
+                ? `Periodic collection started on server (every ${data.interval}s, backing off up to ${data.max_interval}s).`
+                : 'Periodic collection stopped.');
+            renderAutoCollect(data);
+        } catch (e) {
+            logMessage(`Error: ${e.message}`);
+        } finally {
+            btnStartCollect.disabled = false;
         }
     });
 
     // Display match history with optional character filter
     async function displayMatchHistory() {
         try {
-            const res = await fetch('/api/matches?limit=10');
+            const res = await fetchWithETag('/api/matches?limit=10');
             if (!res.ok) return;
             const matches = await res.json();
             const filter = localStorage.getItem('characterFilter') || '';
@@ -405,5 +446,28 @@ document.addEventListener('DOMContentLoaded', () => {
     loadBgImageConfig();
     fetchStatus();
     displayMatchHistory();
-    setInterval(fetchStatus, 5000);
+    fetchAutoCollectStatus();
+
+    // 서버 이벤트로 갱신하고, 스트림이 끊긴 동안에만 5초마다 폴링
+    subscribeLiveUpdates({
+        handlers: {
+            player: fetchStatus,
+            matches: displayMatchHistory,
+            collector: renderAutoCollect,
+            reset: () => {
+                fetchStatus();
+                displayMatchHistory();
+            }
+        },
+        poll: () => {
+            fetchStatus();
+            fetchAutoCollectStatus();
+        },
+        pollInterval: 5000,
+        onConnectionChange: (connected) => {
+            if (connected) return;
+            connStatusEl.textContent = 'Reconnecting...';
+            connStatusEl.className = 'status-badge disconnected';
+        }
+    });
 });
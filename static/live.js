@@ -0,0 +1,95 @@
+// Live updates via Server-Sent Events (/api/events)
+// Polling (poll) runs only while the stream is disconnected or unsupported.
+
+function subscribeLiveUpdates({ handlers = {}, poll = null, pollInterval = 5000, onConnectionChange = null }) {
+    const RECONNECT_DELAY = 3000;
+    let source = null;
+    let pollTimer = null;
+    let watchdog = null;
+    let staleAfter = 45000; // heartbeat_interval * 3 (hello 이벤트로 갱신)
+
+    function startPolling() {
+        if (!poll || pollTimer) return;
+        pollTimer = setInterval(poll, pollInterval);
+    }
+
+    function stopPolling() {
+        if (!pollTimer) return;
+        clearInterval(pollTimer);
+        pollTimer = null;
+    }
+
+    function setConnected(connected) {
+        if (connected) stopPolling(); else startPolling();
+        if (onConnectionChange) onConnectionChange(connected);
+    }
+
+    // heartbeat가 오래 오지 않으면 끊긴 연결로 보고 다시 연결
+    function resetWatchdog() {
+        clearTimeout(watchdog);
+        watchdog = setTimeout(() => {
+            source.close();
+            setConnected(false);
+            setTimeout(connect, RECONNECT_DELAY);
+        }, staleAfter);
+    }
+
+    function connect() {
+        source = new EventSource('/api/events');
+
+        source.addEventListener('hello', (e) => {
+            const data = JSON.parse(e.data);
+            if (data.heartbeat_interval) staleAfter = data.heartbeat_interval * 3000;
+            setConnected(true);
+            resetWatchdog();
+            // 끊겨 있던 동안의 변경을 놓치지 않도록 한 번 갱신
+            if (poll) poll();
+        });
+        source.addEventListener('heartbeat', resetWatchdog);
+
+        Object.entries(handlers).forEach(([name, handler]) => {
+            source.addEventListener(name, (e) => {
+                resetWatchdog();
+                try {
+                    handler(JSON.parse(e.data));
+                } catch (err) {
+                    console.error(`Failed to handle ${name} event`, err);
+                }
+            });
+        });
+
+        // EventSource는 스스로 재연결하므로 그동안만 폴링
+        source.onerror = () => {
+            clearTimeout(watchdog);
+            setConnected(false);
+            if (source.readyState === EventSource.CLOSED) setTimeout(connect, RECONNECT_DELAY);
+        };
+    }
+
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    connect();
+}
+
+// Conditional GET: remember each URL's ETag and send it back as If-None-Match.
+// A 304 reuses the cached body (notModified = true lets callers skip re-rendering).
+const etagCache = new Map();
+
+async function fetchWithETag(url) {
+    const cached = etagCache.get(url);
+    const res = await fetch(url, {
+        headers: cached ? { 'If-None-Match': cached.etag } : {},
+        cache: 'no-store' // 브라우저 캐시 대신 여기서 304를 직접 처리
+    });
+    if (res.status === 304 && cached) {
+        return { ok: true, status: 304, notModified: true, json: async () => cached.body };
+    }
+    if (!res.ok) return res;
+
+    const body = await res.json();
+    const etag = res.headers.get('ETag');
+    if (etag) etagCache.set(url, { etag, body });
+    return { ok: true, status: res.status, notModified: false, json: async () => body };
+}
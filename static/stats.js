@@ -1,20 +1,33 @@
 // SF6 Match Statistics JavaScript
 
 let charts = {};
+const MR_CHART_POINTS = 300; // MR 그래프에 그리는 최대 점 개수 (대략)
 
 document.addEventListener('DOMContentLoaded', async () => {
     await loadBgImageConfig();
     await loadStatistics();
     await loadMRHistory();
 
-    // 30초마다 자동 갱신
-    setInterval(async () => {
-        await loadBgImageConfig();
-        await loadStatistics();
-        await loadMRHistory();
-    }, 30000); // 30000ms = 30초
+    // 매치가 저장되면 서버 이벤트로 갱신. 연결이 끊긴 동안에만 30초마다 폴링
+    subscribeLiveUpdates({
+        handlers: {
+            summary: refreshStatistics,
+            config: loadBgImageConfig,
+            reset: refreshStatistics
+        },
+        poll: async () => {
+            await loadBgImageConfig();
+            await refreshStatistics();
+        },
+        pollInterval: 30000 // 30000ms = 30초
+    });
 });
 
+async function refreshStatistics() {
+    await loadStatistics();
+    await loadMRHistory();
+}
+
 async function loadBgImageConfig() {
     try {
         const res = await fetch('/api/config/bg_image');
@@ -62,8 +75,8 @@ async function loadStatistics() {
     try {
         // Get limit from localStorage, default to 100
         const limit = localStorage.getItem('mrChartLimit') || 100;
-        const res = await fetch(`/api/stats/summary?limit=${limit}`);
-        if (!res.ok) return;
+        const res = await fetchWithETag(`/api/stats/summary?limit=${limit}`);
+        if (!res.ok || res.notModified) return;
 
         const data = await res.json();
 
@@ -124,18 +137,18 @@ function resetStatCard(prefix) {
 
 async function loadMRHistory() {
     try {
-        const limit = localStorage.getItem('mrChartLimit') || 100;
-        const res = await fetch(`/api/stats/mr_history?limit=${limit}`);
-        if (!res.ok) return;
+        // 전체 기록(limit=0)을 요청하고, 서버에서 구간별 최저/최고 MR만 남겨 MR_CHART_POINTS개 안팎으로 줄여서 받음
+        const res = await fetchWithETag(`/api/stats/mr_history?limit=0&points=${MR_CHART_POINTS}`);
+        if (!res.ok || res.notModified) return;
 
         const history = await res.json();
-        if (history.length === 0) return;
+        if (history.points.length === 0) return;
+        const buckets = new Map(history.buckets.map(b => [b.bucket, b]));
 
         const ctx = document.getElementById('mrHistoryChart').getContext('2d');
 
-        // 데이터 준비
-        const labels = history.map((h, i) => i + 1);
-        const mrValues = history.map(h => h.mr);
+        // 데이터 준비 (x = 원본 매치 순번이므로 줄인 뒤에도 간격이 유지됨)
+        const mrValues = history.points.map(p => ({ x: p.index, y: p.mr, bucket: p.bucket }));
 
         // 그라데이션 생성 (More visible)
         const gradient = ctx.createLinearGradient(0, 0, 0, 180); // Adjusted height
@@ -150,7 +163,6 @@ async function loadMRHistory() {
         charts.mrHistory = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: labels,
                 datasets: [{
                     label: 'MR',
                     data: mrValues,
@@ -180,12 +192,19 @@ async function loadMRHistory() {
                         callbacks: {
                             label: function (context) {
                                 return `MR: ${context.parsed.y}`;
+                            },
+                            afterLabel: function (context) {
+                                // 줄인 그래프에서는 이 점이 대표하는 구간 전체의 승/패
+                                const bucket = buckets.get(context.raw.bucket);
+                                if (!history.downsampled || !bucket) return '';
+                                return `${bucket.matches} games: ${bucket.wins}W ${bucket.losses}L`;
                             }
                         }
                     }
                 },
                 scales: {
                     x: {
+                        type: 'linear',
                         display: false // X축 숨김 (깔끔하게)
                     },
                     y: {
@@ -0,0 +1,77 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from analytics import detect_sessions, performance
+from collector import ingest_matches, upsert_player
+from database import Base
+from test_collector import PLAYER, scraped_match
+
+
+def match(date, result, my_mr, character="RASHID"):
+    data = scraped_match(date, "Rival", result, my_mr)
+    data["my_character"] = character
+    data["match_key"] = f"replay:{date}:{character}"
+    return data
+
+
+class AnalyticsTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        player, _ = upsert_player(self.db, dict(PLAYER))
+        ingest_matches(self.db, player, [
+            # 2025-11-03 (월) 저녁 세션: +20, -10, +15
+            match("2025/11/03 20:00", "WIN", 1500),
+            match("2025/11/03 20:10", "WIN", 1520),
+            match("2025/11/03 20:20", "LOSE", 1510),
+            match("2025/11/03 20:35", "WIN", 1525),
+            # 같은 날 밤, 다른 캐릭터로 변경: 바뀐 첫 매치는 MR 변화량 없음, 이후 -20
+            match("2025/11/03 23:00", "LOSE", 1200, character="KEN"),
+            match("2025/11/03 23:05", "LOSE", 1180, character="KEN"),
+            # 2025-11-04 (화) 오후: +10
+            match("2025/11/04 14:00", "WIN", 1190, character="KEN"),
+        ])
+        self.db.commit()
+        self.player_id = player.id
+
+    def test_daily_hourly_and_weekday_buckets(self):
+        days = performance(self.db, self.player_id, by="day")["buckets"]
+        self.assertEqual([(d["key"], d["matches"], d["wins"], d["losses"], d["mr_delta"]) for d in days],
+                         [("2025-11-03", 6, 3, 3, 5), ("2025-11-04", 1, 1, 0, 10)])
+        self.assertEqual(days[0]["win_rate"], 50.0)
+
+        hours = {h["key"]: h for h in performance(self.db, self.player_id, by="hour")["buckets"]}
+        self.assertEqual(sorted(hours), [14, 20, 23])
+        self.assertEqual((hours[20]["matches"], hours[20]["mr_delta"]), (4, 25))
+
+        weekdays = performance(self.db, self.player_id, by="weekday")["buckets"]
+        self.assertEqual([(w["label"], w["matches"]) for w in weekdays], [("Mon", 6), ("Tue", 1)])
+
+        with self.assertRaises(ValueError):
+            performance(self.db, self.player_id, by="month")
+
+    def test_sessions_are_split_on_gaps(self):
+        sessions = detect_sessions(self.db, self.player_id, gap_minutes=30)["sessions"]
+        self.assertEqual([(s["start"], s["matches"], s["wins"], s["mr_delta"]) for s in sessions], [
+            ("2025-11-04T14:00:00", 1, 1, 10),
+            ("2025-11-03T23:00:00", 2, 0, -20),
+            ("2025-11-03T20:00:00", 4, 3, 25),
+        ])
+        self.assertEqual(sessions[2]["minutes"], 35)
+
+        # 간격 기준을 늘리면 같은 날 두 세션이 합쳐짐
+        self.assertEqual(len(detect_sessions(self.db, self.player_id, gap_minutes=180)["sessions"]), 2)
+        self.assertEqual(len(detect_sessions(self.db, self.player_id, limit=1)["sessions"]), 1)
+
+    def test_date_range(self):
+        days = performance(self.db, self.player_id, date_from="2025-11-04")["buckets"]
+        self.assertEqual([d["key"] for d in days], ["2025-11-04"])
+
+
+if __name__ == "__main__":
+    unittest.main()
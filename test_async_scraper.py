@@ -0,0 +1,230 @@
+import asyncio
+import io
+import json
+import os
+import tempfile
+import unittest
+from collections import deque
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+
+from async_scraper import AsyncScraper
+
+PROFILE_PROPS = {"fighter_banner_info": {"personal_info": {"fighter_id": "Me"}}}
+BATTLELOG_PROPS = {
+    "replay_list": [{
+        "uploaded_at": 1700000000 - n * 600,
+        "player1_info": {
+            "player": {"fighter_id": "Me", "short_id": 2222222222},
+            "character_name": "RASHID",
+            "league_point": 18000,
+            "master_rating": 1600 + n,
+            "round_results": [1, 1],
+        },
+        "player2_info": {
+            "player": {"fighter_id": f"Rival{n}", "short_id": 1111111111},
+            "character_name": "KEN",
+            "league_point": 25000,
+            "master_rating": 1700,
+            "round_results": [0, 0],
+        },
+    } for n in range(3)]
+}
+
+
+class FakeAsyncPage:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.url = "about:blank"
+        self.closed = False
+        self.visited = []
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    async def goto(self, url, wait_until=None):
+        await asyncio.sleep(self.delay)
+        self.url = url
+        self.visited.append(url)
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        pass
+
+    async def evaluate(self, script, arg=None):
+        props = BATTLELOG_PROPS if "battlelog" in self.url else PROFILE_PROPS
+        return {"next_data": json.dumps({"props": {"pageProps": props}}), "login_links": 0}
+
+
+class FakeContext:
+    def __init__(self, delay):
+        self.delay = delay
+        self.closed = False
+        self.pages = []
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        page = FakeAsyncPage(self.delay)
+        page.context = self
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+        for page in self.pages:
+            page.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, delay):
+        self.delay = delay
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **options):
+        self.contexts.append(FakeContext(self.delay))
+        return self.contexts[-1]
+
+
+class AsyncScraperTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.auth_file = Path(tmp.name) / "auth.json"
+        self.auth_file.write_text(json.dumps({"cookies": [{"name": "sid", "value": "x"}]}), encoding="utf-8")
+        settings = SimpleNamespace(
+            backend="browser",
+            http=None,
+            nav_timings=deque(maxlen=10),
+            pool=SimpleNamespace(fast_navigation=True, pool_size=1, idle_timeout=0),
+        )
+        self.scraper = AsyncScraper(settings, auth_file=str(self.auth_file))
+
+    def use_page(self, page):
+        async def acquire():
+            # 실제 _acquire_page처럼 반환된 warm page가 있으면 그것을 사용
+            return self.scraper._pages.pop() if self.scraper._pages else page
+        self.scraper._acquire_page = acquire
+
+    def test_collect_reuses_page_and_stops_at_stored_match(self):
+        page = FakeAsyncPage()
+        self.use_page(page)
+
+        async def scenario():
+            first = await self.scraper.collect(user_code="2222222222", limit=20)
+            second = await self.scraper.collect(user_code="2222222222", limit=20,
+                                                stop_at=first["matches"][1]["fingerprint"])
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        self.assertEqual(len(first["matches"]), 3)
+        self.assertEqual([m["opponent_name"] for m in second["matches"]], ["Rival0"])
+        self.assertEqual(self.scraper._pages, [page])
+        self.assertEqual(len(page.visited), 4)
+
+    def test_timeout_discards_page(self):
+        page = FakeAsyncPage(delay=1)
+        self.use_page(page)
+
+        with self.assertRaisesRegex(Exception, "TIMEOUT_ERROR"):
+            asyncio.run(self.scraper.collect(user_code="2222222222", timeout=0.05))
+
+        self.assertTrue(page.closed)
+        self.assertEqual(self.scraper._pages, [])
+
+    def test_cancelled_collect_releases_slot(self):
+        page = FakeAsyncPage(delay=1)
+        self.use_page(page)
+
+        async def scenario():
+            task = asyncio.create_task(self.scraper.collect(user_code="2222222222"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return self.scraper._in_use, self.scraper._has_free_slot()
+
+        in_use, free = asyncio.run(scenario())
+
+        self.assertTrue(page.closed)
+        self.assertEqual(in_use, 0)
+        self.assertTrue(free)
+
+    def test_shrinking_pool_size_counts_pages_already_in_use(self):
+        self.scraper.settings.pool.pool_size = 2
+        peak = []
+
+        async def acquire():
+            peak.append(self.scraper._in_use)
+            return FakeAsyncPage(delay=0.05)
+        self.scraper._acquire_page = acquire
+
+        async def scenario():
+            running = [asyncio.create_task(self.scraper.collect(user_code="2222222222")) for _ in range(2)]
+            await asyncio.sleep(0.02)
+            self.scraper.settings.pool.pool_size = 1
+            later = asyncio.create_task(self.scraper.collect(user_code="2222222222"))
+            await asyncio.sleep(0.02)
+            waiting = not later.done() and self.scraper._in_use == 2
+            await asyncio.gather(*running, later)
+            return waiting
+
+        self.assertTrue(asyncio.run(scenario()))
+        self.assertEqual(peak, [1, 2, 1])
+
+    def test_login_failure_is_reported(self):
+        async def fail(timeout):
+            raise Exception("BROWSER_ERROR: no browser")
+        self.scraper.login_and_save_state = fail
+
+        async def scenario():
+            task = self.scraper.start_login()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.sleep(0)  # done callback 실행
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            asyncio.run(scenario())
+        self.assertIn("로그인 실패: BROWSER_ERROR: no browser", out.getvalue())
+
+    def test_context_swap_waits_for_pages_still_in_use(self):
+        self.scraper.settings.pool.pool_size = 2
+        browser = self.scraper._browser = FakeBrowser(delay=0.1)
+
+        async def scenario():
+            first = asyncio.create_task(self.scraper.collect(user_code="2222222222"))
+            await asyncio.sleep(0.05)
+            # 첫 수집 도중 로그인으로 auth.json이 바뀜 -> 두 번째 수집은 새 컨텍스트
+            mtime = self.auth_file.stat().st_mtime + 10
+            os.utime(self.auth_file, (mtime, mtime))
+            second = asyncio.create_task(self.scraper.collect(user_code="2222222222"))
+            await asyncio.sleep(0.05)
+            old = browser.contexts[0]
+            during = (old.closed, old.pages[0].closed)
+            stats = self.scraper.stats()
+            results = await asyncio.gather(first, second)
+            return during, stats, results
+
+        during, stats, results = asyncio.run(scenario())
+        old, new = browser.contexts
+
+        self.assertEqual(during, (False, False))
+        self.assertEqual((stats["pages_in_use"], stats["retired_contexts"]), (2, 1))
+        self.assertEqual(self.scraper.stats()["retired_contexts"], 0)
+        self.assertEqual([len(r["matches"]) for r in results], [3, 3])
+        self.assertTrue(old.closed)
+        self.assertFalse(new.closed)
+        self.assertEqual(self.scraper._pages, new.pages)
+        self.assertEqual(self.scraper._retired, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
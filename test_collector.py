@@ -0,0 +1,367 @@
+import asyncio
+import sqlite3
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backfill import BackfillJob
+from collector import (collect_player_matches, collect_player_matches_async, ingest_matches, save_collected,
+                       upsert_player)
+from database import BackfillProgress, Base, CollectCursor, Match, MatchupStats, OpponentStats, Player, PlayerStats
+from rollups import rebuild_rollups
+from match_keys import match_key
+from scraper import match_fingerprint
+
+PLAYER = {"user_code": "2222222222", "name": "Me", "lp": 25000, "rank": "MASTER (1650 MR)", "character": "RASHID"}
+
+
+def scraped_match(date, opponent, result, my_mr):
+    match = {
+        "date": date,
+        "opponent_name": opponent,
+        "opponent_character": "KEN",
+        "opponent_mr": 1600,
+        "opponent_lp": None,
+        "my_character": "RASHID",
+        "my_mr": my_mr,
+        "my_lp": None,
+        "result": result,
+    }
+    match["fingerprint"] = match_fingerprint(match)
+    match["match_key"] = match_key(match)
+    return match
+
+
+class FakeScraper:
+    def __init__(self, battlelog):
+        self.battlelog = battlelog
+        self.calls = []
+
+    def collect(self, user_code=None, limit=20, stop_at=None):
+        self.calls.append(stop_at)
+        matches = []
+        for match in self.battlelog[:limit]:
+            if match["fingerprint"] == stop_at:
+                break
+            matches.append(match)
+        return {"player": dict(PLAYER), "matches": matches}
+
+
+class AsyncFakeScraper(FakeScraper):
+    async def collect(self, user_code=None, limit=20, stop_at=None):
+        return FakeScraper.collect(self, user_code, limit, stop_at)
+
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        self.db = self.Session()
+        self.addCleanup(self.db.close)
+
+
+class IncrementalCollectTests(TestDatabase):
+    def test_poll_without_new_matches_stops_at_cursor_and_writes_nothing(self):
+        battlelog = [
+            scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650),
+            scraped_match("2025/11/23 22:58", "Rival", "LOSE", 1640),
+        ]
+        scraper = FakeScraper(battlelog)
+
+        first = collect_player_matches(self.db, scraper, user_code=PLAYER["user_code"])
+        player = self.db.query(Player).one()
+        cursor = self.db.get(CollectCursor, player.id)
+        last_updated = player.last_updated
+
+        second = collect_player_matches(self.db, scraper, user_code=PLAYER["user_code"])
+
+        self.assertEqual(first["new_count"], 2)
+        self.assertEqual(cursor.top_fingerprint, battlelog[0]["fingerprint"])
+        self.assertEqual(str(cursor.last_match_date), "2025-11-23 23:03:00")
+        self.assertEqual(scraper.calls, [None, battlelog[0]["fingerprint"]])
+        self.assertEqual(second["new_count"], 0)
+        self.assertEqual(self.db.query(Match).count(), 2)
+        self.assertEqual(self.db.query(Player).one().last_updated, last_updated)
+
+    def test_new_match_moves_cursor_forward(self):
+        scraper = FakeScraper([scraped_match("2025/11/23 22:58", "Rival", "LOSE", 1640)])
+        collect_player_matches(self.db, scraper, user_code=PLAYER["user_code"])
+
+        newest = scraped_match("2025/11/23 23:10", "Other", "WIN", 1660)
+        scraper.battlelog.insert(0, newest)
+        result = collect_player_matches(self.db, scraper, user_code=PLAYER["user_code"])
+
+        cursor = self.db.query(CollectCursor).one()
+        self.assertEqual(result["new_count"], 1)
+        self.assertEqual(cursor.top_fingerprint, newest["fingerprint"])
+        self.assertEqual(str(cursor.last_match_date), "2025-11-23 23:10:00")
+
+
+class AsyncCollectTests(unittest.TestCase):
+    def test_async_collect_saves_in_a_worker_thread_with_its_own_session(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        scraper = AsyncFakeScraper([scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)])
+        loop_thread = threading.get_ident()
+        threads = []
+        listen = lambda session, flush_context, instances: threads.append(threading.get_ident())
+        event.listen(Session, "before_flush", listen)
+
+        first = asyncio.run(collect_player_matches_async(Session, scraper, user_code=PLAYER["user_code"]))
+        second = asyncio.run(collect_player_matches_async(Session, scraper, user_code=PLAYER["user_code"]))
+
+        self.assertEqual((first["new_count"], second["new_count"]), (1, 0))
+        self.assertEqual(scraper.calls, [None, scraper.battlelog[0]["fingerprint"]])  # 두 번째는 cursor에서 멈춤
+        self.assertTrue(threads)
+        self.assertNotIn(loop_thread, threads)
+
+
+class IngestTests(TestDatabase):
+    def test_batch_insert_skips_rows_already_stored(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        batch = [
+            scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650),
+            scraped_match("2025/11/23 22:58", "Rival", "WIN", 1650),
+        ]
+
+        first = ingest_matches(self.db, player, batch)
+        self.db.commit()
+        second = ingest_matches(self.db, player, batch + [scraped_match("2025/11/23 22:50", "Other", "LOSE", 1640)])
+        self.db.commit()
+
+        self.assertEqual(first, {"inserted": 2, "skipped": 0, "promoted": 0})
+        self.assertEqual(second, {"inserted": 1, "skipped": 2, "promoted": 0})
+        self.assertEqual(self.db.query(Match).count(), 3)
+
+    def test_replay_id_replaces_row_key_of_the_same_match(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        from_dom = scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)
+        ingest_matches(self.db, player, [from_dom])
+        self.db.commit()
+
+        from_json = dict(from_dom, replay_id="ABCDEF123")
+        from_json["match_key"] = match_key(from_json)
+        result = ingest_matches(self.db, player, [from_json])
+        self.db.commit()
+
+        self.assertEqual(result, {"inserted": 0, "skipped": 1, "promoted": 1})
+        self.assertEqual(self.db.query(Match.match_key).scalar(), "replay:ABCDEF123")
+
+    def test_promotion_alone_is_committed_by_save_collected(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        from_dom = scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)
+        ingest_matches(self.db, player, [from_dom])
+        self.db.commit()
+
+        from_json = dict(from_dom, replay_id="ABCDEF123")
+        from_json["match_key"] = match_key(from_json)
+        with self.Session() as db:
+            result = save_collected(db, {"player": dict(PLAYER), "matches": [from_json]}, db.get(CollectCursor, player.id))
+        self.assertEqual((result["new_count"], result["skipped"]), (0, 1))
+
+        with self.Session() as db:  # 세션을 닫은 뒤에도 남아 있어야 함 (롤백되지 않음)
+            self.assertEqual(db.query(Match.match_key).scalar(), "replay:ABCDEF123")
+
+    def test_row_key_promotion_only_updates_stored_rows_of_the_batch(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        from_dom = scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)
+        older = scraped_match("2025/11/23 22:50", "Other", "LOSE", 1640)
+        ingest_matches(self.db, player, [from_dom, older])
+        self.db.commit()
+
+        new_match = scraped_match("2025/11/23 23:20", "Rival", "LOSE", 1630)
+        batch = [dict(m, replay_id=f"REPLAY{i}") for i, m in enumerate([new_match, from_dom])]
+        for m in batch:
+            m["match_key"] = match_key(m)
+
+        updates = []
+        listen = lambda conn, cursor, statement, params, context, executemany: (
+            updates.extend(params if executemany else [params]) if statement.startswith("UPDATE matches") else None)
+        event.listen(self.db.get_bind(), "before_cursor_execute", listen)
+        self.addCleanup(event.remove, self.db.get_bind(), "before_cursor_execute", listen)
+        result = ingest_matches(self.db, player, batch)
+        self.db.commit()
+
+        self.assertEqual(result, {"inserted": 1, "skipped": 1, "promoted": 1})
+        self.assertEqual(len(updates), 1)  # 저장돼 있던 from_dom 한 건만 갱신
+        self.assertEqual(sorted(k for (k,) in self.db.query(Match.match_key)),
+                         sorted(["replay:REPLAY0", "replay:REPLAY1", match_key(older)]))
+
+    def test_unparseable_date_is_not_duplicated_on_rescrape(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        batch = [scraped_match("어제 밤", "Rival", "WIN", 1650)]
+
+        ingest_matches(self.db, player, batch)
+        result = ingest_matches(self.db, player, batch)
+
+        self.assertEqual(result["skipped"], 1)
+        self.assertEqual(self.db.query(Match).count(), 1)
+
+
+class RollupTests(TestDatabase):
+    def snapshot(self):
+        return {
+            model.__tablename__: sorted(
+                tuple(getattr(row, c.name) for c in model.__table__.columns) for row in self.db.query(model)
+            )
+            for model in (PlayerStats, OpponentStats, MatchupStats)
+        }
+
+    def test_incremental_rollups_match_full_rebuild(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        recent = [
+            scraped_match("2025/11/23 23:10", "Rival", "WIN", 1660),
+            scraped_match("2025/11/23 23:03", "Other", "LOSE", 1650),
+        ]
+        older = [
+            scraped_match("2025/11/20 21:00", "Rival", "LOSE", 1620),
+            scraped_match("2025/11/20 20:50", "Rival", "WIN", 1630),
+        ]
+        ingest_matches(self.db, player, recent)
+        ingest_matches(self.db, player, recent + older)  # 중복은 다시 세지 않고, 과거 매치는 마지막 상대를 바꾸지 않음
+        self.db.commit()
+
+        incremental = self.snapshot()
+        stats = self.db.get(PlayerStats, player.id)
+        rival = self.db.get(OpponentStats, (player.id, "Rival"))
+
+        rebuild_rollups(self.db)
+        self.db.commit()
+
+        self.assertEqual((stats.total, stats.wins, stats.losses), (4, 2, 2))
+        self.assertEqual(stats.last_opponent_name, "Rival")
+        self.assertEqual((rival.total, rival.wins, rival.losses), (3, 2, 1))
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_batch_with_more_opponents_than_one_statement_can_bind(self):
+        # opponent_stats 한 행에 변수 6개 -> 6000명이면 SQLite 기본 제한(32766)을 넘는 multi-VALUES가 됨
+        # (배포판에 따라 제한을 늘려 빌드한 sqlite도 있으므로 기본값으로 맞춤)
+        self.db.connection().connection.dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32766)
+        player, _ = upsert_player(self.db, PLAYER)
+        start = datetime(2025, 1, 1)
+        matches = [
+            scraped_match((start + timedelta(minutes=i)).strftime("%Y/%m/%d %H:%M"), f"Opponent{i}", "WIN", 1500 + i)
+            for i in range(6000)
+        ]
+        result = ingest_matches(self.db, player, matches)
+        self.db.commit()
+
+        self.assertEqual(result["inserted"], 6000)
+        self.assertEqual(self.db.query(OpponentStats).count(), 6000)
+        self.assertEqual(self.db.get(PlayerStats, player.id).total, 6000)
+
+    def test_matchup_mr_delta_is_kept_in_step_with_rebuild(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        older = [
+            scraped_match("2025/11/20 21:00", "Rival", "LOSE", 1620),
+            scraped_match("2025/11/20 20:50", "Rival", "WIN", 1630),
+        ]
+        recent = [
+            scraped_match("2025/11/23 23:10", "Rival", "WIN", 1660),
+            scraped_match("2025/11/23 23:03", "Other", "LOSE", 1650),
+        ]
+        ken = scraped_match("2025/11/24 20:00", "Rival", "WIN", 1100)
+        ken["my_character"] = "KEN"
+        # 시간순으로 들어오면 새 행만 읽어 더하고, 캐릭터가 바뀐 첫 매치는 변화량 없음
+        for batch in (older, recent, [ken]):
+            ingest_matches(self.db, player, batch)
+        self.db.commit()
+
+        incremental = self.snapshot()
+        self.assertEqual(self.db.get(MatchupStats, (player.id, "KEN", "RASHID")).mr_delta, 30)  # -10, +30, +10
+        self.assertEqual(self.db.get(MatchupStats, (player.id, "KEN", "KEN")).mr_delta, 0)
+        rebuild_rollups(self.db)
+        self.db.commit()
+        self.assertEqual(self.snapshot(), incremental)
+
+
+    def test_backfill_order_keeps_matchup_mr_delta_without_full_recompute(self):
+        player, _ = upsert_player(self.db, PLAYER)
+        start = datetime(2025, 11, 1)
+        history = []
+        for i in range(60):
+            match = scraped_match((start + timedelta(minutes=10 * i)).strftime("%Y/%m/%d %H:%M"),
+                                  f"Rival{i % 4}", "WIN" if i % 3 else "LOSE", 1500 + (i * 37) % 90)
+            match["my_character"] = "KEN" if i // 7 % 2 else "RASHID"
+            match["opponent_character"] = ("KEN", "JURI", "RYU")[i % 3]
+            history.append(match)
+        newest_first = history[::-1]
+        recent, older = newest_first[:20], newest_first[20:]
+
+        statements = []
+        listen = lambda conn, cursor, statement, params, context, executemany: statements.append(statement)
+        event.listen(self.db.get_bind(), "before_cursor_execute", listen)
+        self.addCleanup(event.remove, self.db.get_bind(), "before_cursor_execute", listen)
+        # 백필처럼 최신 페이지부터 10행씩, 마지막은 기존 기록 사이사이에 끼어드는 행들
+        ingest_matches(self.db, player, recent[1::2])
+        for i in range(0, len(older), 10):
+            ingest_matches(self.db, player, older[i:i + 10])
+            self.db.commit()
+        ingest_matches(self.db, player, recent[0::2])
+        self.db.commit()
+
+        self.assertFalse([s for s in statements if "mr_delta = d.mr_delta" in s])
+        incremental = self.snapshot()
+        rebuild_rollups(self.db)
+        self.db.commit()
+        self.assertEqual(self.snapshot(), incremental)
+
+
+class FakeBackfillScraper:
+    def __init__(self, total_pages, fail_on_page=None):
+        self.total_pages = total_pages
+        self.fail_on_page = fail_on_page
+        self.requested = []
+
+    def get_stats(self, user_code=None):
+        return dict(PLAYER)
+
+    def fetch_battlelog_pages(self, user_code, my_name, tab, page_numbers, before_request=None):
+        self.requested.append((tab, list(page_numbers)))
+        results = []
+        for n in page_numbers:
+            if n == self.fail_on_page:
+                self.fail_on_page = None
+                raise Exception("connection reset")
+            before_request()
+            matches = [scraped_match(f"2025/10/{n:02d} 12:{i:02d}", f"{tab}-{n}", "WIN", 1500 + i) for i in range(3)]
+            results.append({"page": n, "matches": matches, "total_page": self.total_pages})
+        return results
+
+
+class BackfillTests(TestDatabase):
+    def make_job(self, scraper, **options):
+        return BackfillJob(scraper, PLAYER["user_code"], tabs=["rank"], concurrency=2,
+                           requests_per_second=0, session_factory=self.Session, **options)
+
+    def test_backfill_resumes_from_last_committed_page(self):
+        scraper = FakeBackfillScraper(total_pages=5, fail_on_page=4)
+
+        first = self.make_job(scraper)
+        first.run()
+        progress = self.db.query(BackfillProgress).one()
+
+        self.assertEqual(first.state["status"], "error")
+        self.assertEqual(progress.next_page, 3)
+        self.assertEqual(self.db.query(Match).count(), 6)
+
+        second = self.make_job(scraper)
+        second.run()
+        self.db.expire_all()
+        progress = self.db.query(BackfillProgress).one()
+
+        self.assertEqual(second.state["status"], "completed")
+        self.assertEqual(scraper.requested, [("rank", [1, 2]), ("rank", [3, 4]), ("rank", [3, 4]), ("rank", [5])])
+        self.assertTrue(progress.done)
+        self.assertEqual(progress.imported, 15)
+        self.assertEqual(self.db.query(Match).count(), 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
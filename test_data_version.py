@@ -0,0 +1,53 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import events
+from collector import save_collected
+from data_version import DataVersion, etag_matches
+from database import Base
+from test_collector import PLAYER, scraped_match
+from test_events import RecordingBroker
+
+
+class DataVersionTests(unittest.TestCase):
+    def test_etag_changes_with_version_and_parts(self):
+        version = DataVersion()
+        etag = version.etag("/api/stats/summary", [("limit", "100")])
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(etag, version.etag("/api/stats/summary", [("limit", "100")]))
+        self.assertNotEqual(etag, version.etag("/api/stats/summary", [("limit", "50")]))
+
+        version.bump()
+        self.assertNotEqual(etag, version.etag("/api/stats/summary", [("limit", "100")]))
+
+    def test_if_none_match_uses_weak_comparison(self):
+        etag = 'W/"abc-1"'
+        self.assertTrue(etag_matches('W/"abc-1"', etag))
+        self.assertTrue(etag_matches('"abc-1"', etag))
+        self.assertTrue(etag_matches('W/"old", W/"abc-1"', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('W/"abc-2"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+    def test_version_is_bumped_only_by_commits_that_ingest(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        version = DataVersion()
+        events.install(Session, RecordingBroker(), version)
+
+        collected = {"player": dict(PLAYER), "matches": [scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)]}
+        with Session() as db:
+            save_collected(db, collected)
+        self.assertEqual(version.value, 1)
+
+        # 이미 저장된 매치만 다시 수집하면 응답이 같으므로 ETag도 유지
+        with Session() as db:
+            save_collected(db, collected)
+        self.assertEqual(version.value, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from database import configure_storage, create_storage_engine, init_db, optimize_database, storage_status
+from match_keys import match_fingerprint, match_key
+from migrations import LATEST_VERSION, run_migrations, schema_version
+
+
+class StorageProfileTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.engine = create_storage_engine(f"sqlite:///{os.path.join(tmp.name, 'test.db')}")
+        self.addCleanup(self.engine.dispose)
+
+    def test_performance_profile_is_applied_on_connect(self):
+        pragmas = storage_status(self.engine)["pragmas"]
+
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["synchronous"], 1)  # NORMAL
+        self.assertEqual(pragmas["temp_store"], 2)  # MEMORY
+        self.assertEqual(pragmas["busy_timeout"], 5000)
+        optimize_database(self.engine)
+
+    def test_switching_profile_reconnects_with_new_pragmas(self):
+        storage_status(self.engine)
+        configure_storage("compat", self.engine)
+        status = storage_status(self.engine)
+
+        self.assertEqual(status["storage_profile"], "compat")
+        self.assertEqual(status["pragmas"]["journal_mode"], "delete")
+        self.assertEqual(status["pragmas"]["synchronous"], 2)  # FULL
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            configure_storage("turbo", self.engine)
+
+
+class MigrationTests(unittest.TestCase):
+    def test_old_database_is_upgraded_in_place(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            # match_key 이전 버전의 matches 테이블
+            conn.execute(text(
+                "CREATE TABLE matches (id INTEGER PRIMARY KEY, player_id INTEGER, opponent_name VARCHAR, "
+                "opponent_character VARCHAR, opponent_mr INTEGER, opponent_lp INTEGER, my_character VARCHAR, "
+                "my_mr INTEGER, my_lp INTEGER, result VARCHAR, match_date DATETIME)"
+            ))
+            for _ in range(2):
+                conn.execute(text(
+                    "INSERT INTO matches (player_id, match_date, opponent_name, opponent_character, opponent_mr, "
+                    "my_character, my_mr, result) "
+                    "VALUES (1, '2025-11-23 23:03:00.000000', 'Rival', 'KEN', 1600, 'RASHID', 1650, 'WIN')"
+                ))
+
+        init_db(engine)
+
+        rescraped = {
+            "date": "2025/11/23 23:03", "opponent_name": "Rival", "opponent_character": "KEN",
+            "opponent_mr": 1600, "opponent_lp": None, "my_character": "RASHID", "my_mr": 1650,
+            "my_lp": None, "result": "WIN",
+        }
+        rescraped["fingerprint"] = match_fingerprint(rescraped)
+        with engine.connect() as conn:
+            keys = conn.execute(text("SELECT match_key FROM matches")).scalars().all()
+            indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(matches)"))}
+
+        # 같은 매치를 다시 스크랩하면 같은 키가 나와야 중복 저장되지 않습니다.
+        self.assertEqual(keys, [match_key(rescraped)])
+        self.assertTrue({"uq_matches_match_key", "ix_matches_player_date", "ix_matches_player_opponent",
+                         "ix_matches_player_opp_char_result", "ix_matches_player_mr"} <= indexes)
+        self.assertEqual(schema_version(engine), LATEST_VERSION)
+
+    def test_applied_versions_are_not_run_again(self):
+        engine = create_engine("sqlite://")
+        init_db(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_matches_player_mr"))
+
+        self.assertEqual(run_migrations(engine), LATEST_VERSION)
+        with engine.connect() as conn:
+            indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(matches)"))}
+        self.assertNotIn("ix_matches_player_mr", indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
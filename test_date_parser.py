@@ -0,0 +1,35 @@
+import unittest
+from datetime import datetime
+
+from bench_date_parser import legacy_parse, load_corpus
+from date_parser import KST, DateParser, parse_battlelog_date, to_storage
+
+
+class DateParserTests(unittest.TestCase):
+    def test_corpus(self):
+        for raw, expected in load_corpus():
+            with self.subTest(raw=raw):
+                parsed = parse_battlelog_date(raw)
+                self.assertEqual(parsed.isoformat() if parsed else None, expected)
+
+    def test_detected_format_is_tried_first(self):
+        parser = DateParser()
+        parser.parse("2025. 11. 23. 오후 2:38:00")
+        parser.parse("2025/11/23 23:03")
+
+        self.assertEqual(parser.detected_format, "ymd_slash")
+        self.assertEqual(parser.parse("2025. 11. 23. 오전 9:00:00"), datetime(2025, 11, 23, 9, 0, tzinfo=KST))
+        self.assertEqual(parser.detected_format, "korean")
+
+    def test_storage_value_is_kst_wall_clock(self):
+        self.assertEqual(to_storage(parse_battlelog_date("2025-11-23T05:38:00Z")), datetime(2025, 11, 23, 14, 38))
+
+    def test_legacy_formats_keep_the_same_wall_clock_time(self):
+        # 기존 DB의 매치 시간과 이어지도록 기존 형식은 같은 벽시계 시간이 나와야 합니다.
+        for raw in ("2025/11/23 23:03", "11/23/2025 14:38", "2025. 11. 23. 14:38:00", "2025-11-23 14:38:00"):
+            with self.subTest(raw=raw):
+                self.assertEqual(to_storage(parse_battlelog_date(raw)), legacy_parse(raw))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import events
+from collector import save_collected
+from database import Base
+from test_collector import PLAYER, scraped_match
+
+
+class RecordingBroker:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, name, data=None):
+        self.events.append((name, data))
+
+
+class EventBrokerTests(unittest.TestCase):
+    def test_events_published_from_another_thread_reach_the_stream(self):
+        async def scenario():
+            broker = events.EventBroker()
+            broker.bind(asyncio.get_running_loop())
+            stream = broker.stream()
+            received = [await stream.__anext__(), await stream.__anext__()]  # retry, hello
+            self.assertEqual(broker.subscriber_count(), 1)
+
+            worker = threading.Thread(target=broker.publish, args=("matches", {"player_id": 1, "new_count": 2}))
+            worker.start()
+            worker.join()
+            received.append(await asyncio.wait_for(stream.__anext__(), 1))
+
+            broker.close()
+            with self.assertRaises(StopAsyncIteration):
+                await asyncio.wait_for(stream.__anext__(), 1)
+            self.assertEqual(broker.subscriber_count(), 0)
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertTrue(received[0].startswith("retry:"))
+        self.assertTrue(received[1].startswith("event: hello\n"))
+        self.assertEqual(received[2], 'event: matches\ndata: {"player_id": 1, "new_count": 2}\n\n')
+
+    def test_idle_stream_sends_heartbeats(self):
+        async def scenario():
+            broker = events.EventBroker()
+            broker.bind(asyncio.get_running_loop())
+            stream = broker.stream()
+            await stream.__anext__()
+            await stream.__anext__()
+            message = await asyncio.wait_for(stream.__anext__(), 1)
+            await stream.aclose()
+            return message
+
+        with mock.patch.object(events, "HEARTBEAT_INTERVAL", 0.05):
+            self.assertTrue(asyncio.run(scenario()).startswith("event: heartbeat\n"))
+
+
+class CommitEventTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        self.broker = RecordingBroker()
+        events.install(self.Session, self.broker)
+
+    def test_ingest_publishes_only_after_commit(self):
+        collected = {"player": dict(PLAYER), "matches": [scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)]}
+        with self.Session() as db:
+            save_collected(db, collected)
+        names = [name for name, _ in self.broker.events]
+        self.assertEqual(names, ["player", "matches", "summary"])
+        self.assertEqual(self.broker.events[1][1]["new_count"], 1)
+
+        # 같은 매치를 다시 수집하면 아무 변화가 없으므로 이벤트도 없음
+        self.broker.events.clear()
+        with self.Session() as db:
+            save_collected(db, collected)
+        self.assertEqual(self.broker.events, [])
+
+    def test_rolled_back_changes_are_not_published(self):
+        collected = {"player": dict(PLAYER), "matches": [scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)]}
+        with self.Session() as db:
+            with mock.patch.object(db, "commit", db.rollback):
+                save_collected(db, collected)
+            db.commit()
+        self.assertEqual(self.broker.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
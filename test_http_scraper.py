@@ -0,0 +1,159 @@
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+from http_scraper import HttpScraper, cookie_header
+from scraper import Scraper
+
+USER_CODE = "2222222222"
+
+
+def saved_page(page_props):
+    next_data = json.dumps({"props": {"pageProps": page_props}})
+    return (
+        "<html><head></head><body><div id=\"__next\"></div>"
+        f"<script id=\"__NEXT_DATA__\" type=\"application/json\">{next_data}</script>"
+        "</body></html>"
+    )
+
+
+PAGES = {
+    "/6/buckler": "<html><body><a href=\"/6/buckler/ko-kr/profile/2222222222\">Me</a></body></html>",
+    f"/6/buckler/ko-kr/profile/{USER_CODE}": saved_page({
+        "fighter_banner_info": {
+            "personal_info": {"fighter_id": "Me"},
+            "favorite_character_alpha": "RASHID",
+            "favorite_character_league_info": {
+                "league_point": 25000,
+                "master_rating": 1650,
+                "league_rank_info": {"league_rank_name": "MASTER"},
+            },
+        }
+    }),
+    f"/6/buckler/ko-kr/profile/{USER_CODE}/battlelog/rank": saved_page({
+        "replay_list": [{
+            "uploaded_at": 1700000000,
+            "player1_info": {
+                "player": {"fighter_id": "Me", "short_id": int(USER_CODE)},
+                "character_name": "RASHID",
+                "master_rating": 1650,
+                "round_results": [1, 1],
+            },
+            "player2_info": {
+                "player": {"fighter_id": "Rival", "short_id": 1111111111},
+                "character_name": "KEN",
+                "master_rating": 1600,
+                "round_results": [0, 0],
+            },
+        }]
+    }),
+}
+
+
+class BucklerStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("Cookie"), self.client_address))
+        if self.path.startswith("/blocked"):
+            self.reply(403, "forbidden")
+        elif self.path.startswith("/expired"):
+            self.send_response(302)
+            self.send_header("Location", "/6/buckler/error-system")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path in PAGES:
+            self.reply(200, PAGES[self.path])
+        else:
+            self.reply(404, "not found")
+
+    def reply(self, status, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpScraperTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), BucklerStandIn)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        BucklerStandIn.requests = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.auth_path = Path(self.tmp.name) / "auth.json"
+        self.auth_path.write_text(json.dumps({"cookies": [
+            {"name": "buckler_id", "value": "abc", "domain": "127.0.0.1", "path": "/", "expires": -1},
+            {"name": "other_site", "value": "x", "domain": ".example.com", "path": "/", "expires": -1},
+        ]}), encoding="utf-8")
+
+    def make_scraper(self, path="/6/buckler"):
+        http = HttpScraper(auth_file=str(self.auth_path), base_url=self.base + path)
+        self.addCleanup(http.close)
+        return http
+
+    def test_collect_reads_profile_and_battlelog_over_one_connection(self):
+        http = self.make_scraper()
+
+        result = http.collect(user_code=None, limit=5)
+
+        self.assertEqual(result["player"]["name"], "Me")
+        self.assertEqual(result["player"]["rank"], "MASTER (1650 MR)")
+        self.assertEqual(len(result["matches"]), 1)
+        self.assertEqual(result["matches"][0]["result"], "WIN")
+        self.assertEqual(result["matches"][0]["opponent_name"], "Rival")
+        self.assertEqual([r[1] for r in BucklerStandIn.requests], ["buckler_id=abc"] * 3)
+        self.assertEqual(len({r[2] for r in BucklerStandIn.requests}), 1)
+        self.assertEqual(http.pool.created, 1)
+
+    def test_forbidden_and_error_redirect_request_browser_fallback(self):
+        for path in ("/blocked", "/expired"):
+            with self.assertRaisesRegex(Exception, "HTTP_FALLBACK"):
+                self.make_scraper(path).get_stats(USER_CODE)
+
+    def test_scraper_falls_back_to_browser_path(self):
+        scraper = Scraper(backend="http")
+        self.addCleanup(scraper.close)
+        scraper.http = self.make_scraper("/blocked")
+        browser_result = {"player": {"user_code": USER_CODE}, "matches": []}
+
+        with mock.patch("scraper.auth_state_has_session", return_value=True), \
+                mock.patch.object(scraper.pool, "run", return_value=browser_result) as run:
+            result = scraper.collect(user_code=USER_CODE)
+
+        self.assertIs(result, browser_result)
+        run.assert_called_once()
+
+    def test_cookie_header_filters_secure_and_expired_cookies(self):
+        cookies = [
+            {"name": "a", "value": "1", "domain": ".streetfighter.com", "path": "/", "expires": -1},
+            {"name": "b", "value": "2", "domain": "www.streetfighter.com", "path": "/6", "secure": True},
+            {"name": "c", "value": "3", "domain": ".streetfighter.com", "path": "/", "expires": 10},
+        ]
+
+        self.assertEqual(cookie_header(cookies, "https://www.streetfighter.com/6/buckler", now=100), "a=1; b=2")
+        self.assertEqual(cookie_header(cookies, "http://www.streetfighter.com/6/buckler", now=100), "a=1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import match_history
+from collector import ingest_matches, upsert_player
+from database import Base
+from test_collector import PLAYER, scraped_match
+
+
+class MatchHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        player, _ = upsert_player(self.db, dict(PLAYER))
+        # 같은 시각의 매치 2개씩 -> (match_date, id)로 순서가 정해져야 함
+        matches = []
+        for n in range(30):
+            match = scraped_match(f"2025/11/{1 + n // 2:02d} 12:00", f"Rival{n % 3}", "WIN" if n % 2 else "LOSE", 1500 + n)
+            match["match_key"] = f"replay:{n}"
+            matches.append(match)
+        ingest_matches(self.db, player, matches)
+        self.db.commit()
+        self.player_id = player.id
+
+    def pages(self, **kwargs):
+        items, cursor = [], None
+        while True:
+            page = match_history.page_matches(self.db, self.player_id, limit=7, cursor=cursor, **kwargs)
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return items
+
+    def test_keyset_pages_walk_the_whole_history_newest_first(self):
+        items = self.pages()
+        self.assertEqual(len(items), 30)
+        self.assertEqual(len({item["id"] for item in items}), 30)
+        keys = [(item["match_date"], item["id"]) for item in items]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_filters(self):
+        self.assertEqual(len(self.pages(result="win")), 15)
+        self.assertEqual({i["opponent_name"] for i in self.pages(opponent="Rival1")}, {"Rival1"})
+        self.assertEqual(len(self.pages(date_from="2025-11-14", date_to="2025-11-15")), 4)
+        self.assertEqual(self.pages(character="KEN"), [])
+        self.assertEqual(len(self.pages(opponent_character="KEN", result="LOSE")), 15)
+        with self.assertRaises(ValueError):
+            self.pages(result="TIMEOUT")
+        with self.assertRaises(ValueError):
+            match_history.page_matches(self.db, self.player_id, cursor="garbage")
+
+    def test_export_streams_every_row_as_ndjson_or_csv(self):
+        lines = list(match_history.export_matches(self.engine, "ndjson", self.player_id, result="WIN"))
+        self.assertEqual(len(lines), 15)
+        self.assertEqual(json.loads(lines[0])["result"], "WIN")
+
+        text = "".join(match_history.export_matches(self.engine, "csv", self.player_id)).lstrip("\ufeff")
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows[0]["match_date"], "2025-11-15T12:00:00")
+
+        with self.assertRaises(ValueError):
+            match_history.export_matches(self.engine, "xml", self.player_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
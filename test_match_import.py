@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import match_history
+from collector import ingest_matches, upsert_player
+from database import Base, Match, PlayerStats
+from match_import import MAX_IMPORT_CHUNK_SIZE, ImportJob, detect_format
+from test_collector import PLAYER, scraped_match
+
+
+def memory_database():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)
+
+
+class MatchImportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        # 원본: 파일 DB (db 형식 가져오기에도 사용)
+        self.source_path = os.path.join(self.tmp.name, "old.db")
+        self.source = create_engine(f"sqlite:///{self.source_path}")
+        self.addCleanup(self.source.dispose)
+        Base.metadata.create_all(bind=self.source)
+        with sessionmaker(bind=self.source)() as db:
+            player, _ = upsert_player(db, dict(PLAYER))
+            ingest_matches(db, player, [
+                scraped_match(f"2025/11/{1 + n % 28:02d} {n % 24:02d}:00", f"Rival{n % 5}", "WIN" if n % 3 else "LOSE", 1500 + n)
+                for n in range(40)
+            ])
+            db.commit()
+
+        self.target, self.Session = memory_database()
+
+    def export(self, fmt):
+        path = os.path.join(self.tmp.name, f"export.{fmt}")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for line in match_history.export_matches(self.source, fmt):
+                f.write(line)
+        return path
+
+    def run_import(self, path, **kwargs):
+        kwargs.setdefault("user_code", PLAYER["user_code"])
+        return ImportJob(path, session_factory=self.Session, **kwargs).run()
+
+    def count(self):
+        with self.Session() as db:
+            return db.query(Match).count()
+
+    def test_exported_files_round_trip_and_reimport_is_deduplicated(self):
+        for fmt in ("ndjson", "csv"):
+            with self.subTest(fmt=fmt):
+                self.target, self.Session = memory_database()
+                path = self.export(fmt)
+                self.assertEqual(detect_format(path), fmt)
+
+                status = self.run_import(path, chunk_size=15)
+                self.assertEqual((status["status"], status["inserted"], status["chunks"]), ("done", 40, 3))
+                self.assertEqual(self.count(), 40)
+
+                again = self.run_import(path)
+                self.assertEqual((again["inserted"], again["skipped"]), (0, 40))
+                with self.Session() as db:
+                    self.assertEqual(db.query(PlayerStats).one().total, 40)
+
+    def test_largest_chunk_size_fits_in_sqlite_variable_limit(self):
+        path = os.path.join(self.tmp.name, "many.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            for n in range(12000):  # 상대가 모두 다름 -> 집계 upsert 행도 chunk마다 chunk_size개
+                match = scraped_match(f"2025/{1 + n // 1440 % 12:02d}/01 {n // 60 % 24:02d}:{n % 60:02d}",
+                                      f"Opponent{n}", "WIN", 1500)
+                f.write(json.dumps({k: v for k, v in match.items() if k != "fingerprint"}) + "\n")
+        with self.Session() as db:
+            # StaticPool이라 이후 세션도 같은 연결을 씀. 배포판마다 다른 제한을 SQLite 기본값으로 맞춤
+            db.connection().connection.dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32766)
+
+        status = self.run_import(path, chunk_size=MAX_IMPORT_CHUNK_SIZE)
+        self.assertEqual((status["status"], status["inserted"], status["chunks"]), ("done", 12000, 2))
+
+        with self.assertRaises(ValueError):
+            ImportJob(path, user_code=PLAYER["user_code"], chunk_size=MAX_IMPORT_CHUNK_SIZE + 1)
+
+    def test_other_database_file_is_merged_per_player(self):
+        self.assertEqual(detect_format(self.source_path), "db")
+        status = self.run_import(self.source_path, user_code=None)
+        self.assertEqual((status["inserted"], status["players"]), (40, [PLAYER["user_code"]]))
+
+        # 같은 DB를 내보낸 파일을 또 가져와도 match_key가 같으므로 중복
+        self.assertEqual(self.run_import(self.export("ndjson"))["inserted"], 0)
+        self.assertEqual(self.count(), 40)
+
+    def test_rows_without_a_readable_date_are_reported_and_skipped(self):
+        path = os.path.join(self.tmp.name, "bad.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"match_date": "yesterday", "opponent_name": "X", "result": "WIN"}) + "\n")
+            f.write(json.dumps({"match_date": "2025-11-01T10:00:00", "opponent_name": "X", "result": "win",
+                                "opponent_mr": "1600"}) + "\n")
+        status = self.run_import(path)
+        self.assertEqual((status["inserted"], status["invalid"]), (1, 1))
+        self.assertIn("yesterday", status["errors"][0])
+
+    def test_ndjson_and_csv_require_a_target_player(self):
+        with self.assertRaises(ValueError):
+            ImportJob(self.export("csv"), session_factory=self.Session)
+
+
+if __name__ == "__main__":
+    unittest.main()
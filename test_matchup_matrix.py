@@ -0,0 +1,59 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from collector import ingest_matches, upsert_player
+from database import Base
+from matchup_matrix import matchup_matrix
+from test_collector import PLAYER, scraped_match
+
+
+def match(date, my_character, opponent_character, result, my_mr):
+    data = scraped_match(date, "Rival", result, my_mr)
+    data.update(my_character=my_character, opponent_character=opponent_character,
+                match_key=f"replay:{date}")
+    return data
+
+
+class MatchupMatrixTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        player, _ = upsert_player(self.db, dict(PLAYER))
+        ingest_matches(self.db, player, [
+            match("2025/11/03 20:00", "RASHID", "KEN", "WIN", 1500),
+            match("2025/11/03 20:10", "RASHID", "KEN", "WIN", 1520),   # +20
+            match("2025/11/03 20:20", "RASHID", "JURI", "LOSE", 1505),  # -15
+            match("2025/11/03 20:30", "KEN", "JURI", "WIN", 1200),      # 캐릭터 변경: 변화량 없음
+            match("2025/11/03 20:40", "KEN", "KEN", "LOSE", 1190),      # -10
+        ])
+        self.db.commit()
+        self.player_id = player.id
+
+    def test_matrix_cells_and_totals(self):
+        matrix = matchup_matrix(self.db, self.player_id)
+        cells = {(c["my_character"], c["opponent_character"]): c for c in matrix["cells"]}
+
+        self.assertEqual(matrix["my_characters"], ["RASHID", "KEN"])
+        self.assertEqual(matrix["opponent_characters"], ["KEN", "JURI"])
+        self.assertEqual(len(cells), 4)
+        rashid_ken = cells[("RASHID", "KEN")]
+        self.assertEqual((rashid_ken["wins"], rashid_ken["losses"], rashid_ken["win_rate"], rashid_ken["mr_delta"]),
+                         (2, 0, 100.0, 20))
+        self.assertEqual(cells[("RASHID", "JURI")]["mr_delta"], -15)
+        self.assertEqual(cells[("KEN", "JURI")]["mr_delta"], 0)
+
+        self.assertEqual(matrix["by_my_character"]["RASHID"]["total"], 3)
+        vs_ken = matrix["by_opponent_character"]["KEN"]
+        self.assertEqual((vs_ken["total"], vs_ken["wins"], vs_ken["mr_delta"]), (3, 2, 10))
+
+    def test_empty_and_unknown_player(self):
+        self.assertEqual(matchup_matrix(self.db, self.player_id + 1)["cells"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
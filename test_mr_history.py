@@ -0,0 +1,73 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from collector import ingest_matches, upsert_player
+from database import Base
+from mr_history import downsample_mr_history
+from test_collector import PLAYER, scraped_match
+
+# 톱니 모양 MR: 10판마다 +100 급등 후 하락 (다운샘플링해도 봉우리가 남아야 함)
+SPIKE_EVERY = 10
+
+
+def mr_at(n):
+    return 1500 + n + (100 if n % SPIKE_EVERY == 5 else 0)
+
+
+class MRHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        player, _ = upsert_player(self.db, dict(PLAYER))
+        matches = []
+        for n in range(400):
+            match = scraped_match(f"2025/11/{1 + n // 20:02d} {n % 20:02d}:00", "Rival", "WIN" if n % 4 else "LOSE", mr_at(n))
+            match["match_key"] = f"replay:{n}"
+            matches.append(match)
+        ingest_matches(self.db, player, matches)
+        self.db.commit()
+        self.player_id = player.id
+
+    def test_small_series_is_returned_unchanged(self):
+        history = downsample_mr_history(self.db, self.player_id, points=300, limit=50)
+        self.assertFalse(history["downsampled"])
+        self.assertEqual(history["total"], 50)
+        self.assertEqual([p["mr"] for p in history["points"]], [mr_at(n) for n in range(350, 400)])
+        self.assertEqual(len(history["buckets"]), 50)
+
+    def test_downsampling_keeps_extremes_endpoints_and_bucket_win_loss(self):
+        history = downsample_mr_history(self.db, self.player_id, points=80)
+        points, buckets = history["points"], history["buckets"]
+        self.assertTrue(history["downsampled"])
+        self.assertEqual(history["total"], 400)
+        self.assertLessEqual(len(points), 82)
+        self.assertEqual(len(buckets), 40)  # 구간마다 10판 = 봉우리 1개
+
+        # 시간순, 처음/마지막 매치 포함, 모든 급등 봉우리 유지
+        self.assertEqual([p["index"] for p in points], sorted(p["index"] for p in points))
+        self.assertEqual((points[0]["mr"], points[-1]["mr"]), (mr_at(0), mr_at(399)))
+        self.assertEqual(max(p["mr"] for p in points), max(mr_at(n) for n in range(400)))
+        spikes = {p["index"] for p in points if p["mr"] > 1500 + p["index"]}
+        self.assertEqual(spikes, set(range(5, 400, SPIKE_EVERY)))
+
+        # 구간별 승/패는 줄이기 전의 모든 매치 기준
+        self.assertEqual(sum(b["matches"] for b in buckets), 400)
+        self.assertEqual(sum(b["wins"] for b in buckets), 300)
+        self.assertEqual(sum(b["losses"] for b in buckets), 100)
+
+    def test_date_range(self):
+        history = downsample_mr_history(self.db, self.player_id, date_from="2025-11-02", date_to="2025-11-03")
+        self.assertEqual(history["total"], 40)
+        self.assertEqual(history["points"][0]["date"], "2025-11-02T00:00:00")
+        self.assertEqual(downsample_mr_history(self.db, self.player_id, date_to="2025-11-01T05:00:00")["total"], 6)
+        with self.assertRaises(ValueError):
+            downsample_mr_history(self.db, self.player_id, date_from="last week")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, OpponentStats, Player
+from opponent_directory import fuzzy_score, search_opponents
+
+
+class OpponentDirectoryTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.db.add_all([Player(id=1, user_code="1"), Player(id=2, user_code="2")])
+        base = datetime(2025, 1, 1)
+        for n in range(25):
+            self.db.add(OpponentStats(player_id=1, opponent_name=f"Rival{n:02d}", total=n % 4 + 1, wins=1,
+                                      losses=n % 4, last_match_date=base + timedelta(hours=n)))
+        self.db.add(OpponentStats(player_id=1, opponent_name="kenMaster", total=9, wins=6, losses=3,
+                                  last_match_date=base))
+        self.db.add(OpponentStats(player_id=2, opponent_name="Rival00", total=5, wins=5, losses=0,
+                                  last_match_date=base + timedelta(days=1)))
+        self.db.commit()
+
+    def collect_pages(self, **kwargs):
+        items, cursor = [], None
+        while True:
+            page = search_opponents(self.db, cursor=cursor, limit=7, **kwargs)
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return items
+
+    def test_cursor_pages_cover_every_opponent_once_in_order(self):
+        for sort in ("games", "last_seen", "name"):
+            with self.subTest(sort=sort):
+                items = self.collect_pages(player_id=1, sort=sort)
+                names = [item["name"] for item in items]
+                self.assertEqual(len(names), 26)
+                self.assertEqual(len(set(names)), 26)
+        games = [item["total"] for item in self.collect_pages(player_id=1, sort="games")]
+        self.assertEqual(games, sorted(games, reverse=True))
+        self.assertEqual(self.collect_pages(player_id=1, sort="last_seen")[0]["name"], "Rival24")
+
+    def test_last_seen_pages_put_opponents_without_date_last(self):
+        for n in range(10):
+            self.db.add(OpponentStats(player_id=1, opponent_name=f"Undated{n}", total=1, wins=1, losses=0,
+                                      last_match_date=None))
+        self.db.commit()
+        names = [item["name"] for item in self.collect_pages(player_id=1, sort="last_seen")]
+        self.assertEqual(len(names), 36)
+        self.assertEqual(len(set(names)), 36)
+        self.assertEqual(sorted(names[-10:]), [f"Undated{n}" for n in range(10)])
+
+    def test_prefix_search_ignores_case_and_treats_wildcards_literally(self):
+        self.assertEqual([i["name"] for i in search_opponents(self.db, 1, q="KEN")["items"]], ["kenMaster"])
+        self.assertEqual(len(search_opponents(self.db, 1, q="rival1", limit=50)["items"]), 10)
+        self.assertEqual(search_opponents(self.db, 1, q="%")["items"], [])
+
+    def test_all_players_scope_sums_records_per_name(self):
+        items = {i["name"]: i for i in self.collect_pages(player_id=None, q="Rival00")}
+        self.assertEqual(items["Rival00"]["total"], 6)
+        self.assertEqual(items["Rival00"]["wins"], 6)
+
+    def test_fuzzy_search_tolerates_typos(self):
+        items = search_opponents(self.db, 1, q="kenmastr", fuzzy=True)["items"]
+        self.assertEqual(items[0]["name"], "kenMaster")
+        self.assertGreater(fuzzy_score("Rvial", "Rival03"), 0.6)
+        self.assertLess(fuzzy_score("zzz", "Rival03"), 0.6)
+
+    def test_fuzzy_search_only_ranks_names_sharing_the_prefix(self):
+        self.assertEqual(search_opponents(self.db, 1, q="xenMaster", fuzzy=True)["items"], [])
+        self.assertEqual(search_opponents(self.db, 1, q="KEnmastr", fuzzy=True)["items"][0]["name"], "kenMaster")
+
+    def test_invalid_sort_or_cursor_is_rejected(self):
+        with self.assertRaises(ValueError):
+            search_opponents(self.db, 1, sort="elo")
+        with self.assertRaises(ValueError):
+            search_opponents(self.db, 1, cursor="not-a-cursor")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import events
+from collector import save_collected
+from data_version import DataVersion
+from database import Base
+from result_cache import ResultCache
+from test_collector import PLAYER, scraped_match
+from test_events import RecordingBroker
+
+
+class ResultCacheTests(unittest.TestCase):
+    def test_repeated_reads_are_served_from_memory(self):
+        cache = ResultCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"total": 3}
+
+        for _ in range(3):
+            self.assertEqual(cache.get_or_compute("summary", (100, 1), 1, compute), {"total": 3})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (2, 1))
+
+        # 파라미터가 다르면 다른 항목
+        cache.get_or_compute("summary", (50, 1), 1, compute)
+        self.assertEqual(len(calls), 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResultCache(maxsize=2)
+        cache.get_or_compute("a", (), None, lambda: 1)
+        cache.get_or_compute("b", (), None, lambda: 2)
+        cache.get_or_compute("a", (), None, lambda: 1)  # a를 최근으로
+        cache.get_or_compute("c", (), None, lambda: 3)
+
+        self.assertEqual(cache.get_or_compute("a", (), None, lambda: "recomputed"), 1)
+        self.assertEqual(cache.get_or_compute("b", (), None, lambda: "recomputed"), "recomputed")
+        self.assertGreaterEqual(cache.stats()["evictions"], 1)
+
+    def test_invalidate_only_drops_the_players_and_global_entries(self):
+        cache = ResultCache()
+        cache.get_or_compute("summary", (100, 1), 1, lambda: "p1")
+        cache.get_or_compute("summary", (100, 2), 2, lambda: "p2")
+        cache.get_or_compute("summary", (100, None), None, lambda: "all")
+
+        self.assertEqual(cache.invalidate([1]), 2)
+        self.assertEqual(cache.get_or_compute("summary", (100, 2), 2, lambda: "new"), "p2")
+        self.assertEqual(cache.get_or_compute("summary", (100, 1), 1, lambda: "new"), "new")
+        self.assertEqual(cache.get_or_compute("summary", (100, None), None, lambda: "new"), "new")
+
+    def test_result_computed_across_an_invalidation_is_not_stored(self):
+        cache = ResultCache()
+
+        def compute():
+            cache.invalidate([1])  # 계산 도중 수집이 커밋됨
+            return "stale"
+
+        self.assertEqual(cache.get_or_compute("summary", (100, 1), 1, compute), "stale")
+        self.assertEqual(cache.get_or_compute("summary", (100, 1), 1, lambda: "fresh"), "fresh")
+
+    def test_ingest_commit_invalidates_the_player(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        cache = ResultCache()
+        events.install(Session, RecordingBroker(), DataVersion(), cache)
+
+        cache.get_or_compute("summary", (100, 1), 1, lambda: "before")
+        cache.get_or_compute("summary", (100, 99), 99, lambda: "other player")
+        with Session() as db:
+            save_collected(db, {"player": dict(PLAYER), "matches": [scraped_match("2025/11/23 23:03", "Rival", "WIN", 1650)]})
+
+        self.assertEqual(cache.get_or_compute("summary", (100, 1), 1, lambda: "after"), "after")
+        self.assertEqual(cache.get_or_compute("summary", (100, 99), 99, lambda: "after"), "other player")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from scheduler import ScrapeScheduler
+
+
+class ScrapeSchedulerTests(unittest.TestCase):
+    def test_concurrency_limit_and_every_player_gets_a_turn(self):
+        lock = threading.Lock()
+        active = {"now": 0, "max": 0}
+        calls = []
+
+        def collect(user_code):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+                calls.append(user_code)
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return {"new_count": 0}
+
+        async def scenario():
+            scheduler = ScrapeScheduler(collect, concurrency=2)
+            scheduler.set_players([{"user_code": str(n), "interval": 60} for n in range(5)])
+            scheduler.start()
+            await asyncio.sleep(0.4)
+            await scheduler.stop()
+            return scheduler.status()
+
+        status = asyncio.run(scenario())
+
+        self.assertEqual(active["max"], 2)
+        self.assertEqual(sorted(calls), ["0", "1", "2", "3", "4"])
+        self.assertTrue(all(p["runs"] == 1 for p in status["players"]))
+
+    def test_unregistered_player_is_not_collected(self):
+        calls = []
+
+        async def scenario():
+            scheduler = ScrapeScheduler(calls.append, concurrency=1)
+            scheduler.set_players([{"user_code": "1"}, {"user_code": "2"}])
+            scheduler.set_players([{"user_code": "2"}])
+            scheduler.start()
+            await asyncio.sleep(0.1)
+            await scheduler.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(calls, ["2"])
+
+    def test_reregistered_player_waits_for_the_run_in_flight(self):
+        active = {"now": 0, "max": 0}
+        calls = []
+
+        async def collect(user_code):
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            calls.append(user_code)
+            await asyncio.sleep(0.1)
+            active["now"] -= 1
+            return {"new_count": 0}
+
+        async def scenario():
+            scheduler = ScrapeScheduler(collect, concurrency=2)
+            scheduler.set_players([{"user_code": "1", "interval": 60}])
+            scheduler.start()
+            await asyncio.sleep(0.05)
+            # 수집 도중 해제 후 다시 등록 -> 새 항목은 바로 실행 예정이지만 이전 수집이 끝날 때까지 기다림
+            scheduler.set_players([])
+            scheduler.set_players([{"user_code": "1", "interval": 60}])
+            await asyncio.sleep(0.3)
+            await scheduler.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(calls, ["1", "1"])
+        self.assertEqual(active["max"], 1)
+
+    def test_interval_backs_off_while_idle_and_resets_after_new_match(self):
+        scheduler = ScrapeScheduler(lambda user_code: None)
+        entry = scheduler.register("1", interval=30, max_interval=200)
+
+        intervals = []
+        for result in ({"new_count": 0}, {"new_count": 0}, None, {"new_count": 0}, {"new_count": 2}):
+            scheduler._adapt(entry, result, "error" if result is None else None)
+            intervals.append(entry.interval)
+
+        self.assertEqual(intervals, [60, 120, 200, 200, 30])
+        self.assertEqual(entry.idle_runs, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
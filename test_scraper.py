@@ -1,9 +1,80 @@
 import json
 import tempfile
+import os
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from scraper import auth_state_has_session, class_contains
+from scraper import (
+    BrowserPool,
+    auth_state_has_session,
+    battlelog_row_from_dom,
+    battlelog_rows_from_props,
+    class_contains,
+    match_from_row,
+    should_block_request,
+)
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.browser = context.browser
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser, storage_state):
+        self.browser = browser
+        self.storage_state = storage_state
+        self.routes = []
+
+    def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+    def new_page(self):
+        return FakePage(self)
+
+    def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, storage_state=None, **options):
+        return FakeContext(self, storage_state)
+
+    def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self, launches):
+        self.launches = launches
+        self.chromium = self
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def launch(self, headless=True, channel=None):
+        self.launches.append(channel)
+        if channel == "chrome":
+            raise RuntimeError("chrome is not installed")
+        return FakeBrowser()
 
 
 class ScraperHelperTests(unittest.TestCase):
@@ -27,6 +98,127 @@ class ScraperHelperTests(unittest.TestCase):
     def test_class_selector_matches_css_module_prefix(self):
         self.assertEqual(class_contains("battle_data_player2"), "[class*='battle_data_player2']")
 
+    def test_replay_list_is_parsed_from_next_data(self):
+        props = {
+            "replay_list": [{
+                "uploaded_at": 1700000000,
+                "player1_info": {
+                    "player": {"fighter_id": "Rival", "short_id": 1111111111},
+                    "character_name": "KEN",
+                    "league_point": 25000,
+                    "master_rating": 1710,
+                    "round_results": [0, 1, 0],
+                },
+                "player2_info": {
+                    "player": {"fighter_id": "Me", "short_id": 2222222222},
+                    "character_name": "RASHID",
+                    "league_point": 18000,
+                    "master_rating": 0,
+                    "round_results": [1, 0, 4],
+                },
+            }]
+        }
+
+        rows = battlelog_rows_from_props(props)
+        match = match_from_row(rows[0], "Someone else", user_code="2222222222")
+
+        self.assertEqual(rows[0]["date"], "2023/11/15 07:13")
+        self.assertEqual(match["result"], "WIN")
+        self.assertEqual(match["opponent_name"], "Rival")
+        self.assertEqual(match["opponent_mr"], 1710)
+        self.assertIsNone(match["opponent_lp"])
+        self.assertEqual(match["my_character"], "RASHID")
+        self.assertEqual(match["my_lp"], 18000)
+
+    def test_missing_replay_list_falls_back_to_dom(self):
+        self.assertIsNone(battlelog_rows_from_props({"fighter_banner_info": {}}))
+
+    def test_dom_row_uses_player_classes_for_result(self):
+        row = battlelog_row_from_dom({
+            "date": " 2025/11/23 23:03 ",
+            "p1_name": "Me",
+            "p1_class": "battle_data_player1__x battle_data_lose__y",
+            "p1_character": "JP",
+            "p1_lp": "1,650 MR",
+            "p2_name": "Rival",
+            "p2_class": "battle_data_player2__x battle_data_win__y",
+            "p2_character": "LUKE",
+            "p2_lp": "12,000 LP",
+        })
+        match = match_from_row(row, "Me")
+
+        self.assertEqual(match["date"], "2025/11/23 23:03")
+        self.assertEqual(match["result"], "LOSE")
+        self.assertEqual(match["my_mr"], 1650)
+        self.assertEqual(match["opponent_lp"], 12000)
+
+    def test_fast_navigation_blocks_assets_and_third_party_hosts(self):
+        buckler = "https://www.streetfighter.com/6/buckler/_next/static/chunk.js"
+
+        self.assertFalse(should_block_request("script", buckler))
+        self.assertTrue(should_block_request("image", "https://www.streetfighter.com/6/buckler/img.png"))
+        self.assertTrue(should_block_request("font", "https://www.streetfighter.com/font.woff2"))
+        self.assertTrue(should_block_request("script", "https://www.googletagmanager.com/gtm.js"))
+        self.assertFalse(should_block_request("document", "https://cid.capcom.com/ko/login", is_navigation=True))
+
+
+class BrowserPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.auth_path = Path(self.tmp.name) / "auth.json"
+        self.auth_path.write_text(json.dumps({"cookies": [{"name": "sid", "value": "x"}]}), encoding="utf-8")
+        self.launches = []
+        patcher = mock.patch("scraper.sync_playwright", lambda: FakePlaywright(self.launches))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = BrowserPool(auth_file=str(self.auth_path))
+        self.addCleanup(self.pool.close)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_pages_stay_warm_between_calls(self):
+        first = self.pool.run(lambda page: page)
+        second = self.pool.run(lambda page: page)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.launches, ["chrome", "msedge"])
+        self.assertEqual(self.pool.stats()["channel"], "msedge")
+
+    def test_crashed_browser_is_relaunched_with_remembered_channel(self):
+        pages = []
+
+        def crash_once(page):
+            pages.append(page)
+            if len(pages) == 1:
+                page.browser.connected = False
+                raise RuntimeError("Target page, context or browser has been closed")
+            return page
+
+        self.pool.run(lambda page: page)
+        result = self.pool.run(crash_once)
+
+        self.assertIs(result, pages[1])
+        self.assertIsNot(pages[0].browser, pages[1].browser)
+        self.assertEqual(self.launches, ["chrome", "msedge", "msedge"])
+
+    def test_context_is_recreated_when_auth_file_changes(self):
+        first = self.pool.run(lambda page: page)
+        mtime = os.path.getmtime(self.auth_path)
+        os.utime(self.auth_path, (mtime + 5, mtime + 5))
+        second = self.pool.run(lambda page: page)
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed())
+        self.assertEqual(self.pool.stats()["launch_count"], 1)
+
+    def test_fast_navigation_toggle_recreates_context_routes(self):
+        fast_page = self.pool.run(lambda page: page)
+        self.pool.fast_navigation = False
+        slow_page = self.pool.run(lambda page: page)
+
+        self.assertEqual(fast_page.context.routes, ["**/*"])
+        self.assertEqual(slow_page.context.routes, [])
+        self.assertEqual(self.pool.stats()["launch_count"], 1)
+
 
 if __name__ == "__main__":
     unittest.main()